@@ -5,13 +5,19 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 import asyncio
 from google.adk.agents import Agent, LlmAgent
-from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
+from logs.session_store import DurableSessionService
 from google.genai import types # For creating message Content/Parts
 from typing import Optional 
 from dotenv import load_dotenv
-from tools.tools import save_report, save_user_manual, save_usecase_acceptance_criteria, save_task_chart
-from prompt import BRD_instruction, Business_analyst_instruction, BRD_Revision_Instruction, Usermanual_instruction, usecase_acceptance_criteria_instruction, task_chart_instruction
+from batch_agent import build_batch_agent, wait_for_renders
+from tools.history_compaction import compact_history
+from tools.intent_router import route_request, record_router_latency
+from tools.render_jobs import list_jobs
+from tools.render_pool import shutdown_render_pool
+from tools.response_cache import discard_pending_response, serve_cached_response, store_response
+from tools.tools import save_report, save_user_manual, save_usecase_acceptance_criteria, save_task_chart, get_brd_sections, save_revised_sections
+from prompt import BRD_instruction, Business_analyst_instruction, brd_revision_instruction, brd_delta_revision_instruction, Usermanual_instruction, usecase_acceptance_criteria_instruction, task_chart_instruction
 from google.adk.tools import google_search
 # from subagents.BRDGeneratorAgent.agent import BRDGeneratorAgent
 import warnings
@@ -29,6 +35,26 @@ except ImportError:
     print("Warning: python-dotenv not installed. Ensure API key is set")
     MODEL_NAME = "gemini-2.5-flash"
 
+# Render PDFs and Gantt charts in the process pool (tools.render_pool) instead of on the event loop
+if os.environ.get("RENDER_IN_PROCESS_POOL", "1") == "1":
+    from tools.async_tools import save_report, save_user_manual, save_usecase_acceptance_criteria, save_task_chart, save_revised_sections
+
+# "delta" sends only the affected BRD sections to the model, "full" re-sends and re-emits the whole BRD
+BRD_REVISION_MODE = os.environ.get("BRD_REVISION_MODE", "delta")
+
+# Replace saved document bodies with references and fold old turns into a summary before each model call
+HISTORY_COMPACTION = os.environ.get("HISTORY_COMPACTION", "1") == "1"
+compact_history_callback = compact_history if HISTORY_COMPACTION else None
+
+# Route clear single-document requests to the sub-agent without the orchestrator's model call
+FAST_PATH_ROUTER = os.environ.get("FAST_PATH_ROUTER", "1") == "1"
+
+# Serve repeated document requests from the response cache (tools.response_cache) without a model call
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "1") == "1"
+serve_cached_callback = serve_cached_response if RESPONSE_CACHE else None
+store_response_callback = store_response if RESPONSE_CACHE else None
+discard_pending_callback = discard_pending_response if RESPONSE_CACHE else None
+
 
 
 
@@ -46,15 +72,20 @@ BRDGeneratorAgent = Agent(
         instruction=BRD_instruction,
         description="You create clear, structured Business Requirement Documents by analyzing stakeholder inputs, business goals, functional needs and mandatorily save the report using 'save_report' tool", # Crucial for delegation
         tools=[save_report],
+        before_model_callback=compact_history_callback,
+        before_agent_callback=serve_cached_callback,
+        after_agent_callback=store_response_callback,
+        on_model_error_callback=discard_pending_callback,
     )
 
 BRDRevisionAgent = Agent(
         model = MODEL_GEMINI_2_5_FLASH,
         # model=LiteLlm(model=MODEL_GPT_4O), # If you would like to experiment with other models
         name="BRDRevisionAgent",
-        instruction=BRD_Revision_Instruction,
+        instruction=brd_delta_revision_instruction if BRD_REVISION_MODE == "delta" else brd_revision_instruction,
         description="You are a BRD revision agent. You understand the user changes and change the BRD document given to you which is generated by the BRDGeneratorAgent. Save the report using 'save_report' tool.", # Crucial for delegation
-        tools=[save_report],
+        tools=[get_brd_sections, save_revised_sections] if BRD_REVISION_MODE == "delta" else [save_report],
+        before_model_callback=compact_history_callback,
     )
 UserManualAgent = Agent(
         model = MODEL_GEMINI_2_5_FLASH,
@@ -63,6 +94,10 @@ UserManualAgent = Agent(
         instruction=Usermanual_instruction,
         description="You are a user manual agent. You understand the product details given by the user and create a user manual for the product. Save the report using 'save_user_manual' tool.", # Crucial for delegation
         tools=[save_user_manual],
+        before_model_callback=compact_history_callback,
+        before_agent_callback=serve_cached_callback,
+        after_agent_callback=store_response_callback,
+        on_model_error_callback=discard_pending_callback,
     )
 UsecaseAcceptanceCriteriaAgent = Agent(
         model = MODEL_GEMINI_2_5_FLASH,
@@ -71,6 +106,10 @@ UsecaseAcceptanceCriteriaAgent = Agent(
         instruction=usecase_acceptance_criteria_instruction,
         description="You are a usecase acceptance criteria agent.  Given a short feature description or user story by the user and create usecase and acceptance criteria for the product. Save the report using 'save_user_manual' tool.", # Crucial for delegation
         tools=[save_usecase_acceptance_criteria],
+        before_model_callback=compact_history_callback,
+        before_agent_callback=serve_cached_callback,
+        after_agent_callback=store_response_callback,
+        on_model_error_callback=discard_pending_callback,
     )
 
 TaskChartAgent= Agent(
@@ -80,9 +119,17 @@ TaskChartAgent= Agent(
         instruction=task_chart_instruction,
         description="You are a task chart agent. Given a set of tasks, start time and endtime, You will use the 'save_task_chart' tool to create a gant chart.", # Crucial for delegation
         tools=[save_task_chart],
+        before_model_callback=compact_history_callback,
+        before_agent_callback=serve_cached_callback,
+        after_agent_callback=store_response_callback,
+        on_model_error_callback=discard_pending_callback,
     )
 
 
+# Runs copies of the document agents in parallel for multi-document requests
+DocumentBatchAgent = build_batch_agent([BRDGeneratorAgent, UsecaseAcceptanceCriteriaAgent, UserManualAgent, TaskChartAgent])
+
+
 # --- Business Analyst Agent ---
 business_analyst_agent = Agent(
         model = MODEL_GEMINI_2_5_FLASH,
@@ -90,8 +137,10 @@ business_analyst_agent = Agent(
         name="business_analyst_agent",
         instruction=Business_analyst_instruction,
         output_key="ba_output",
-        description="You are a business analyst. You understand the business requirement and delegate the task to the subagents like 'BRDGeneratorAgent','BRDRevisionAgent', 'UserManualAgent', 'UsecaseAcceptanceCriteriaAgent' and 'TaskChartAgent'.", # Crucial for delegation
-        sub_agents=[BRDGeneratorAgent, BRDRevisionAgent, UserManualAgent, UsecaseAcceptanceCriteriaAgent, TaskChartAgent],
+        description="You are a business analyst. You understand the business requirement and delegate the task to the subagents like 'BRDGeneratorAgent','BRDRevisionAgent', 'UserManualAgent', 'UsecaseAcceptanceCriteriaAgent', 'TaskChartAgent' and 'DocumentBatchAgent'.", # Crucial for delegation
+        sub_agents=[BRDGeneratorAgent, BRDRevisionAgent, UserManualAgent, UsecaseAcceptanceCriteriaAgent, TaskChartAgent, DocumentBatchAgent],
+        before_model_callback=[callback for callback in (route_request if FAST_PATH_ROUTER else None, compact_history_callback) if callback],
+        after_model_callback=record_router_latency if FAST_PATH_ROUTER else None,
     )
 
 root_agent=business_analyst_agent
@@ -123,7 +172,7 @@ async def call_agent_async(query: str, runner, user_id, session_id):
          
 
 async def run_c():
-    session_service = InMemorySessionService()
+    session_service = DurableSessionService()
 
     # Define constants for identifying the interaction context
     APP_NAME = "business_analyst_app"
@@ -131,12 +180,15 @@ async def run_c():
     SESSION_ID = "session_001" # Using a fixed ID for simplicity
 
     # Create the specific session where the conversation will happen
-    session = await session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=SESSION_ID
-    )
-    print(f"Session created: App='{APP_NAME}', User='{USER_ID}', Session='{SESSION_ID}'")
+    # Sessions are persisted, so a second run continues the same conversation
+    session = await session_service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
+    if session is None:
+        session = await session_service.create_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            session_id=SESSION_ID
+        )
+    print(f"Session ready: App='{APP_NAME}', User='{USER_ID}', Session='{SESSION_ID}'")
 
     # --- Runner ---
     # Key Concept: Runner orchestrates the agent execution loop.
@@ -149,9 +201,18 @@ async def run_c():
 
     await call_agent_async("The client needs an internal tool for automating leave approvals. It should integrate with their existing HRMS. Only managers can approve or reject leave. Employees should be able to see their leave history and balance. The tool should be browser-based and mobile-friendly. The initial rollout will be for 3 departments. Launch expected in Q4.",runner=runner,user_id=USER_ID,session_id=SESSION_ID)
 
+    # Background renders (RENDER_IN_BACKGROUND) run in this process, so wait for them before exiting
+    jobs = [{"job_id": job["id"], "path": job["path"]} for job in list_jobs(SESSION_ID)]
+    await wait_for_renders(jobs)
+    for job in jobs:
+        print(f"Render {job['status']}: {job['path']}")
+
 
 if __name__=="__main__":
 
-    asyncio.run(run_c())
+    try:
+        asyncio.run(run_c())
+    finally:
+        shutdown_render_pool()
 
 # The client needs an internal tool for automating leave approvals. It should integrate with their existing HRMS. Only managers can approve or reject leave. Employees should be able to see their leave history and balance. The tool should be browser-based and mobile-friendly. The initial rollout will be for 3 departments. Launch expected in Q4.
\ No newline at end of file
@@ -7,113 +7,278 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import streamlit as st
 import asyncio
-from typing import Any, Dict, List
-from google.adk.sessions import InMemorySessionService
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from google.adk.plugins.base_plugin import BasePlugin
 from google.adk.runners import Runner
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.events import Event
 from google.genai import types
+from opentelemetry import context as otel_context
+from opentelemetry.trace import StatusCode
 import traceback
 import uuid
 
 from agent import business_analyst_agent
+from logs.session_store import DurableSessionService
+from tools.render_pool import get_executor, render_pool_stats
+from tools.render_jobs import get_job
+from tools.intent_router import router_stats
+from tools.response_cache import BYPASS_STATE_KEY, response_cache_stats
+from tools.artefact_store import download_data
+from tools.artefacts import MIME_TYPES, event_artefacts
+from tools.tracing import setup_tracing, span
 
 APP_NAME = "host_agent_ui"
 USER_ID = "streamlit_user"
+# Stream partial model output (SSE) into the chat instead of waiting for the whole turn
+STREAMING = os.environ.get("STREAMING", "1") == "1"
+
+class FirstModelRequestTimer(BasePlugin):
+    """
+    Runner plugin that notes the perf_counter() time of the first model request of every invocation,
+    so run_agent_logic can report the overhead paid before it.
+    """
+
+    def __init__(self):
+        super().__init__(name="first_model_request_timer")
+        self._first_request = {}
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self._first_request.setdefault(callback_context.invocation_id, time.perf_counter())
+        return None
+
+    def pop(self, invocation_id: Optional[str]) -> Optional[float]:
+        return self._first_request.pop(invocation_id, None)
+
+
+first_model_request_timer = FirstModelRequestTimer()
 
 @st.cache_resource
 def get_adk_runner() -> Runner:
     print("🔧 Creating new ADK Runner instance (this should only appear once per session)")
-    session_service = InMemorySessionService()
+    session_service = DurableSessionService()
+    setup_tracing()
+    get_executor()  # spawn and warm the render workers before the first document is requested
     host_agent = business_analyst_agent
     return Runner(
         agent=host_agent,
         app_name=APP_NAME,
         session_service=session_service,
+        plugins=[first_model_request_timer],
     )
 
+@st.cache_resource
+def get_agent_loop() -> asyncio.AbstractEventLoop:
+    """
+    One event loop per server process, running forever on a daemon thread. Every chat turn is
+    submitted to it, so the Runner, its session service and the model clients (and their HTTP
+    connections) are bound to a single long-lived loop instead of a new one per message.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="adk-event-loop", daemon=True).start()
+    print("🔁 Started the agent event loop thread")
+    return loop
+
 @st.cache_resource
 def initialize_adk_session():
     print(f"--- This function is a placeholder and its logic has been moved into run_agent_logic ---")
     return True
 
-async def run_agent_logic(prompt: str, session_id: str) -> Dict[str, Any]:
-    try:
-        runner = get_adk_runner()
-
-        if 'adk_session_initialized' not in st.session_state:
-            try:
+async def run_agent_logic(prompt: str, session_id: str,
+                          on_text: Optional[Callable[[str], None]] = None,
+                          on_tool: Optional[Callable[[str], None]] = None,
+                          runner: Optional[Runner] = None,
+                          submitted: Optional[float] = None,
+                          bypass_cache: bool = False,
+                          trace_context=None) -> Dict[str, Any]:
+    """
+    Runs one chat turn. on_text receives the text of the message being generated every time it grows
+    (token by token when STREAMING is on); on_tool receives a progress line per tool call and response.
+    bypass_cache makes the document agents generate afresh instead of answering from the response cache.
+
+    Runs on the agent event loop thread (see run_agent_turn), so it must not touch st.* itself.
+    submitted is the perf_counter() time the turn was handed over; turn_overhead_s is the time from
+    there to the first model request (see FirstModelRequestTimer). The turn is traced as an "agent.turn" span (see
+    tools.tracing) under trace_context, the context of the caller on the script thread.
+    """
+    with span("agent.turn", context=trace_context, session_id=session_id, prompt_chars=len(prompt)) as turn_span:
+        invocation_id = None
+        try:
+            runner = runner or get_adk_runner()
+
+            session = await runner.session_service.get_session(
+                app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+            )
+            if session is None:
                 await runner.session_service.create_session(
                     app_name=APP_NAME,
                     user_id=USER_ID,
                     session_id=session_id
                 )
                 print(f"✅ ADK session created: {session_id}")
-                st.session_state.adk_session_initialized = True
-            except Exception:
-                st.session_state.adk_session_initialized = True
-
-        tool_calls = []
-        tool_responses = []
-        final_response = ""
-        pdf_path = None
-        excel_path= None
-
-        async for event in runner.run_async(
-            user_id=USER_ID,
-            session_id=session_id,
-            new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
-        ):
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if part.function_call:
-                        tool_calls.append({
-                            'name': part.function_call.name,
-                            'args': part.function_call.args
-                        })
-                    elif part.function_response:
-                        response_data = part.function_response.response
-                        tool_responses.append({
-                            'name': part.function_response.name,
-                            'response': response_data
-                        })
-
-                        # if isinstance(response_data, dict) and 'pdf_path' in response_data:
-                        #     pdf_path = response_data['pdf_path']
-                        for tool in tool_responses:
-                            if tool.get("name") == "save_report" or tool.get("name") == "save_user_manual" or tool.get("name") =="save_usecase_acceptance_criteria":
-                                pdf_path = tool.get("response", {}).get("result")
-                            elif tool.get("name")=="save_task_chart":
-                                excel_path = tool.get("response", {}).get("result")
-                                break
-
-
-            if event.is_final_response():
+
+            tool_calls = []
+            tool_responses = []
+            final_response = ""
+            # Every artefact of the turn, in the order the events reported them (see tools.artefacts)
+            artefacts = []
+            render_jobs = []
+            # Text of the message being generated per agent; batch runs stream several agents at once
+            live_text = {}
+            streaming_message = {}
+            started = time.perf_counter()
+            first_token_s = None
+            event_count = 0
+            input_tokens = output_tokens = 0
+
+            async for event in runner.run_async(
+                user_id=USER_ID,
+                session_id=session_id,
+                new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE if STREAMING else StreamingMode.NONE),
+                state_delta={BYPASS_STATE_KEY: bypass_cache},
+            ):
+                invocation_id = event.invocation_id
+                text = "".join(p.text for p in event.content.parts if p.text) if event.content and event.content.parts else ""
+                if text:
+                    if first_token_s is None:
+                        first_token_s = time.perf_counter() - started
+                    author = event.author
+                    if event.partial:
+                        # Partial events carry the next chunk of the message being generated
+                        live_text[author] = live_text.get(author, "") + text if streaming_message.get(author) else text
+                        streaming_message[author] = True
+                    else:
+                        # The closing non-partial event repeats the complete message
+                        live_text[author] = text
+                        streaming_message[author] = False
+                    if on_text:
+                        on_text(live_text[author])
+                if event.partial:
+                    continue
+
+                event_count += 1
+                if event.usage_metadata:
+                    input_tokens += event.usage_metadata.prompt_token_count or 0
+                    output_tokens += event.usage_metadata.candidates_token_count or 0
+
                 if event.content and event.content.parts:
-                    final_response = "".join([p.text for p in event.content.parts if p.text])
-                elif event.actions and event.actions.escalate:
-                    final_response = f"Agent escalated: {event.error_message or 'No specific message.'}"
-                break
-            
-
-        return {
-            'final_response': final_response,
-            'tool_calls': tool_calls,
-            'tool_responses': tool_responses,
-            'pdf_path': pdf_path,
-            'excel_path': excel_path,
-            'success': True
-        }
-
-    except Exception as e:
-        st.error(f"Error running agent: {str(e)}")
-        traceback.print_exc()
-        return {
-            'final_response': f"An error occurred: {str(e)}",
-            'tool_calls': [],
-            'tool_responses': [],
-            'pdf_path': None,
-            'success': False
-        }
+                    for part in event.content.parts:
+                        if part.function_call:
+                            tool_calls.append({
+                                'name': part.function_call.name,
+                                'args': part.function_call.args
+                            })
+                            if on_tool:
+                                on_tool(f"🛠️ Calling {part.function_call.name}...")
+                        elif part.function_response:
+                            response_data = part.function_response.response
+                            tool_responses.append({
+                                'name': part.function_response.name,
+                                'response': response_data
+                            })
+                            if on_tool:
+                                on_tool(f"✅ {part.function_response.name} finished")
+
+                for artefact in event_artefacts(event):
+                    artefacts.append(artefact)
+                    # Documents rendered in the background are picked up by render_jobs_panel once done
+                    if artefact["job_id"]:
+                        render_jobs.append(artefact["job_id"])
+
+                # Not stopping at the first final response: in a batch every document agent gives one
+                if event.is_final_response():
+                    if event.content and event.content.parts:
+                        final_response = "".join([p.text for p in event.content.parts if p.text]) or final_response
+                    elif event.actions and event.actions.escalate:
+                        final_response = f"Agent escalated: {event.error_message or 'No specific message.'}"
+
+            # Write any events still buffered by the session service before the turn returns
+            await runner.session_service.flush()
+            first_request = first_model_request_timer.pop(invocation_id)
+            turn_overhead_s = first_request - submitted if first_request is not None and submitted is not None else None
+            turn_span.set_attributes({"events": event_count, "artefacts": len(artefacts),
+                                      "gen_ai.usage.input_tokens": input_tokens,
+                                      "gen_ai.usage.output_tokens": output_tokens})
+            if first_token_s is not None:
+                turn_span.set_attribute("first_token_ms", round(first_token_s * 1000, 3))
+            if turn_overhead_s is not None:
+                turn_span.set_attribute("turn_overhead_ms", round(turn_overhead_s * 1000, 3))
+
+            return {
+                'final_response': final_response,
+                'tool_calls': tool_calls,
+                'tool_responses': tool_responses,
+                'artefacts': artefacts,
+                'render_jobs': render_jobs,
+                'first_token_s': first_token_s,
+                'turn_overhead_s': turn_overhead_s,
+                'success': True
+            }
+
+        except Exception as e:
+            traceback.print_exc()
+            first_model_request_timer.pop(invocation_id)
+            turn_span.record_exception(e)
+            turn_span.set_status(StatusCode.ERROR, str(e))
+            return {
+                'final_response': f"An error occurred: {str(e)}",
+                'tool_calls': [],
+                'tool_responses': [],
+                'artefacts': [],
+                'render_jobs': [],
+                'success': False
+            }
+
+def run_agent_turn(prompt: str, session_id: str,
+                   on_text: Optional[Callable[[str], None]] = None,
+                   on_tool: Optional[Callable[[str], None]] = None,
+                   bypass_cache: bool = False) -> Dict[str, Any]:
+    """
+    Submits a turn to the agent event loop and waits for it on the script thread.
+
+    Streamlit elements can only be updated from the script thread, so the callbacks of
+    run_agent_logic just queue their updates and they are applied here while the turn runs.
+    Text updates that pile up between two polls are collapsed into the latest one.
+    """
+    updates = queue.Queue()
+    with span("app.turn", session_id=session_id, streaming=STREAMING):
+        future = asyncio.run_coroutine_threadsafe(
+            run_agent_logic(
+                prompt, session_id,
+                on_text=lambda text: updates.put(("text", text)),
+                on_tool=lambda message: updates.put(("tool", message)),
+                runner=get_adk_runner(),
+                submitted=time.perf_counter(),
+                bypass_cache=bypass_cache,
+                trace_context=otel_context.get_current(),
+            ),
+            get_agent_loop(),
+        )
+        while True:
+            done = future.done()
+            latest_text = None
+            while True:
+                try:
+                    kind, value = updates.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "text":
+                    latest_text = value
+                    continue
+                if latest_text is not None and on_text:
+                    on_text(latest_text)
+                    latest_text = None
+                if on_tool:
+                    on_tool(value)
+            if latest_text is not None and on_text:
+                on_text(latest_text)
+            if done:
+                return future.result()
+            time.sleep(0.05)
 
 def initialize_session_state():
     if 'session_id' not in st.session_state:
@@ -124,6 +289,37 @@ def initialize_session_state():
         st.session_state.pdf_files = []
     if 'excel_files' not in st.session_state:
         st.session_state.excel_files = []  
+    if 'render_jobs' not in st.session_state:
+        st.session_state.render_jobs = []
+
+def render_jobs_panel():
+    """
+    Polls the session's background render jobs; finished documents move to the download lists.
+    """
+    pending = []
+    finished = False
+    for job_id in list(st.session_state.render_jobs):
+        job = get_job(job_id)
+        if job is None or job["status"] in ("done", "failed"):
+            st.session_state.render_jobs.remove(job_id)
+        if job is None:
+            continue
+        if job["status"] == "failed":
+            st.error(f"❌ {os.path.basename(job['path'])} could not be rendered: {job['error']}")
+        elif job["status"] == "done":
+            files = st.session_state.excel_files if job["kind"] == "task_chart" else st.session_state.pdf_files
+            if job["path"] not in files:
+                files.append(job["path"])
+            finished = True
+        else:
+            pending.append(job)
+
+    if pending:
+        st.header("⏳ Rendering")
+        for job in pending:
+            st.text(f"{os.path.basename(job['path'])} ({job['status']})")
+    if finished:
+        st.rerun()
 
 def display_tool_calls(tool_calls: List[Dict[str, Any]]):
     if tool_calls:
@@ -173,27 +369,45 @@ def main():
             st.session_state.clear()
             st.rerun()
 
+        with st.expander("⚙️ Render pool", expanded=False):
+            st.json(render_pool_stats())
+
+        with st.expander("🧭 Router", expanded=False):
+            st.json(router_stats())
+
+        st.checkbox("Regenerate documents (skip response cache)", key="bypass_response_cache")
+        with st.expander("🗄️ Response cache", expanded=False):
+            st.json(response_cache_stats())
+
+        # Re-runs on its own every 2 seconds while documents are still rendering
+        st.fragment(render_jobs_panel, run_every=2 if st.session_state.render_jobs else None)()
+
         if st.session_state.pdf_files:
             st.header("📄 Generated PDFs")
+            # The files are only read when a button is clicked (see tools.artefact_store)
             for i, pdf_file in enumerate(st.session_state.pdf_files):
                 st.download_button(
                     # label=f"📥 Download PDF {i+1}",
                     label=f"{os.path.basename(pdf_file)}",
-                    data=open(pdf_file, "rb").read(),
+                    data=download_data(pdf_file),
                     file_name=os.path.basename(pdf_file),
-                    mime="application/pdf"
+                    mime="application/pdf",
+                    on_click="ignore",
+                    key=f"pdf_{i}"
                 )
                 
-        for i, excel_file in enumerate(st.session_state.excel_files):
-            if excel_file and os.path.isfile(excel_file):
-                st.header("📄 Generated Excels")
-                st.download_button(
-                    label=f"{os.path.basename(excel_file)}",
-                    data=open(excel_file, "rb").read(),
-                    file_name=os.path.basename(excel_file),
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    key=f"excel_{i}"
-                )
+        excel_files = [f for f in st.session_state.excel_files if f and os.path.isfile(f)]
+        if excel_files:
+            st.header("📄 Generated Excels")
+        for i, excel_file in enumerate(excel_files):
+            st.download_button(
+                label=f"{os.path.basename(excel_file)}",
+                data=download_data(excel_file),
+                file_name=os.path.basename(excel_file),
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                on_click="ignore",
+                key=f"excel_{i}"
+            )
 
 
     for message in st.session_state.conversation_history:
@@ -214,41 +428,66 @@ def main():
             st.write(prompt)
 
         with st.chat_message("assistant"):
-            with st.spinner("🤔 Business Analyst Agent is thinking..."):
-                result = asyncio.run(run_agent_logic(prompt, st.session_state.session_id))
-                print(result)
+            status = st.status("🤔 Business Analyst Agent is thinking...", expanded=False)
+            text_placeholder = st.empty()
+
+            def show_tool_progress(message):
+                status.update(label=message)
+                status.write(message)
+
+            result = run_agent_turn(
+                prompt, st.session_state.session_id,
+                on_text=lambda text: text_placeholder.markdown(text + " ▌"),
+                on_tool=show_tool_progress,
+                bypass_cache=st.session_state.get("bypass_response_cache", False),
+            )
+            print(result)
+            if result.get('first_token_s') is not None:
+                print(f"Time to first visible token: {result['first_token_s']:.2f}s")
+            if result.get('turn_overhead_s') is not None:
+                print(f"Turn overhead before the first model request: {result['turn_overhead_s'] * 1000:.1f} ms")
+                status.write(f"⏱️ First model request after {result['turn_overhead_s'] * 1000:.1f} ms")
+            status.update(label="Done", state="complete" if result['success'] else "error")
+            if not result['success']:
+                st.error(result['final_response'])
 
             if result['final_response']:
-                st.write(result['final_response'])
+                text_placeholder.write(result['final_response'])
+            else:
+                text_placeholder.empty()
 
             # display_tool_calls(result['tool_calls'])
             # display_tool_responses(result['tool_responses'])
 
-            if result['pdf_path']:
-                st.success(f"📄 PDF generated: {os.path.basename(result['pdf_path'])}")
+            # Artefacts still rendering show up in the sidebar once render_jobs_panel sees them finish
+            for i, artefact in enumerate(a for a in result['artefacts'] if not a['job_id']):
+                path = artefact['path']
+                if not os.path.isfile(path):
+                    continue
+                name = os.path.basename(path)
+                if artefact['kind'] == "bundle":
+                    st.success(f"📦 Documents bundled: {name}")
+                elif artefact['kind'] == "excel":
+                    st.success(f"📊 Task Chart generated: {name}")
+                else:
+                    st.success(f"📄 PDF generated: {name}")
                 st.download_button(
-                    label="📥 Download PDF",
-                    data=open(result['pdf_path'], "rb").read(),
-                    file_name=os.path.basename(result['pdf_path']),
-                    mime="application/pdf"
+                    label=f"📥 Download {name}",
+                    data=download_data(path),
+                    file_name=name,
+                    mime=MIME_TYPES[artefact['kind']],
+                    on_click="ignore",
+                    key=f"turn_artefact_{i}"
                 )
-                if result['pdf_path'] not in st.session_state.pdf_files:
-                    st.session_state.pdf_files.append(result['pdf_path'])
-
-            if result.get('excel_path'):
-                excel_path = result['excel_path']
-                if os.path.isfile(excel_path):  # check if path is valid
-                    st.success(f"📊 Task Chart generated: {os.path.basename(excel_path)}")
-                    st.download_button(
-                        label="📥 Download Task Chart",
-                        data=open(excel_path, "rb").read(),
-                        file_name=os.path.basename(excel_path),
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-                    if excel_path not in st.session_state.excel_files:
-                        st.session_state.excel_files.append(excel_path)
-
+                files = {"pdf": st.session_state.pdf_files, "excel": st.session_state.excel_files}.get(artefact['kind'])
+                if files is not None and path not in files:
+                    files.append(path)
 
+            for job_id in result.get('render_jobs', []):
+                job = get_job(job_id)
+                if job:
+                    st.info(f"⏳ {os.path.basename(job['path'])} is being rendered. It will appear in the sidebar when ready.")
+                    st.session_state.render_jobs.append(job_id)
 
             assistant_message = {
                 "role": "assistant",
@@ -258,6 +497,10 @@ def main():
             }
             st.session_state.conversation_history.append(assistant_message)
 
+            if result.get('render_jobs'):
+                # Start polling the new jobs in the sidebar
+                st.rerun()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,135 @@
+"""
+Batch mode: several documents from one requirement brief, generated concurrently.
+
+DocumentBatchAgent is a sub-agent of business_analyst_agent. It runs copies of the chosen document
+agents side by side in a ParallelAgent, all reading the same brief from state['ba_output'], waits for
+their renders to finish and packs every artefact into one zip bundle (Bundles/bundle_vN.zip) with a
+manifest. The turn takes about as long as the slowest document instead of the sum of all of them.
+"""
+import asyncio
+import json
+import os
+import time
+import zipfile
+from typing import AsyncGenerator, List
+
+from google.adk.agents import BaseAgent, ParallelAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+from tools.artefacts import collect_artefacts
+from tools.intent_router import BATCH_AGENT, BATCH_AGENT_PREFIX, select_batch_documents
+from tools.pdf_renderer import ROOT_DIR, atomic_output, reserve_versioned_path
+from tools.render_jobs import get_job
+
+BUNDLE_FOLDER = os.path.join(ROOT_DIR, "Bundles")
+# Longest wait for background renders before the bundle is written without them
+BATCH_BUNDLE_TIMEOUT = float(os.environ.get("BATCH_BUNDLE_TIMEOUT", 300))
+
+
+async def wait_for_renders(artefacts: list, timeout: float = BATCH_BUNDLE_TIMEOUT):
+    """
+    Waits for the background render jobs of the artefacts and records their final status.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        for artefact in artefacts:
+            job = get_job(artefact["job_id"]) if artefact["job_id"] else None
+            artefact["status"] = job["status"] if job else "done"
+        if all(a["status"] in ("done", "failed") for a in artefacts) or time.monotonic() > deadline:
+            return
+        await asyncio.sleep(0.5)
+
+
+def write_bundle(artefacts: list, brief: str, elapsed_s: float) -> str:
+    """
+    Zips the finished artefacts with a manifest.json into the next Bundles/bundle_vN.zip.
+    """
+    bundle_path = reserve_versioned_path(BUNDLE_FOLDER, "bundle", "zip")
+    manifest = {"brief": brief, "elapsed_s": round(elapsed_s, 2), "documents": artefacts}
+    with atomic_output(bundle_path) as tmp_path, \
+            zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for artefact in artefacts:
+            if artefact["status"] == "done" and os.path.isfile(artefact["path"]):
+                bundle.write(artefact["path"], arcname=os.path.basename(artefact["path"]))
+        bundle.writestr("manifest.json", json.dumps(manifest, indent=2))
+    return bundle_path
+
+
+def _written_this_turn(ctx, key):
+    """
+    Returns the value this invocation wrote to state[key], or None when only an earlier turn set it.
+    """
+    value = None
+    for event in ctx.session.events:
+        if event.invocation_id == ctx.invocation_id and key in event.actions.state_delta:
+            value = event.actions.state_delta[key]
+    return value
+
+
+class DocumentBatchAgent(BaseAgent):
+    """
+    Runs the document agents picked for the brief concurrently and bundles their artefacts.
+    """
+
+    document_agents: List[BaseAgent] = Field(default_factory=list)
+    # ParallelAgent per combination of documents, built on first use
+    _parallel_agents: dict = PrivateAttr(default_factory=dict)
+
+    def parallel_agent(self, names: List[str]) -> ParallelAgent:
+        key = tuple(sorted(names))
+        if key not in self._parallel_agents:
+            # Copies, since an agent can only have one parent; they never transfer on their own
+            branches = [
+                agent.clone(update={"name": BATCH_AGENT_PREFIX + agent.name, "disallow_transfer_to_parent": True,
+                                    "disallow_transfer_to_peers": True})
+                for agent in self.document_agents if agent.name in key
+            ]
+            self._parallel_agents[key] = ParallelAgent(name=f"{self.name}Parallel", sub_agents=branches)
+        return self._parallel_agents[key]
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        # ba_output and batch_documents may still hold an earlier request: the LLM router does not always
+        # write ba_output, and only the fast path sets batch_documents
+        brief = _written_this_turn(ctx, "ba_output") or "".join(
+            part.text for part in (ctx.user_content.parts if ctx.user_content else []) if part.text)
+        names = _written_this_turn(ctx, "batch_documents") or select_batch_documents(brief)
+        started = time.perf_counter()
+        # The document agents read the brief from state
+        yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                    actions=EventActions(state_delta={"ba_output": brief, "batch_documents": names}))
+
+        async for event in self.parallel_agent(names).run_async(ctx):
+            yield event
+
+        artefacts = collect_artefacts(ctx.session.events, ctx.invocation_id, kinds=("pdf", "excel"))
+        await wait_for_renders(artefacts)
+        elapsed_s = time.perf_counter() - started
+        bundle_path = await asyncio.to_thread(write_bundle, artefacts, brief, elapsed_s)
+        print(f"📦 Batch of {len(artefacts)} documents bundled in {elapsed_s:.1f}s: {bundle_path}")
+
+        lines = [f"Created {len(artefacts)} documents in {elapsed_s:.0f}s:"]
+        lines += [f"- {os.path.basename(a['path'])}{'' if a['status'] == 'done' else ' (' + a['status'] + ')'}"
+                  for a in artefacts]
+        lines.append(f"All documents are bundled in {os.path.basename(bundle_path)}.")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="\n".join(lines))]),
+            actions=EventActions(state_delta={
+                "batch_documents": None,
+                "last_bundle": {"path": bundle_path, "documents": [a["path"] for a in artefacts],
+                                "elapsed_s": round(elapsed_s, 2)},
+            }),
+        )
+
+
+def build_batch_agent(document_agents) -> DocumentBatchAgent:
+    return DocumentBatchAgent(
+        name=BATCH_AGENT,
+        description="Creates several documents (BRD, usecases & acceptance criteria, user manual, task chart) "
+                    "from one requirement brief in parallel and bundles them.",
+        document_agents=list(document_agents),
+    )
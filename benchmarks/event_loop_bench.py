@@ -0,0 +1,70 @@
+"""
+Per-turn overhead of asyncio.run per message versus one persistent event loop thread.
+
+Each "turn" does what run_agent_logic does before the first model request: look up the ADK session
+(creating it on the first turn) and open the runner's event stream. The timing covers submitting
+the turn until that point; asyncio.run additionally pays for creating and tearing down a loop.
+
+Run from the project root:
+    python -m benchmarks.event_loop_bench
+"""
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.adk.sessions import InMemorySessionService
+
+APP_NAME = "bench"
+USER_ID = "bench_user"
+TURNS = 200
+
+
+async def start_turn(service, session_id, submitted):
+    session = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    if session is None:
+        await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    # Stand-in for the async generator of runner.run_async being opened
+    await asyncio.sleep(0)
+    return time.perf_counter() - submitted
+
+
+def per_message_loop(service):
+    overheads, totals = [], []
+    for _ in range(TURNS):
+        submitted = time.perf_counter()
+        overheads.append(asyncio.run(start_turn(service, "s-run", submitted)))
+        totals.append(time.perf_counter() - submitted)
+    return overheads, totals
+
+
+def persistent_loop(service):
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    overheads, totals = [], []
+    for _ in range(TURNS):
+        submitted = time.perf_counter()
+        overheads.append(asyncio.run_coroutine_threadsafe(start_turn(service, "s-loop", submitted), loop).result())
+        totals.append(time.perf_counter() - submitted)
+    loop.call_soon_threadsafe(loop.stop)
+    return overheads, totals
+
+
+def report(name, overheads, totals):
+    ms = lambda values, q: statistics.quantiles(values, n=100)[q - 1] * 1000
+    print(f"{name:<22}{ms(overheads, 50):>12.3f}{ms(overheads, 95):>12.3f}{ms(totals, 50):>12.3f}{ms(totals, 95):>12.3f}")
+
+
+def main():
+    print(f"{TURNS} turns, milliseconds")
+    print(f"{'':<22}{'start p50':>12}{'start p95':>12}{'total p50':>12}{'total p95':>12}")
+    report("asyncio.run per turn", *per_message_loop(InMemorySessionService()))
+    report("persistent loop", *persistent_loop(InMemorySessionService()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Time and peak memory of writing a large Gantt chart (1,000 tasks over 3 years): the previous
+DataFrame + reload writer versus the streaming write-only writer in tools.gantt, and the streaming
+writer at each time scale (one column per day, week, month or quarter).
+
+Every run happens in a fresh process so its peak RSS is not inflated by earlier runs.
+
+Run from the project root:
+    python -m benchmarks.gantt_writer_bench
+"""
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TASKS = 1_000
+SPAN_DAYS = 3 * 365
+MAX_TASK_DAYS = 60
+
+
+def make_tasks(count=TASKS, span_days=SPAN_DAYS, seed=7):
+    rng = random.Random(seed)
+    first = date(2025, 1, 1)
+    tasks = []
+    for i in range(count):
+        start = rng.randrange(span_days - MAX_TASK_DAYS)
+        length = rng.randrange(1, MAX_TASK_DAYS)
+        tasks.append({"task": f"Task {i + 1} - workstream {i % 12}",
+                      "start_date": (first + timedelta(days=start)).isoformat(),
+                      "end_date": (first + timedelta(days=start + length - 1)).isoformat()})
+    # Pin the plan to the full span
+    tasks[0]["start_date"], tasks[-1]["end_date"] = first.isoformat(), (first + timedelta(days=span_days - 1)).isoformat()
+    return tasks
+
+
+def legacy_write_task_chart(tasks, excel_file):
+    import pandas as pd
+    import openpyxl
+    from openpyxl.styles import PatternFill, Alignment, Font
+    from openpyxl.worksheet.datavalidation import DataValidation
+
+    for t in tasks:
+        t["start_date"] = pd.to_datetime(t["start_date"])
+        t["end_date"] = pd.to_datetime(t["end_date"])
+    start_all = min(t["start_date"] for t in tasks)
+    end_all = max(t["end_date"] for t in tasks)
+    all_dates = pd.date_range(start_all, end_all)
+    columns = ["Task", "Start Date", "End Date", "Status"] + [d.strftime("%Y-%m-%d") for d in all_dates]
+    rows = [{"Task": t["task"], "Start Date": t["start_date"].strftime("%Y-%m-%d"),
+             "End Date": t["end_date"].strftime("%Y-%m-%d"), "Status": ""} for t in tasks]
+    pd.DataFrame(rows, columns=columns).to_excel(excel_file, index=False)
+
+    wb = openpyxl.load_workbook(excel_file)
+    ws = wb.active
+    colors = ["4F81BD", "C0504D", "9BBB59", "8064A2", "F79646", "2C4D75", "00B0F0", "92D050"]
+    font = Font(color="FFFFFF", bold=True)
+    align = Alignment(horizontal="center", vertical="center")
+    for row_idx, task in enumerate(tasks, start=2):
+        duration = (task["end_date"] - task["start_date"]).days + 1
+        start_col = (task["start_date"] - start_all).days + 5
+        end_col = start_col + duration - 1
+        fill = PatternFill(start_color=colors[(row_idx - 2) % 8], end_color=colors[(row_idx - 2) % 8], fill_type="solid")
+        ws.merge_cells(start_row=row_idx, start_column=start_col, end_row=row_idx, end_column=end_col)
+        cell = ws.cell(row=row_idx, column=start_col)
+        cell.value, cell.fill, cell.font, cell.alignment = task["task"], fill, font, align
+        for col in range(start_col, end_col + 1):
+            ws.cell(row=row_idx, column=col).fill = fill
+    dv = DataValidation(type="list", formula1='"In Progress,On Hold,Completed"', allow_blank=True)
+    dv.add(f"D2:D{len(tasks) + 1}")
+    ws.add_data_validation(dv)
+    for col in ws.columns:
+        width = max((len(str(cell.value)) for cell in col if cell.value), default=0)
+        ws.column_dimensions[col[0].column_letter].width = width + 2
+    wb.save(excel_file)
+
+
+def run(writer_name, scale, out):
+    from tools.gantt import write_task_chart
+    tasks = make_tasks()
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    path = os.path.join(tempfile.mkdtemp(), "chart.xlsx")
+    started = time.perf_counter()
+    if writer_name == "legacy":
+        legacy_write_task_chart(tasks, path)
+    else:
+        write_task_chart(tasks, path, scale)
+    out.put((time.perf_counter() - started, baseline_kb, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+             os.path.getsize(path)))
+
+
+def measure(ctx, writer_name, scale=None):
+    out = ctx.Queue()
+    process = ctx.Process(target=run, args=(writer_name, scale, out))
+    process.start()
+    result = out.get()
+    process.join()
+    return result
+
+
+def main():
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{TASKS} tasks over {SPAN_DAYS} days")
+    print(f"{'writer':<18}{'time s':>10}{'peak RSS MB':>14}{'RSS growth MB':>16}{'file KB':>10}")
+    for writer_name, scale in [("legacy", None), ("streaming", "day"), ("streaming", "week"),
+                               ("streaming", "month"), ("streaming", "quarter")]:
+        elapsed, baseline_kb, peak_kb, size = measure(ctx, writer_name, scale)
+        name = writer_name + (f" {scale}" if scale else "")
+        print(f"{name:<18}{elapsed:>10.2f}{peak_kb / 1024:>14.1f}{(peak_kb - baseline_kb) / 1024:>16.1f}{size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
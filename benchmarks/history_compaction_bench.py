@@ -0,0 +1,56 @@
+"""
+Prompt size per turn of a long simulated session, with and without history compaction.
+
+Every turn the user asks for a change, the agent saves a ~30k character BRD through save_report and
+replies. The request sent for the next turn is measured as the number of characters of its contents.
+
+Run from the project root:
+    python -m benchmarks.history_compaction_bench
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from google.genai import types
+
+from tools.history_compaction import compact_contents, _request_chars
+
+TURNS = 40
+BRD_CHARS = 30_000
+
+
+def turn_contents(turn: int) -> list:
+    brd = f"**1. Introduction (revision {turn})**\n" + ("The system shall support the approval workflow. " * 700)[:BRD_CHARS]
+    call_id = f"call-{turn}"
+    return [
+        types.Content(role="user", parts=[types.Part(text=f"Turn {turn}: please update the BRD to cover requirement #{turn}.")]),
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+            id=call_id, name="save_report", args={"report": brd}))]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            id=call_id, name="save_report", response={"result": f"Output/BRD_v{turn}.pdf"}))]),
+        types.Content(role="model", parts=[types.Part(text=f"I have updated the BRD and saved it as BRD_v{turn}.pdf.")]),
+    ]
+
+
+def main():
+    history = []
+    summary = None
+    print(f"{'turn':>5}{'raw chars':>12}{'compacted':>12}{'compact ms':>12}")
+    for turn in range(1, TURNS + 1):
+        history += turn_contents(turn)
+        request = history + [types.Content(role="user", parts=[types.Part(text="Next change, please.")])]
+        start = time.perf_counter()
+        compacted, new_summary, _ = compact_contents(request, summary)
+        elapsed = time.perf_counter() - start
+        if new_summary is not None:
+            summary = new_summary
+        if turn in (1, 2, 5, 10, 20, 30, 40):
+            print(f"{turn:>5}{_request_chars(request):>12,}{_request_chars(compacted):>12,}{elapsed * 1000:>12.2f}")
+    print(f"summary kept in state: {len(json.dumps(summary))} chars")
+
+
+if __name__ == "__main__":
+    main()
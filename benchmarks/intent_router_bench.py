@@ -0,0 +1,71 @@
+"""
+Accuracy, coverage and latency of the fast path intent classifier on labelled sample requests.
+
+Expected None means the request should fall back to the LLM router.
+
+Run from the project root:
+    python -m benchmarks.intent_router_bench
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.intent_router import classify_request
+
+RUNS = 1000
+
+# (message, session already has a BRD, expected sub-agent)
+SAMPLES = [
+    ("Create a business requirement document for a tool that allows HR to track employee skills, detect skill gaps, and suggest relevant courses using AI.", False, "BRDGeneratorAgent"),
+    ("Write a BRD for an internal leave approval tool integrated with our HRMS.", False, "BRDGeneratorAgent"),
+    ("I need a requirements document for the new vendor onboarding portal.", False, "BRDGeneratorAgent"),
+    ("Update the BRD to add a section on data retention and GDPR.", True, "BRDRevisionAgent"),
+    ("Please revise the document, the scope section is missing the mobile app.", True, "BRDRevisionAgent"),
+    ("Remove the reporting module from the BRD.", True, "BRDRevisionAgent"),
+    ("I want to generate a user manual for HR admins who use our SkillLoop platform.", False, "UserManualAgent"),
+    ("Draft a user guide for the expense claim app for employees.", False, "UserManualAgent"),
+    ("Please generate detailed use cases along with the acceptance criteria for the Skill Gap Analysis feature.", False, "UsecaseAcceptanceCriteriaAgent"),
+    ("Here is a user story: as a manager I want to approve leave from my phone. Give me acceptance criteria.", False, "UsecaseAcceptanceCriteriaAgent"),
+    ("Create a task chart to build and deploy the SkillLoop MVP: Requirement Gathering Aug 5 – Aug 7, UI/UX Design Aug 8 – Aug 12.", False, "TaskChartAgent"),
+    ("Make a gantt chart for the migration project.", False, "TaskChartAgent"),
+    ("Hi, what can you do?", False, None),
+    ("Create a BRD and a user manual for the leave tool.", False, "DocumentBatchAgent"),
+    ("Give me the full package of documents for the skills tracker.", False, "DocumentBatchAgent"),
+    ("Create a BRD for a leave tool, include use cases in scope.", False, None),
+    ("Update the BRD with the new integrations.", False, None),
+    ("The client needs an internal tool for automating leave approvals.", False, None),
+    # Naming a document without asking for one, questions and thanks go to the LLM router
+    ("What is a BRD?", False, None),
+    ("What's the difference between a BRD and a user manual?", False, None),
+    ("Can you explain what a gantt chart is?", False, None),
+    ("The BRD looks great, thank you", True, None),
+    ("How are use cases different from acceptance criteria", False, None),
+    ("Can you create a BRD for the leave tool?", False, None),
+    ("Explain the user manual sections to me.", False, None),
+]
+
+
+def main():
+    correct = routed = wrong_routes = 0
+    for text, has_brd, expected in SAMPLES:
+        agent, _ = classify_request(text, has_brd=has_brd)
+        correct += agent == expected
+        routed += agent is not None
+        wrong_routes += agent is not None and agent != expected
+        if agent != expected:
+            print(f"  expected {expected}, got {agent}: {text[:70]}")
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        for text, has_brd, _ in SAMPLES:
+            classify_request(text, has_brd=has_brd)
+    per_request_us = (time.perf_counter() - start) / (RUNS * len(SAMPLES)) * 1e6
+
+    print(f"{len(SAMPLES)} samples: {correct} as expected, {routed} routed locally, {wrong_routes} routed to the wrong agent")
+    print(f"classification: {per_request_us:.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark of markdown conversion over the stored documents in logs/brd_log.json.
+
+Compares the previous line-by-line regex converter with the single pass tokenizer, both for the
+tokenizer alone and for the full markdown -> flowables conversion.
+
+Run from the project root:
+    python -m benchmarks.markdown_tokenizer_bench
+"""
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
+
+from tools.markdown_tokens import tokenize
+from tools.pdf_renderer import get_styles, markdown_to_paragraphs
+from tools.html_renderer import tokens_to_html
+
+RUNS = 5
+
+
+def legacy_inline_to_html(text):
+    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
+    text = re.sub(r'__(.*?)__', r'<u>\1</u>', text)
+    return text
+
+
+def legacy_markdown_to_paragraphs(markdown_text, styles):
+    """
+    The converter used before the tokenizer, kept here as the baseline.
+    """
+    flowables = []
+    bullet_items = []
+    numbered_items = []
+    for line in markdown_text.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('####'):
+            flowables.append(Paragraph(f"<b>{line[4:].strip()}</b>", styles['MyHeading4']))
+        elif line.startswith('###'):
+            flowables.append(Paragraph(f"<b>{line[3:].strip()}</b>", styles['MyHeading3']))
+        elif line.startswith('##'):
+            flowables.append(Paragraph(f"<b>{line[2:].strip()}</b>", styles['MyHeading2']))
+        elif line.startswith('#'):
+            flowables.append(Paragraph(f"<b>{line[1:].strip()}</b>", styles['MyHeading1']))
+        elif line.startswith('- '):
+            bullet_items.append(Paragraph(legacy_inline_to_html(line[2:].strip()), styles['Normal']))
+        elif re.match(r'^\d+\.\s+', line):
+            numbered_items.append(Paragraph(legacy_inline_to_html(re.sub(r'^\d+\.\s+', '', line)), styles['Normal']))
+        elif line == "":
+            if bullet_items:
+                flowables.append(ListFlowable([ListItem(b, leftIndent=20) for b in bullet_items],
+                                              bulletType='bullet', start='-', leftIndent=20))
+                bullet_items = []
+            if numbered_items:
+                flowables.append(ListFlowable([ListItem(n, leftIndent=20) for n in numbered_items],
+                                              bulletType='1', leftIndent=20))
+                numbered_items = []
+            flowables.append(Spacer(1, 12))
+        else:
+            flowables.append(Paragraph(legacy_inline_to_html(line), styles['Normal']))
+    if bullet_items:
+        flowables.append(ListFlowable([ListItem(b, leftIndent=20) for b in bullet_items],
+                                      bulletType='bullet', start='-', leftIndent=20))
+    if numbered_items:
+        flowables.append(ListFlowable([ListItem(n, leftIndent=20) for n in numbered_items],
+                                      bulletType='1', leftIndent=20))
+    return flowables
+
+
+def legacy_line_scan(markdown_text):
+    """
+    Only the regex work of the legacy converter (no Paragraph construction), for a like-for-like
+    comparison with tokenize().
+    """
+    out = []
+    for line in markdown_text.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('#') or line == "":
+            out.append(line)
+        elif line.startswith('- '):
+            out.append(legacy_inline_to_html(line[2:].strip()))
+        elif re.match(r'^\d+\.\s+', line):
+            out.append(legacy_inline_to_html(re.sub(r'^\d+\.\s+', '', line)))
+        else:
+            out.append(legacy_inline_to_html(line))
+    return out
+
+
+def timed(fn, docs, runs=RUNS):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    log_path = os.path.join(os.path.dirname(__file__), '..', 'logs', 'brd_log.json')
+    with open(log_path, "r", encoding="utf-8") as f:
+        docs = [entry["brd_text"] for entry in json.load(f)]
+    styles = get_styles()
+    chars = sum(len(d) for d in docs)
+    print(f"{len(docs)} stored documents, {chars:,} chars, best of {RUNS} runs")
+
+    rows = [
+        ("legacy regex scan", timed(legacy_line_scan, docs)),
+        ("tokenize", timed(lambda d: list(tokenize(d)), docs)),
+        ("legacy -> flowables", timed(lambda d: legacy_markdown_to_paragraphs(d, styles), docs)),
+        ("tokens -> flowables", timed(lambda d: markdown_to_paragraphs(d, styles), docs)),
+        ("tokens -> html", timed(lambda d: tokens_to_html(tokenize(d)), docs)),
+    ]
+    for name, seconds in rows:
+        print(f"{name:<22}{seconds * 1000:>10.2f} ms{chars / seconds / 1e6:>10.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Compares full and incremental (section render cache) PDF rendering of a ~50 page BRD.
+
+Before timing, every stored BRD is rendered both ways and the two stories are compared flowable by
+flowable; the run fails when any document differs.
+
+Run from the project root:
+    python -m benchmarks.render_cache_bench
+"""
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table
+
+from tools.brd_sections import split_sections
+from tools.render_cache import SectionRenderCache
+from tools.pdf_renderer import PAGE_MARGINS, get_styles, markdown_to_paragraphs
+
+TARGET_PAGES = 50
+RUNS = 5
+LOG_PATH = os.path.join(os.path.dirname(__file__), '..', 'logs', 'brd_log.json')
+
+
+def build_pdf(story):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, **PAGE_MARGINS)
+    doc.build(story)
+    return doc.page
+
+
+def stored_brds():
+    with open(LOG_PATH, "r", encoding="utf-8") as f:
+        return [e["brd_text"] for e in json.load(f)]
+
+
+def signature(flowable):
+    """
+    What a flowable renders: its type, style, text and spacing, with list items and table cells
+    compared recursively.
+    """
+    if isinstance(flowable, Paragraph):
+        return ("Paragraph", flowable.style.name, flowable.text)
+    if isinstance(flowable, Spacer):
+        return ("Spacer", flowable.width, flowable.height)
+    if isinstance(flowable, Table):
+        return ("Table", [[signature(cell) if hasattr(cell, 'wrap') else cell for cell in row]
+                          for row in flowable._cellvalues])
+    children = getattr(flowable, '_flowables', None)
+    if isinstance(children, (list, tuple)):
+        return (type(flowable).__name__, [signature(child) for child in children])
+    return (type(flowable).__name__,)
+
+
+def flowables_in(story):
+    for flowable in story:
+        yield flowable
+        children = getattr(flowable, '_flowables', None)
+        if isinstance(children, (list, tuple)):
+            yield from flowables_in(children)
+        for row in getattr(flowable, '_cellvalues', None) or []:
+            yield from flowables_in(cell for cell in row if hasattr(cell, 'wrap'))
+
+
+def check_cached_equals_full(styles) -> bool:
+    """
+    Renders every stored BRD with and without the section render cache and reports the documents whose
+    stories differ, or whose story from cache hits shares a flowable (a list item or table cell
+    included) with an earlier story: ReportLab lays flowables out in place.
+    """
+    brds = stored_brds()
+    differing = []
+    for number, text in enumerate(brds):
+        cache = SectionRenderCache()
+        build_block = lambda block: markdown_to_paragraphs(block, styles)
+        full = [signature(f) for f in markdown_to_paragraphs(text, styles)]
+        first = cache.build_story(text, build_block)
+        second = cache.build_story(text, build_block)
+        shared = {id(f) for f in flowables_in(first)} & {id(f) for f in flowables_in(second)}
+        if full != [signature(f) for f in first] or full != [signature(f) for f in second] or shared:
+            differing.append(number)
+    print(f"cached == full render: {len(brds) - len(differing)} of {len(brds)} stored BRDs"
+          + (f", differing: {differing}" if differing else ""))
+    return not differing
+
+
+def make_long_brd(pages, styles):
+    """
+    Concatenates the sections of the longest stored BRD, renumbered, until the PDF reaches `pages` pages.
+    """
+    base = max(stored_brds(), key=len)
+    sections = [s for s in split_sections(base) if s["key"] != "0"]
+
+    parts = []
+    number = 0
+    while True:
+        for section in sections:
+            number += 1
+            body = section["text"].split('\n', 1)[1] if '\n' in section["text"] else ""
+            parts.append(f"**{number}. {section['title']}**\n{body}")
+        text = "\n\n".join(parts)
+        if build_pdf(markdown_to_paragraphs(text, styles)) >= pages:
+            return text
+
+
+def timed(fn, runs=RUNS):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    styles = get_styles()
+    if not check_cached_equals_full(styles):
+        sys.exit(1)
+    v1 = make_long_brd(TARGET_PAGES, styles)
+    # A one paragraph revision in the middle of the document
+    lines = v1.split('\n')
+    middle = next(i for i in range(len(lines) // 2, len(lines)) if lines[i].strip() and not lines[i].startswith('**'))
+    lines[middle] = lines[middle] + " This sentence was added by the revision."
+    v2 = "\n".join(lines)
+
+    cache = SectionRenderCache()
+    cache.build_story(v1, lambda block: markdown_to_paragraphs(block, styles))
+
+    def full_parse():
+        return markdown_to_paragraphs(v2, styles)
+
+    def incremental_parse():
+        return cache.build_story(v2, lambda block: markdown_to_paragraphs(block, styles))
+
+    pages = build_pdf(full_parse())
+    print(f"BRD: {len(v2):,} chars, {pages} pages")
+    t_full_parse = timed(full_parse)
+    t_inc_parse = timed(incremental_parse)
+    t_full_total = timed(lambda: build_pdf(full_parse()))
+    t_inc_total = timed(lambda: build_pdf(incremental_parse()))
+    print(f"{'':<14}{'parse (s)':>12}{'parse+build (s)':>18}")
+    print(f"{'full':<14}{t_full_parse:>12.4f}{t_full_total:>18.4f}")
+    print(f"{'incremental':<14}{t_inc_parse:>12.4f}{t_inc_total:>18.4f}")
+    print("cache:", cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Stress test for concurrent Gantt chart generation: N charts, each from its own task list, are
+allocated and written at the same time from several processes with several threads each, the way
+save_task_chart does it (reserve_versioned_path + write_task_chart). Every output is then opened and
+checked against the tasks it was generated from.
+
+For comparison the same load is run against one fixed task_chart.xlsx, the previous behaviour.
+
+Run from the project root:
+    python -m benchmarks.task_chart_stress [N]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHARTS = 64
+WORKERS = 8
+THREADS = 4
+
+
+def make_tasks(chart):
+    """
+    A small plan whose task names identify the chart it belongs to.
+    """
+    first = date(2025, 1, 1) + timedelta(days=chart)
+    return [{"task": f"Chart {chart} task {i + 1}",
+             "start_date": (first + timedelta(days=3 * i)).isoformat(),
+             "end_date": (first + timedelta(days=3 * i + 2)).isoformat()} for i in range(5 + chart % 7)]
+
+
+def generate(folder, chart, fixed):
+    from tools.gantt import write_task_chart
+    from tools.pdf_renderer import reserve_versioned_path
+    path = os.path.join(folder, "task_chart.xlsx") if fixed else reserve_versioned_path(folder, "task_chart", "xlsx")
+    write_task_chart(make_tasks(chart), path)
+    return chart, path
+
+
+def generate_many(folder, charts, fixed):
+    with ThreadPoolExecutor(THREADS) as threads:
+        return list(threads.map(lambda chart: generate(folder, chart, fixed), charts))
+
+
+def check(chart, path) -> str:
+    """
+    Returns what is wrong with the output of a chart, or "" when it holds exactly that chart's tasks.
+    """
+    import openpyxl
+    try:
+        ws = openpyxl.load_workbook(path, read_only=True).active
+        names = [row[0] for row in ws.iter_rows(min_row=2, max_col=1, values_only=True)]
+    except Exception as e:
+        return f"unreadable ({type(e).__name__})"
+    expected = [t["task"] for t in make_tasks(chart)]
+    return "" if names == expected else "holds another chart"
+
+
+def run(folder, charts, fixed, db_path):
+    os.makedirs(folder, exist_ok=True)
+    batches = [list(range(charts))[i::WORKERS] for i in range(WORKERS)]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(WORKERS, initializer=_use_db, initargs=(db_path,)) as pool:
+        results = [r for batch in pool.map(generate_many, [folder] * WORKERS, batches, [fixed] * WORKERS) for r in batch]
+    elapsed = time.perf_counter() - started
+
+    problems = {chart: check(chart, path) for chart, path in results}
+    leftovers = [f for f in os.listdir(folder) if f.endswith(".tmp")]
+    label = "fixed filename" if fixed else "versioned"
+    print(f"{label:<16}{elapsed:>8.2f}s{len({p for _, p in results}):>8} files"
+          f"{sum(1 for p in problems.values() if not p):>8} correct{len(leftovers):>6} temp files left")
+    for chart, problem in sorted(problems.items())[:5]:
+        if problem:
+            print(f"    chart {chart}: {problem}")
+    return not fixed and all(not p for p in problems.values()) and not leftovers and len(results) == charts
+
+
+def _use_db(db_path):
+    import logs.history_store as history_store
+    history_store.DB_PATH = db_path
+
+
+def main():
+    charts = int(sys.argv[1]) if len(sys.argv) > 1 else CHARTS
+    with tempfile.TemporaryDirectory() as tmp:
+        # Fresh history database so the stress test never touches the real version counters
+        db_path = os.path.join(tmp, "history.sqlite3")
+        print(f"{charts} charts from {WORKERS} processes x {THREADS} threads")
+        run(os.path.join(tmp, "Fixed"), charts, True, db_path)
+        ok = run(os.path.join(tmp, "Versioned"), charts, False, db_path)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
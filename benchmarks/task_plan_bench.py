@@ -0,0 +1,82 @@
+"""
+Time to read a task list and lay it out: the previous per-task pd.to_datetime conversion and offset
+loop versus TaskPlan (tools.task_plan), which parses all dates at once and computes offsets,
+durations, validation and slack/critical path as array operations.
+
+Run from the project root:
+    python -m benchmarks.task_plan_bench
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.task_plan import TaskPlan
+
+SIZES = [100, 1_000, 10_000]
+REPEATS = 3
+
+
+def make_tasks(count, seed=7):
+    """
+    A plan of parallel workstreams: every task depends on the previous task of its stream, with a gap of
+    a few days, and the last tasks of all streams feed a final milestone.
+    """
+    rng = random.Random(seed)
+    first = date(2025, 1, 1)
+    streams = max(1, count // 50)
+    stream_end = [first - timedelta(days=1)] * streams
+    tasks = []
+    for i in range(count - 1):
+        stream = i % streams
+        start = stream_end[stream] + timedelta(days=rng.randrange(1, 4))
+        end = start + timedelta(days=rng.randrange(0, 10))
+        task = {"task": f"Task {i + 1}", "start_date": start.isoformat(), "end_date": end.isoformat(), "id": f"T{i + 1}"}
+        if i >= streams:
+            task["depends_on"] = [f"T{i + 1 - streams}"]
+        tasks.append(task)
+        stream_end[stream] = end
+    last = max(stream_end) + timedelta(days=1)
+    tasks.append({"task": "Go-live", "start_date": last.isoformat(), "end_date": last.isoformat(), "id": "GO",
+                  "depends_on": [t["id"] for t in tasks[-streams:]], "milestone": True})
+    return tasks
+
+
+def legacy_layout(tasks):
+    import pandas as pd
+    starts = [pd.to_datetime(t["start_date"]) for t in tasks]
+    ends = [pd.to_datetime(t["end_date"]) for t in tasks]
+    start_all = min(starts)
+    return [((end - start).days + 1, (start - start_all).days) for start, end in zip(starts, ends)]
+
+
+def plan_layout(tasks):
+    plan = TaskPlan.from_tasks(tasks)
+    problems = plan.validate()
+    return plan.durations, plan.offsets(), plan.slack(), problems
+
+
+def best_of(fn, tasks):
+    times = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(tasks)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    print(f"{'tasks':>8}{'legacy layout s':>18}{'TaskPlan layout+slack s':>26}{'critical':>10}")
+    for size in SIZES:
+        tasks = make_tasks(size)
+        legacy = best_of(legacy_layout, tasks)
+        plan = best_of(plan_layout, tasks)
+        critical = int(TaskPlan.from_tasks(tasks).critical().sum())
+        print(f"{size:>8}{legacy:>18.3f}{plan:>26.3f}{critical:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cost of allocating the next versioned filename as an output folder grows: the old listdir + regex
+scan (get_next_filename) versus the counter in the history database (reserve_versioned_path).
+
+Also checks that concurrent allocations from several processes never hand out the same path.
+
+Run from the project root:
+    python -m benchmarks.version_alloc_bench
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+FOLDER_SIZES = [100, 1_000, 10_000, 30_000]
+ALLOCATIONS = 50
+WORKERS = 8
+PER_WORKER = 50
+
+
+def fill_folder(folder, count):
+    existing = len(os.listdir(folder))
+    for i in range(existing + 1, count + 1):
+        open(os.path.join(folder, f"BRD_v{i}.pdf"), "w").close()
+
+
+def time_allocations(allocate):
+    timings = []
+    for _ in range(ALLOCATIONS):
+        started = time.perf_counter()
+        allocate()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def reserve_many(folder):
+    from tools.pdf_renderer import reserve_versioned_path
+    return [reserve_versioned_path(folder, "bundle", "zip") for _ in range(PER_WORKER)]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Fresh history database so the benchmark never touches the real counters
+        import logs.history_store as history_store
+        history_store.DB_PATH = os.path.join(tmp, "history.sqlite3")
+        from tools.pdf_renderer import get_next_filename, reserve_versioned_path
+
+        folder = os.path.join(tmp, "Output")
+        os.makedirs(folder)
+        print(f"{'files':>8}{'scan p50 ms':>14}{'counter p50 ms':>16}")
+        for size in FOLDER_SIZES:
+            fill_folder(folder, size)
+            scan = time_allocations(lambda: get_next_filename(base_name="BRD", ext="pdf", folder=folder))
+            counter = time_allocations(lambda: os.remove(reserve_versioned_path(folder, "BRD", "pdf")))
+            print(f"{size:>8}{scan:>14.3f}{counter:>16.3f}")
+
+        bundles = os.path.join(tmp, "Bundles")
+        with ProcessPoolExecutor(WORKERS, initializer=_use_db, initargs=(history_store.DB_PATH,)) as pool:
+            paths = [p for batch in pool.map(reserve_many, [bundles] * WORKERS) for p in batch]
+        print(f"{len(paths)} concurrent allocations from {WORKERS} processes, {len(set(paths))} distinct paths")
+
+
+def _use_db(db_path):
+    import logs.history_store as history_store
+    history_store.DB_PATH = db_path
+
+
+if __name__ == "__main__":
+    main()
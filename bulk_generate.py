@@ -0,0 +1,189 @@
+"""
+Offline bulk document generation over a JSONL file of requirement briefs.
+
+Each line is a JSON object with the brief in "brief", "body", "prompt" or "text" (an optional "title"
+is prepended) and an id in "id" or "request_id" (the line number otherwise). Every brief runs through
+business_analyst_agent in its own session, at most --concurrency at a time, with retries and
+exponential backoff on model errors such as quota exhaustion.
+
+One line per finished brief is appended to the results manifest (--manifest) as soon as it
+completes, so an interrupted run resumes where it stopped: briefs already recorded as "ok" are
+skipped and everything else runs again. Artefacts are copied to --output-dir/<id>/.
+
+Usage:
+    python bulk_generate.py briefs.jsonl --concurrency 8 --manifest bulk_output/results.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from google.adk.runners import Runner
+from google.genai import types
+
+from agent import root_agent
+from batch_agent import wait_for_renders
+from logs.session_store import DurableSessionService
+from tools.artefacts import collect_artefacts
+from tools.render_pool import shutdown_render_pool
+from tools.tracing import setup_tracing
+
+APP_NAME = "bulk_generator"
+USER_ID = "bulk"
+# Client errors that a retry cannot fix
+NON_RETRYABLE_CODES = {400, 401, 403, 404}
+
+
+def read_briefs(path: str) -> list:
+    """
+    Returns [(brief id, brief text), ...] from a JSONL file, skipping blank lines.
+    """
+    briefs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = next((record[key] for key in ("brief", "body", "prompt", "text") if record.get(key)), "")
+            if record.get("title"):
+                text = f"{record['title']}\n\n{text}"
+            briefs.append((str(record.get("id") or record.get("request_id") or line_number), text))
+    return briefs
+
+
+def read_manifest(path: str) -> dict:
+    """
+    Returns the latest manifest record per brief id; later lines win, so a retried brief's newest
+    result is the one that counts.
+    """
+    results = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    results[record["id"]] = record
+    return results
+
+
+def append_manifest(path: str, record: dict):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def copy_artefacts(artefacts: list, folder: str):
+    os.makedirs(folder, exist_ok=True)
+    for artefact in artefacts:
+        if artefact["status"] == "done" and os.path.isfile(artefact["path"]):
+            artefact["copied_to"] = shutil.copy2(artefact["path"], folder)
+
+
+async def run_brief(runner: Runner, brief_id: str, text: str) -> tuple:
+    """
+    Runs one brief in a fresh session and returns (final response, artefacts).
+    """
+    session_id = f"bulk-{brief_id}"
+    service = runner.session_service
+    # A retry or a resumed run starts from a clean conversation
+    if await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id):
+        await service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+
+    final_response = ""
+    invocation_id = None
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id,
+                                        new_message=types.Content(role="user", parts=[types.Part(text=text)])):
+        invocation_id = event.invocation_id
+        if event.is_final_response() and event.content and event.content.parts:
+            final_response = "".join(p.text for p in event.content.parts if p.text) or final_response
+    await service.flush()
+
+    session = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    artefacts = collect_artefacts(session.events, invocation_id) if session and invocation_id else []
+    await wait_for_renders(artefacts)
+    return final_response, artefacts
+
+
+async def process_brief(runner, semaphore, brief_id, text, args, manifest_lock):
+    async with semaphore:
+        started = time.perf_counter()
+        record = {"id": brief_id, "status": "failed", "attempts": 0, "artefacts": [], "response": "", "error": None}
+        for attempt in range(1, args.retries + 2):
+            record["attempts"] = attempt
+            try:
+                response, artefacts = await asyncio.wait_for(run_brief(runner, brief_id, text), args.timeout)
+                copy_artefacts(artefacts, os.path.join(args.output_dir, brief_id))
+                failed = [a for a in artefacts if a["status"] != "done"]
+                record.update(response=response[:2000], artefacts=artefacts, error=None,
+                              status="ok" if artefacts and not failed else ("render_failed" if failed else "no_artefacts"))
+                break
+            except Exception as e:
+                record["error"] = repr(e)
+                if getattr(e, "code", None) in NON_RETRYABLE_CODES or attempt > args.retries:
+                    break
+                delay = min(args.max_backoff, args.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                print(f"⚠️ {brief_id}: attempt {attempt} failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        record["elapsed_s"] = round(time.perf_counter() - started, 2)
+
+    async with manifest_lock:
+        append_manifest(args.manifest, record)
+    print(f"{'✅' if record['status'] == 'ok' else '❌'} {brief_id}: {record['status']} "
+          f"({len(record['artefacts'])} artefacts, {record['elapsed_s']}s, {record['attempts']} attempts)")
+    return record
+
+
+async def run_bulk(args) -> dict:
+    briefs = read_briefs(args.briefs)
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    done = read_manifest(args.manifest)
+    pending = [(brief_id, text) for brief_id, text in briefs if done.get(brief_id, {}).get("status") != "ok"]
+    print(f"{len(briefs)} briefs, {len(briefs) - len(pending)} already done, {len(pending)} to run "
+          f"with concurrency {args.concurrency}")
+
+    setup_tracing()
+    runner = Runner(agent=root_agent, app_name=APP_NAME, session_service=DurableSessionService())
+    semaphore = asyncio.Semaphore(args.concurrency)
+    manifest_lock = asyncio.Lock()
+    started = time.perf_counter()
+    records = await asyncio.gather(*(process_brief(runner, semaphore, brief_id, text, args, manifest_lock)
+                                     for brief_id, text in pending))
+    summary = {status: sum(r["status"] == status for r in records) for status in {r["status"] for r in records}}
+    print(f"Finished {len(records)} briefs in {time.perf_counter() - started:.1f}s: {summary}")
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate documents for every brief in a JSONL file.")
+    parser.add_argument("briefs", help="JSONL file of requirement briefs")
+    parser.add_argument("--concurrency", type=int, default=4, help="briefs running at the same time")
+    parser.add_argument("--retries", type=int, default=3, help="retries per brief after a failure")
+    parser.add_argument("--backoff", type=float, default=5.0, help="first retry delay in seconds, doubled per retry")
+    parser.add_argument("--max-backoff", type=float, default=120.0, help="longest retry delay in seconds")
+    parser.add_argument("--timeout", type=float, default=900.0, help="seconds allowed per attempt")
+    parser.add_argument("--output-dir", default="bulk_output", help="artefacts are copied to OUTPUT_DIR/<id>/")
+    parser.add_argument("--manifest", default=None, help="results manifest (default OUTPUT_DIR/results.jsonl)")
+    args = parser.parse_args(argv)
+    args.manifest = args.manifest or os.path.join(args.output_dir, "results.jsonl")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        summary = asyncio.run(run_bulk(args))
+    finally:
+        shutdown_render_pool()
+    return 0 if set(summary) <= {"ok"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+LOGS_DIR = os.path.abspath(os.path.dirname(__file__))
+DB_PATH = os.path.join(LOGS_DIR, "brd_history.sqlite3")
+LEGACY_LOG_PATH = os.path.join(LOGS_DIR, "brd_log.json")
+
+# Matches the versioned filenames written by the save_* tools, e.g. BRD_v4.pdf, user_manual_v1.pdf
+_VERSIONED_NAME = re.compile(r"([A-Za-z_]+?)_v(\d+)\.\w+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    doc_type TEXT NOT NULL,
+    session_id TEXT,
+    version INTEGER,
+    pdf TEXT,
+    content_hash TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_type ON records (doc_type);
+CREATE INDEX IF NOT EXISTS idx_records_type_session ON records (doc_type, session_id);
+CREATE INDEX IF NOT EXISTS idx_records_type_version ON records (doc_type, version);
+CREATE TABLE IF NOT EXISTS artefacts (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    job_id TEXT,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artefacts_kind_hash ON artefacts (kind, content_hash);
+CREATE TABLE IF NOT EXISTS versions (
+    series TEXT PRIMARY KEY,
+    last_version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_local = threading.local()
+
+
+def parse_versioned_name(path):
+    """
+    Returns (doc_type, version) for a versioned output filename, or (None, None) if it does not match.
+    Handles both POSIX and Windows style paths since the legacy log contains both.
+    """
+    name = re.split(r"[\\/]", path or "")[-1]
+    match = _VERSIONED_NAME.match(name)
+    if not match:
+        return None, None
+    return match.group(1), int(match.group(2))
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _connect(db_path=None):
+    db_path = db_path or DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _import_legacy_log(conn)
+        connections[db_path] = conn
+    return conn
+
+
+def _import_legacy_log(conn, legacy_path=None):
+    """
+    One-time import of the old rewrite-everything brd_log.json into the history table.
+    The import is recorded in the meta table so it never runs twice, even across processes.
+    """
+    legacy_path = legacy_path or LEGACY_LOG_PATH
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute("SELECT value FROM meta WHERE key = 'legacy_import'").fetchone()
+        if done is None:
+            entries = []
+            if os.path.exists(legacy_path):
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            for entry in entries:
+                doc_type, version = parse_versioned_name(entry.get("pdf"))
+                text = entry.get("brd_text", "")
+                conn.execute(
+                    "INSERT INTO records (timestamp, doc_type, session_id, version, pdf, content_hash, text) "
+                    "VALUES (?, ?, NULL, ?, ?, ?, ?)",
+                    (entry.get("timestamp", ""), doc_type or "BRD", version,
+                     entry.get("pdf"), content_hash(text), text),
+                )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_import', ?)",
+                (json.dumps({"source": legacy_path, "records": len(entries)}),),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def append_record(doc_type, pdf, text, session_id=None, version=None, db_path=None):
+    """
+    Appends one generated document to the history. Existing records are never rewritten.
+
+    Returns:
+        int: The id of the new record.
+    """
+    if version is None:
+        _, version = parse_versioned_name(pdf)
+    conn = _connect(db_path)
+    cursor = conn.execute(
+        "INSERT INTO records (timestamp, doc_type, session_id, version, pdf, content_hash, text) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (datetime.now().strftime("%Y-%m-%d %H:%M"), doc_type, session_id, version,
+         pdf, content_hash(text), text),
+    )
+    return cursor.lastrowid
+
+
+def get_latest(doc_type, session_id=None, db_path=None):
+    """
+    Returns the most recent record of a document type as a dict, or None if there is none.
+    When session_id is given only that session's records are considered.
+    """
+    conn = _connect(db_path)
+    if session_id is None:
+        row = conn.execute(
+            "SELECT * FROM records WHERE doc_type = ? ORDER BY id DESC LIMIT 1",
+            (doc_type,),
+        ).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT * FROM records WHERE doc_type = ? AND session_id = ? ORDER BY id DESC LIMIT 1",
+            (doc_type, session_id),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def get_version(doc_type, version, session_id=None, db_path=None):
+    """
+    Returns the latest record saved for a specific document version, or None.
+    """
+    conn = _connect(db_path)
+    if session_id is None:
+        row = conn.execute(
+            "SELECT * FROM records WHERE doc_type = ? AND version = ? ORDER BY id DESC LIMIT 1",
+            (doc_type, version),
+        ).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT * FROM records WHERE doc_type = ? AND version = ? AND session_id = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (doc_type, version, session_id),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def index_artefact(kind, content_hash, path, job_id=None, db_path=None):
+    """
+    Records that the artefact at path was rendered from input with content_hash. A path holds one
+    artefact at a time, so re-rendering a path replaces its previous entry.
+    """
+    conn = _connect(db_path)
+    conn.execute(
+        "INSERT OR REPLACE INTO artefacts (path, kind, content_hash, job_id, timestamp) VALUES (?, ?, ?, ?, ?)",
+        (path, kind, content_hash, job_id, datetime.now().strftime("%Y-%m-%d %H:%M")),
+    )
+
+
+def find_artefacts(kind, content_hash, db_path=None):
+    """
+    Returns the artefacts of a kind rendered from input with content_hash, newest first.
+    """
+    conn = _connect(db_path)
+    rows = conn.execute(
+        "SELECT * FROM artefacts WHERE kind = ? AND content_hash = ? ORDER BY rowid DESC",
+        (kind, content_hash),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def allocate_version(series, seed, db_path=None):
+    """
+    Returns the next version number of a series of versioned files (e.g. ".../Output/BRD_vN.pdf").
+    The counter is incremented in one transaction, so concurrent callers in any thread or process
+    never get the same number.
+
+    Args:
+        series: key of the series.
+        seed: called once, when the series is first used, to return the highest version that
+            already exists on disk.
+    """
+    conn = _connect(db_path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT last_version FROM versions WHERE series = ?", (series,)).fetchone()
+        version = (row["last_version"] if row else seed()) + 1
+        conn.execute("INSERT OR REPLACE INTO versions (series, last_version) VALUES (?, ?)", (series, version))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return version
@@ -1,6 +1,50 @@
-import json
+import threading
+from collections import OrderedDict
 
-def load_prevBRD_version():
-    with open("logs/brd_log.json",'r') as f:
-        data=json.load(f)
-    return data[-1]['brd_text']
+from logs.history_store import get_latest, get_version
+
+# Saved BRD versions never change, so their texts are kept in a small LRU cache
+BRD_VERSION_CACHE_SIZE = 32
+_brd_versions = OrderedDict()
+_brd_versions_lock = threading.Lock()
+
+
+def load_prevBRD_version(session_id=None):
+    record = get_latest("BRD", session_id=session_id)
+    return record["text"] if record else ""
+
+
+def load_BRD_version(session_id, version):
+    """
+    Returns the text of a specific BRD version saved in a session, or None. Found versions are kept in
+    a small LRU cache keyed by (session_id, version); misses are not cached, since the version may be
+    saved later.
+    """
+    key = (session_id, version)
+    with _brd_versions_lock:
+        if key in _brd_versions:
+            _brd_versions.move_to_end(key)
+            return _brd_versions[key]
+    record = get_version("BRD", version, session_id=session_id)
+    if record is None:
+        return None
+    with _brd_versions_lock:
+        _brd_versions[key] = record["text"]
+        while len(_brd_versions) > BRD_VERSION_CACHE_SIZE:
+            _brd_versions.popitem(last=False)
+    return record["text"]
+
+
+def resolve_BRD_for_session(session_id, version=None):
+    """
+    Resolves the BRD a revision in this session should start from: the version recorded in the
+    session state if there is one, else the session's latest BRD, else "" so the revision agent asks
+    for one. BRDs of other sessions are never used. Without a session (a direct call) the latest BRD
+    overall is returned.
+    """
+    if version is not None:
+        text = load_BRD_version(session_id, version)
+        if text is not None:
+            return text
+    record = get_latest("BRD", session_id=session_id)
+    return record["text"] if record else ""
@@ -0,0 +1,392 @@
+"""
+ADK session service backed by SQLite, used in place of InMemorySessionService.
+
+Sessions, their events and the app/user scoped state are stored in logs/sessions.sqlite3 (WAL mode),
+so a conversation survives a restart and any process pointed at the same file can resume it.
+
+- Recently used sessions are kept in a bounded LRU cache. Sessions idle for SESSION_CACHE_TTL seconds
+  are dropped from memory and reloaded from the database on their next use, so memory stays flat
+  however many sessions accumulate.
+- Writes go through the cache: create/delete and app/user state changes are written immediately,
+  events are buffered and appended in one transaction when SESSION_EVENT_BATCH events are pending,
+  when an agent gives its final response, or on flush().
+- get_session() compares the cached copy against the stored update time, so a session continued by
+  another replica is reloaded instead of served stale, and append_event() raises StaleSessionError
+  for a session copy older than the stored one instead of overwriting what was written since.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.errors import StaleSessionError
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from pydantic_core import to_jsonable_python
+
+LOGS_DIR = os.path.abspath(os.path.dirname(__file__))
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", os.path.join(LOGS_DIR, "sessions.sqlite3"))
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", 256))
+SESSION_CACHE_TTL = float(os.environ.get("SESSION_CACHE_TTL", 30 * 60))
+SESSION_EVENT_BATCH = int(os.environ.get("SESSION_EVENT_BATCH", 16))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_update ON sessions (app_name, update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+_local = threading.local()
+
+
+def _connect(db_path):
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        connections[db_path] = conn
+    return conn
+
+
+def _dumps(value) -> str:
+    return json.dumps(to_jsonable_python(value, fallback=str))
+
+
+def split_state(state: dict) -> dict:
+    """
+    Splits a state dict into its "app", "user" and "session" parts, stripping the scope prefixes.
+    temp: keys are never stored.
+    """
+    parts = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            parts["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            parts["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            parts["session"][key] = value
+    return parts
+
+
+def _light_copy(session: Session) -> Session:
+    copied = session.model_copy(deep=False)
+    copied.events = list(session.events)
+    copied.state = dict(session.state)
+    return copied
+
+
+class DurableSessionService(BaseSessionService):
+    """
+    SQLite backed session service with a write-through in-memory cache. See the module docstring.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, cache_size: int = SESSION_CACHE_SIZE,
+                 cache_ttl: float = SESSION_CACHE_TTL, event_batch: int = SESSION_EVENT_BATCH):
+        self.db_path = db_path or SESSION_DB_PATH
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.event_batch = event_batch
+        # (app_name, user_id, session_id) -> {"session", "stored_update_time", "last_used"}
+        self._cache = OrderedDict()
+        # Events appended but not written yet: [(key, event), ...]
+        self._pending = []
+        self._flush_lock = asyncio.Lock()
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions": 0, "flushes": 0, "events_written": 0}
+        _connect(self.db_path)
+
+    # ---- database side (runs in worker threads) ----
+
+    def _db_create(self, key, state, now):
+        conn = _connect(self.db_path)
+        try:
+            conn.execute("INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (*key, _dumps(state), now, now))
+        except sqlite3.IntegrityError:
+            raise AlreadyExistsError(f"Session with id {key[2]} already exists.")
+
+    def _db_update_time(self, key):
+        row = _connect(self.db_path).execute(
+            "SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key).fetchone()
+        return row["update_time"] if row else None
+
+    def _db_load(self, key):
+        conn = _connect(self.db_path)
+        row = conn.execute("SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                           key).fetchone()
+        if row is None:
+            return None, None
+        events = [Event.model_validate_json(r["data"]) for r in conn.execute(
+            "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? ORDER BY seq", key)]
+        session = Session(app_name=key[0], user_id=key[1], id=key[2], state=json.loads(row["state"]),
+                          events=events, last_update_time=row["update_time"])
+        return session, row["update_time"]
+
+    def _db_scoped_state(self, app_name, user_id):
+        conn = _connect(self.db_path)
+        app_row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        user_row = conn.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                                (app_name, user_id)).fetchone()
+        return (json.loads(app_row["state"]) if app_row else {},
+                json.loads(user_row["state"]) if user_row else {})
+
+    def _db_merge_scoped_state(self, app_name, user_id, app_delta, user_delta):
+        conn = _connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            app_state, user_state = self._db_scoped_state(app_name, user_id)
+            if app_delta:
+                app_state.update(app_delta)
+                conn.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)",
+                             (app_name, _dumps(app_state)))
+            if user_delta:
+                user_state.update(user_delta)
+                conn.execute("INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                             (app_name, user_id, _dumps(user_state)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _db_write_events(self, batch, session_rows):
+        """
+        Appends a batch of events and updates the state/update time of their sessions in one transaction.
+        """
+        conn = _connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO events (app_name, user_id, session_id, id, timestamp, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [(*key, event.id, event.timestamp, event.model_dump_json(exclude_none=True)) for key, event in batch])
+            conn.executemany(
+                "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                [(state, update_time, *key) for key, (state, update_time) in session_rows.items()])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _db_delete(self, key):
+        conn = _connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key)
+            conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _db_list(self, app_name, user_id):
+        conn = _connect(self.db_path)
+        if user_id is None:
+            rows = conn.execute("SELECT * FROM sessions WHERE app_name = ? ORDER BY update_time", (app_name,))
+        else:
+            rows = conn.execute("SELECT * FROM sessions WHERE app_name = ? AND user_id = ? ORDER BY update_time",
+                                (app_name, user_id))
+        return [dict(row) for row in rows]
+
+    # ---- cache ----
+
+    def _remember(self, key, session, stored_update_time):
+        self._cache[key] = {"session": session, "stored_update_time": stored_update_time, "last_used": time.time()}
+        self._cache.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        """
+        Drops sessions idle for longer than cache_ttl, then the least recently used ones above
+        cache_size. Sessions with unwritten events stay until they are flushed.
+        """
+        pending = {key for key, _ in self._pending}
+        cutoff = time.time() - self.cache_ttl
+        for key in [k for k, entry in self._cache.items() if entry["last_used"] < cutoff and k not in pending]:
+            del self._cache[key]
+            self.stats["evictions"] += 1
+        for key in list(self._cache):
+            if len(self._cache) <= self.cache_size:
+                break
+            if key not in pending:
+                del self._cache[key]
+                self.stats["evictions"] += 1
+
+    async def _cached_session(self, key) -> Optional[Session]:
+        entry = self._cache.get(key)
+        if entry is not None and not any(k == key for k, _ in self._pending):
+            stored = await asyncio.to_thread(self._db_update_time, key)
+            if stored is None:
+                # Deleted by another process
+                del self._cache[key]
+                return None
+            if stored != entry["stored_update_time"]:
+                self.stats["reloads"] += 1
+                entry = None
+        if entry is not None:
+            self.stats["hits"] += 1
+            entry["last_used"] = time.time()
+            self._cache.move_to_end(key)
+            self._evict()
+            return entry["session"]
+
+        self.stats["misses"] += 1
+        session, stored = await asyncio.to_thread(self._db_load, key)
+        if session is None:
+            return None
+        self._remember(key, session, stored)
+        return session
+
+    async def _with_scoped_state(self, session: Session) -> Session:
+        app_state, user_state = await asyncio.to_thread(self._db_scoped_state, session.app_name, session.user_id)
+        for name, value in app_state.items():
+            session.state[State.APP_PREFIX + name] = value
+        for name, value in user_state.items():
+            session.state[State.USER_PREFIX + name] = value
+        return session
+
+    # ---- BaseSessionService ----
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        key = (app_name, user_id, session_id)
+        parts = split_state(state)
+        now = time.time()
+        await asyncio.to_thread(self._db_create, key, parts["session"], now)
+        if parts["app"] or parts["user"]:
+            await asyncio.to_thread(self._db_merge_scoped_state, app_name, user_id, parts["app"], parts["user"])
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=parts["session"],
+                          last_update_time=now)
+        self._remember(key, session, now)
+        return await self._with_scoped_state(_light_copy(session))
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        session = await self._cached_session((app_name, user_id, session_id.strip()))
+        if session is None:
+            return None
+        copied = _light_copy(session)
+        if config:
+            if config.num_recent_events is not None:
+                copied.events = copied.events[-config.num_recent_events:] if config.num_recent_events else []
+            if config.after_timestamp is not None:
+                copied.events = [e for e in copied.events if e.timestamp >= config.after_timestamp]
+        return await self._with_scoped_state(copied)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        await self.flush()
+        sessions = []
+        for row in await asyncio.to_thread(self._db_list, app_name, user_id):
+            session = Session(app_name=app_name, user_id=row["user_id"], id=row["id"],
+                              state=json.loads(row["state"]), last_update_time=row["update_time"])
+            sessions.append(await self._with_scoped_state(session))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id.strip())
+        self._pending = [(k, event) for k, event in self._pending if k != key]
+        self._cache.pop(key, None)
+        await asyncio.to_thread(self._db_delete, key)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> dict[str, Any]:
+        _, user_state = await asyncio.to_thread(self._db_scoped_state, app_name, user_id)
+        return user_state
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        stored = await self._cached_session(key)
+        if stored is None:
+            raise ValueError(f"Session {session.id} not found.")
+        # A copy older than the stored session would overwrite events and state written since
+        if stored.last_update_time > session.last_update_time:
+            raise StaleSessionError(
+                f"Session {session.id} was updated at {stored.last_update_time}, after the copy being appended to "
+                f"({session.last_update_time}). Reload the session and try again.")
+
+        # The returned event has its temp: state delta trimmed, and is the one persisted
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        if stored is not session:
+            stored.events.append(event)
+            stored.last_update_time = event.timestamp
+
+        if event.actions and event.actions.state_delta:
+            parts = split_state(event.actions.state_delta)
+            stored.state.update(parts["session"])
+            if parts["app"] or parts["user"]:
+                await asyncio.to_thread(self._db_merge_scoped_state, session.app_name, session.user_id,
+                                        parts["app"], parts["user"])
+
+        self._pending.append((key, event))
+        if len(self._pending) >= self.event_batch or event.is_final_response():
+            await self.flush()
+        return event
+
+    async def flush(self) -> None:
+        """
+        Writes the buffered events, and the current state of their sessions, in one transaction.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            session_rows = {}
+            for key, event in batch:
+                entry = self._cache.get(key)
+                if entry is not None:
+                    session = entry["session"]
+                    session_rows[key] = (_dumps(split_state(session.state)["session"]), session.last_update_time)
+            try:
+                await asyncio.to_thread(self._db_write_events, batch, session_rows)
+            except BaseException:
+                self._pending = batch + self._pending
+                raise
+            for key, (_, update_time) in session_rows.items():
+                if key in self._cache:
+                    self._cache[key]["stored_update_time"] = update_time
+            self.stats["flushes"] += 1
+            self.stats["events_written"] += len(batch)
+
+    def cache_stats(self) -> dict:
+        return dict(self.stats, cached_sessions=len(self._cache), pending_events=len(self._pending))
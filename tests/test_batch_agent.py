@@ -0,0 +1,52 @@
+import asyncio
+import json
+import zipfile
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+import batch_agent
+from batch_agent import build_batch_agent
+
+BRIEFS_SEEN = {}
+
+
+class RecordingAgent(BaseAgent):
+    """
+    Stands in for a document agent and records the brief it would have read.
+    """
+    disallow_transfer_to_parent: bool = False
+    disallow_transfer_to_peers: bool = False
+
+    async def _run_async_impl(self, ctx) -> AsyncGenerator[Event, None]:
+        BRIEFS_SEEN[self.name] = ctx.session.state.get("ba_output")
+        return
+        yield
+
+
+def test_batch_uses_the_current_request_not_the_previous_brief(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_agent, "BUNDLE_FOLDER", str(tmp_path))
+    BRIEFS_SEEN.clear()
+    agents = [RecordingAgent(name=name) for name in batch_agent.select_batch_documents("all documents")]
+    runner = Runner(agent=build_batch_agent(agents), app_name="test", session_service=InMemorySessionService())
+    request = "Create a BRD and a user manual for the leave tool"
+
+    async def run():
+        # Left over from an earlier turn, e.g. a task chart the fast path routed
+        session = await runner.session_service.create_session(
+            app_name="test", user_id="u", state={"ba_output": "Gantt chart for the migration",
+                                                 "batch_documents": ["TaskChartAgent"]})
+        message = types.Content(role="user", parts=[types.Part(text=request)])
+        async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+            pass
+        return await runner.session_service.get_session(app_name="test", user_id="u", session_id=session.id)
+
+    session = asyncio.run(run())
+    assert BRIEFS_SEEN == {"BatchBRDGeneratorAgent": request, "BatchUserManualAgent": request}
+    with zipfile.ZipFile(session.state["last_bundle"]["path"]) as bundle:
+        assert json.loads(bundle.read("manifest.json"))["brief"] == request
+    assert session.state["batch_documents"] is None
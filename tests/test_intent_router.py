@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from tools.intent_router import BATCH_AGENT, classify_request, route_request, select_batch_documents
+
+
+@pytest.mark.parametrize("text, has_brd, expected", [
+    ("Write a BRD for an internal leave approval tool integrated with our HRMS.", False, "BRDGeneratorAgent"),
+    ("I need a requirements document for the new vendor onboarding portal.", False, "BRDGeneratorAgent"),
+    ("Update the BRD to add a section on data retention and GDPR.", True, "BRDRevisionAgent"),
+    ("Draft a user guide for the expense claim app for employees.", False, "UserManualAgent"),
+    ("Please generate detailed use cases along with the acceptance criteria for the login flow.", False,
+     "UsecaseAcceptanceCriteriaAgent"),
+    ("Make a gantt chart for the migration project.", False, "TaskChartAgent"),
+    ("Create a BRD and a user manual for the leave tool.", False, BATCH_AGENT),
+    ("Give me the full package of documents for the skills tracker.", False, BATCH_AGENT),
+])
+def test_clear_document_requests_take_the_fast_path(text, has_brd, expected):
+    assert classify_request(text, has_brd=has_brd)[0] == expected
+
+
+@pytest.mark.parametrize("text, has_brd", [
+    # Questions about documents
+    ("What is a BRD?", False),
+    ("What's the difference between a BRD and a user manual?", False),
+    ("Can you explain what a gantt chart is?", False),
+    ("How are use cases different from acceptance criteria", False),
+    ("Can you create a BRD for the leave tool?", False),
+    # Mentions without a request
+    ("The BRD looks great, thank you", True),
+    ("Our old user manual was too long.", False),
+    ("Hi, what can you do?", False),
+    # Ambiguous or impossible routes
+    ("Update the BRD with the new integrations.", False),
+    ("Create a BRD for a leave tool, include use cases in scope.", False),
+    ("The client needs an internal tool for automating leave approvals.", False),
+])
+def test_everything_else_falls_back_to_the_llm_router(text, has_brd):
+    assert classify_request(text, has_brd=has_brd)[0] is None
+
+
+def test_batch_documents_follow_the_request():
+    assert select_batch_documents("Create a BRD and a gantt chart") == ["BRDGeneratorAgent", "TaskChartAgent"]
+    assert len(select_batch_documents("Create all the documents for the portal")) == 4
+
+
+def routing_call(text, state=None):
+    context = SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=text)]),
+                              state=dict(state or {}), invocation_id="inv")
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+    return route_request(context, request), context.state
+
+
+def test_route_request_transfers_and_fills_in_the_brief():
+    response, state = routing_call("Create a BRD and a user manual for the leave tool")
+    call = response.content.parts[0].function_call
+    assert (call.name, call.args) == ("transfer_to_agent", {"agent_name": BATCH_AGENT})
+    assert state["ba_output"] == "Create a BRD and a user manual for the leave tool"
+    assert state["batch_documents"] == ["BRDGeneratorAgent", "UserManualAgent"]
+
+
+def test_route_request_lets_questions_reach_the_model():
+    response, state = routing_call("What is a BRD?")
+    assert response is None
+    assert "ba_output" not in state
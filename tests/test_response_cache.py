@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from tools import response_cache
+
+
+class ScriptedModel(BaseLlm):
+    """
+    Saves a user manual on the first call of a turn and confirms once the tool has answered.
+    """
+    model: str = "scripted"
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        last = llm_request.contents[-1]
+        if any(part.function_response for part in last.parts):
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="saved")]))
+            return
+        call = types.FunctionCall(name="save_user_manual", args={"report": f"# Manual {self.calls}\n\nbody"})
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "CACHE_DB_PATH", str(tmp_path / "response_cache.sqlite3"))
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE", True)
+    return tmp_path
+
+
+@pytest.fixture
+def manual_runner(cache_db):
+    def save_user_manual(report: str) -> str:
+        path = cache_db / f"user_manual_v{len(os.listdir(cache_db))}.pdf"
+        path.write_text(report)
+        return str(path)
+
+    model = ScriptedModel()
+    agent = Agent(name="UserManualAgent", model=model, instruction="Write a user manual.", tools=[save_user_manual],
+                  before_agent_callback=response_cache.serve_cached_response,
+                  after_agent_callback=response_cache.store_response,
+                  on_model_error_callback=response_cache.discard_pending_response)
+    return Runner(agent=agent, app_name="test", session_service=InMemorySessionService()), model
+
+
+def run_turns(runner, session_id, messages) -> list:
+    """
+    Sends messages in one session and returns, per turn, the cached artefact served or None.
+    """
+    async def run():
+        await runner.session_service.create_session(app_name="test", user_id="u", session_id=session_id)
+        served = []
+        for message in messages:
+            cached = None
+            async for event in runner.run_async(user_id="u", session_id=session_id,
+                                                new_message=types.Content(role="user", parts=[types.Part(text=message)])):
+                cached = (event.actions.state_delta or {}).get("cached_artefact", cached)
+            served.append(cached)
+        return served
+
+    return asyncio.run(run())
+
+
+def test_same_follow_up_in_two_sessions_is_not_shared(manual_runner):
+    runner, model = manual_runner
+    first = run_turns(runner, "a", ["Create a user manual for the HR portal", "yes, go ahead"])
+    calls = model.calls
+    second = run_turns(runner, "b", ["Create a user manual for the billing app", "Yes, go ahead."])
+
+    assert first == [None, None]
+    assert second == [None, None]
+    assert model.calls == calls + 4
+
+
+def test_identical_conversation_is_served_from_cache(manual_runner):
+    runner, model = manual_runner
+    run_turns(runner, "a", ["Create a user manual for the HR portal", "yes, go ahead"])
+    calls = model.calls
+    served = run_turns(runner, "b", ["create a user manual  for the HR portal.", "Yes, go ahead"])
+
+    assert all(entry and entry["agent"] == "UserManualAgent" for entry in served)
+    assert model.calls == calls
+
+
+def test_cache_key_depends_on_earlier_user_turns_and_brief():
+    key = response_cache.cache_key("UserManualAgent", "v1", "m", ["Manual for HR", "yes"], "")
+    assert key == response_cache.cache_key("UserManualAgent", "v1", "m", [" manual  for hr.", "YES"], "")
+    assert key != response_cache.cache_key("UserManualAgent", "v1", "m", ["Manual for billing", "yes"], "")
+    assert key != response_cache.cache_key("UserManualAgent", "v1", "m", ["yes"], "")
+    assert key != response_cache.cache_key("UserManualAgent", "v1", "m", ["Manual for HR", "yes"], "HR portal brief")
+    assert key != response_cache.cache_key("UsecaseAcceptanceCriteriaAgent", "v1", "m", ["Manual for HR", "yes"], "")
+
+
+def test_entries_expire_after_the_agent_ttl(cache_db, monkeypatch):
+    artefact = cache_db / "task_chart_v1.xlsx"
+    artefact.write_text("chart")
+    response_cache.store("k", "TaskChartAgent", "m", "save_task_chart", "[]", str(artefact))
+    assert response_cache.lookup("k", "TaskChartAgent")["path"] == str(artefact)
+
+    now = time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + response_cache.ttl_for("TaskChartAgent") + 1)
+    assert response_cache.lookup("k", "TaskChartAgent") is None
+    # The expired entry is deleted, not just skipped
+    monkeypatch.setattr(response_cache.time, "time", lambda: now)
+    assert response_cache.lookup("k", "TaskChartAgent") is None
+
+
+def test_ttl_can_be_overridden_per_agent(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_TTL_UserManualAgent", "60")
+    assert response_cache.ttl_for("UserManualAgent") == 60
+    assert response_cache.ttl_for("TaskChartAgent") == 24 * 3600
+
+
+def test_entries_whose_artefact_is_gone_are_dropped(cache_db):
+    artefact = cache_db / "user_manual_v1.pdf"
+    artefact.write_text("manual")
+    response_cache.store("k", "UserManualAgent", "m", "save_user_manual", "# Manual", str(artefact))
+    artefact.unlink()
+    assert response_cache.lookup("k", "UserManualAgent") is None
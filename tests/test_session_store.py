@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+from google.adk.errors import StaleSessionError
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from logs.session_store import DurableSessionService
+
+KEY = {"app_name": "test", "user_id": "u"}
+
+
+def event(text, state_delta=None, author="user"):
+    return Event(invocation_id="inv", author=author, timestamp=time.time(),
+                 content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+                 actions=EventActions(state_delta=state_delta or {}))
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+
+    async def first_process():
+        service = DurableSessionService(db_path=db_path)
+        session = await service.create_session(**KEY, session_id="s1", state={"user:name": "Ana"})
+        await service.append_event(session, event("Write a BRD", {"ba_output": "Write a BRD"}))
+        await service.append_event(session, event("saved", {"last_brd_version": 1}, author="BRDGeneratorAgent"))
+        await service.flush()
+
+    async def second_process():
+        service = DurableSessionService(db_path=db_path)
+        return await service.get_session(**KEY, session_id="s1"), await service.list_sessions(**KEY)
+
+    asyncio.run(first_process())
+    session, listed = asyncio.run(second_process())
+    assert [e.content.parts[0].text for e in session.events] == ["Write a BRD", "saved"]
+    assert session.state == {"ba_output": "Write a BRD", "last_brd_version": 1, "user:name": "Ana"}
+    assert [s.id for s in listed.sessions] == ["s1"]
+
+
+def test_buffered_events_are_written_on_flush(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+
+    async def run():
+        service = DurableSessionService(db_path=db_path, event_batch=10)
+        session = await service.create_session(**KEY, session_id="s1")
+        # A tool call is not a final response, so it stays buffered
+        call = types.Part(function_call=types.FunctionCall(name="save_report", args={}))
+        await service.append_event(session, Event(invocation_id="inv", author="BRDGeneratorAgent",
+                                                  content=types.Content(role="model", parts=[call])))
+        reader = DurableSessionService(db_path=db_path)
+        before = len((await reader.get_session(**KEY, session_id="s1")).events)
+        await service.flush()
+        reader = DurableSessionService(db_path=db_path)
+        return before, len((await reader.get_session(**KEY, session_id="s1")).events)
+
+    assert asyncio.run(run()) == (0, 1)
+
+
+def test_temp_state_is_not_persisted(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+
+    async def run():
+        service = DurableSessionService(db_path=db_path)
+        session = await service.create_session(**KEY, session_id="s1")
+        await service.append_event(session, event("hi", {"temp:scratch": 1, "kept": 2}))
+        assert session.state["temp:scratch"] == 1
+        await service.flush()
+        return await DurableSessionService(db_path=db_path).get_session(**KEY, session_id="s1")
+
+    session = asyncio.run(run())
+    assert session.state == {"kept": 2}
+    assert session.events[0].actions.state_delta == {"kept": 2}
+
+
+def test_appending_to_a_stale_copy_is_rejected(tmp_path):
+    async def run():
+        service = DurableSessionService(db_path=str(tmp_path / "sessions.sqlite3"))
+        await service.create_session(**KEY, session_id="s1")
+        first = await service.get_session(**KEY, session_id="s1")
+        second = await service.get_session(**KEY, session_id="s1")
+        await service.append_event(first, event("one"))
+        with pytest.raises(StaleSessionError):
+            await service.append_event(second, event("two"))
+        return await service.get_session(**KEY, session_id="s1")
+
+    session = asyncio.run(run())
+    assert [e.content.parts[0].text for e in session.events] == ["one"]
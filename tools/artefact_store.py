@@ -0,0 +1,89 @@
+"""
+Bytes of generated artefacts for the download buttons of the Streamlit app.
+
+The app hands st.download_button a callable (see download_data) instead of the file contents, so a
+rerun reads nothing; the file is only read when its button is clicked. Artefacts up to
+ARTEFACT_CACHE_MAX_FILE_BYTES are then kept in a bounded LRU store keyed by path, mtime and size, so
+downloading an unchanged file again is served from memory and a re-rendered file is read afresh.
+Larger artefacts are read on every click and never held in the store.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from tools.tracing import set_span_attributes, span
+
+ARTEFACT_CACHE_MAX_BYTES = int(os.environ.get("ARTEFACT_CACHE_MAX_BYTES", 64_000_000))
+ARTEFACT_CACHE_MAX_FILE_BYTES = int(os.environ.get("ARTEFACT_CACHE_MAX_FILE_BYTES", 8_000_000))
+
+
+class ArtefactByteStore:
+    """
+    Bounded LRU cache of file contents keyed by (path, mtime_ns, size). Entries are evicted least
+    recently used first once max_bytes is exceeded; files over max_file_bytes are never cached.
+    """
+
+    def __init__(self, max_bytes: int = ARTEFACT_CACHE_MAX_BYTES, max_file_bytes: int = ARTEFACT_CACHE_MAX_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, path: str) -> bytes:
+        with span("app.read_artefact", path=os.path.basename(path)):
+            data = self._read(path)
+            set_span_attributes(bytes_read=len(data))
+        return data
+
+    def _read(self, path: str) -> bytes:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                set_span_attributes(cached=True)
+                return data
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        if len(data) <= self.max_file_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    # A re-rendered file replaces the entry of its previous contents
+                    for stale in [k for k in self._entries if k[0] == key[0]]:
+                        self._bytes -= len(self._entries.pop(stale))
+                    self._entries[key] = data
+                    self._bytes += len(data)
+                    self._evict()
+        return data
+
+    def _evict(self):
+        while self._entries and self._bytes > self.max_bytes:
+            _, data = self._entries.popitem(last=False)
+            self._bytes -= len(data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"files": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+artefact_store = ArtefactByteStore()
+
+
+def download_data(path: str):
+    """
+    Zero-argument callable for st.download_button(data=...) that reads path when the button is clicked.
+    """
+    return lambda: artefact_store.read(path)
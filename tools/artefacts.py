@@ -0,0 +1,62 @@
+"""
+Finds the artefacts (PDFs, Gantt charts, bundles) an agent run produced, one event at a time.
+
+ARTEFACT_TOOLS maps each save_* tool to the kind of file it returns. event_artefacts() looks at a
+single event once, so handling a turn is linear in its events, and reports every artefact in it:
+tool responses, documents served from the response cache (state['cached_artefact']) and batch
+bundles (state['last_bundle']). Artefact dicts look like
+    {"agent", "tool", "kind", "path", "job_id"}
+where job_id is set when the file is still being rendered in the background (see tools.render_jobs).
+"""
+from tools.intent_router import BATCH_AGENT_PREFIX
+
+# Tool name -> kind of artefact its response points to
+ARTEFACT_TOOLS = {
+    "save_report": "pdf",
+    "save_revised_sections": "pdf",
+    "save_user_manual": "pdf",
+    "save_usecase_acceptance_criteria": "pdf",
+    "save_task_chart": "excel",
+}
+MIME_TYPES = {
+    "pdf": "application/pdf",
+    "excel": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "bundle": "application/zip",
+}
+
+
+def _artefact(agent, tool, kind, path, job_id=None) -> dict:
+    return {"agent": agent.removeprefix(BATCH_AGENT_PREFIX), "tool": tool, "kind": kind, "path": path, "job_id": job_id}
+
+
+def event_artefacts(event) -> list:
+    """
+    Returns the artefacts reported by one event, in order.
+    """
+    artefacts = []
+    for part in (event.content.parts if event.content else None) or []:
+        response = part.function_response
+        if not response or response.name not in ARTEFACT_TOOLS:
+            continue
+        result = response.response
+        if isinstance(result, dict) and isinstance(result.get("result"), str):
+            artefacts.append(_artefact(event.author, response.name, ARTEFACT_TOOLS[response.name],
+                                       result["result"], result.get("job_id")))
+
+    state_delta = event.actions.state_delta if event.actions else None
+    if state_delta:
+        cached = state_delta.get("cached_artefact")
+        if cached:
+            artefacts.append(_artefact(cached["agent"], cached["tool"], ARTEFACT_TOOLS[cached["tool"]], cached["path"]))
+        bundle = state_delta.get("last_bundle")
+        if bundle:
+            artefacts.append(_artefact(event.author, None, "bundle", bundle["path"]))
+    return artefacts
+
+
+def collect_artefacts(events, invocation_id: str, kinds=None) -> list:
+    """
+    Returns the artefacts produced during an invocation, optionally only those of the given kinds.
+    """
+    return [artefact for event in events if event.invocation_id == invocation_id
+            for artefact in event_artefacts(event) if kinds is None or artefact["kind"] in kinds]
@@ -0,0 +1,172 @@
+"""
+Async variants of the document tools in tools.tools. They share the tool names and arguments the
+prompts refer to, but run PDF and Excel rendering in the render process pool so a large document
+never blocks the event loop that runner.run_async is driving.
+
+With RENDER_IN_BACKGROUND=1 (the default) the tools do not wait for the render at all: they queue a
+job in tools.render_jobs and return its id, and the UI polls the job until the file is ready. Scripts
+without the UI (agent.py, bulk_generate.py) wait for their jobs before they exit.
+"""
+import json
+import os
+from google.adk.tools import ToolContext
+
+from tools.brd_sections import split_sections, join_sections, patch_sections
+from tools.gantt import write_task_chart
+from tools.pdf_renderer import DOC_TYPES, build_markdown_pdf, discard_placeholder, reserve_output_path
+from tools.render_jobs import submit_job
+from tools.render_pool import run_render_job
+from logs.history_store import content_hash, index_artefact
+from tools.tools import (find_rendered_artefact, get_session_id, get_task_chart_path, load_base_brd,
+                         record_saved_document, task_chart_hash, task_chart_scale, task_plan_problems,
+                         write_brd_text_copy, write_revision_diff)
+
+
+RENDER_IN_BACKGROUND = os.environ.get("RENDER_IN_BACKGROUND", "1") == "1"
+
+
+async def render_document(kind: str, output_path: str, fn, args, tool_context=None, digest=None) -> dict:
+    """
+    Renders an artefact with fn(*args) in the render pool, either waiting for it or, in background
+    mode, queueing it as a render job. With digest, the content hash of the input, the artefact is
+    added to the index find_rendered_artefact looks in.
+
+    Returns:
+        dict: 'result' holds the artefact path; background jobs also carry 'job_id' and 'status'.
+    """
+    if RENDER_IN_BACKGROUND:
+        job_id = submit_job(kind, output_path, fn, *args, session_id=get_session_id(tool_context))
+        if digest:
+            index_artefact(kind, digest, output_path, job_id=job_id)
+        return {"result": output_path, "job_id": job_id, "status": "queued"}
+    try:
+        await run_render_job(kind, fn, *args)
+    except BaseException:
+        # The worker may have died before its atomic_output could remove the reserved file
+        discard_placeholder(output_path)
+        raise
+    if digest:
+        index_artefact(kind, digest, output_path)
+    return {"result": output_path}
+
+
+async def render_markdown_pdf_async(doc_type: str, text: str, tool_context=None) -> dict:
+    digest = content_hash(text)
+    existing = find_rendered_artefact(doc_type, digest)
+    if existing:
+        print("Identical document already rendered:", existing["result"])
+        return existing
+    output_path = reserve_output_path(doc_type)
+    return await render_document(doc_type, output_path, build_markdown_pdf,
+                                 (output_path, text, DOC_TYPES[doc_type]["theme"]), tool_context, digest)
+
+
+async def save_report(report: str, tool_context: ToolContext = None) -> dict:
+    """
+    Converts a BRD (Business Requirement Document) string into a formatted PDF file 
+    and saves it with an auto-incremented versioned filename (e.g., brd_v1.pdf, brd_v2.pdf, etc.).
+
+    Args:
+        report (str): The full text content of the BRD to be included in the PDF.
+        tool_context (ToolContext): Injected by ADK; used to tag the history record with the session.
+
+    Returns:
+        dict: 'result' holds the file path of the PDF document; when it is rendered in the background
+        'status' is 'queued' and 'job_id' identifies the render job.
+    """
+    write_brd_text_copy(report)
+    response = await render_markdown_pdf_async("BRD", report, tool_context)
+    record_saved_document(response["result"], report, "BRD", tool_context)
+    return response
+
+
+async def save_revised_sections(sections: str, tool_context: ToolContext = None) -> dict:
+    """
+    Patches revised sections into the session's current BRD, saves the result as a new BRD version
+    and writes a machine readable section diff next to the PDF (e.g. BRD_v3.diff.json). When the
+    patched BRD is identical to a version already saved, that version is returned and its diff kept.
+
+    Args:
+        sections (str): JSON object mapping section number to the full revised section text, heading
+            line included. A new number adds a section and an empty string removes one.
+        tool_context (ToolContext): Injected by ADK; used to find the session's current BRD.
+
+    Returns:
+        dict: 'result' holds the file path of the PDF document; when it is rendered in the background
+        'status' is 'queued' and 'job_id' identifies the render job.
+    """
+    revised = json.loads(sections)
+    base_version = tool_context.state.get("last_brd_version") if tool_context is not None else None
+    before = split_sections(load_base_brd(tool_context))
+    after = patch_sections(before, revised)
+
+    response = await save_report(join_sections(after), tool_context)
+    # A deduplicated save is an earlier version, whose diff describes the revision that created it
+    if not response.get("deduplicated"):
+        write_revision_diff(response["result"], base_version, before, after)
+    return response
+
+
+async def save_user_manual(report: str, tool_context: ToolContext = None) -> dict:
+    """
+    Converts a user manual report string into a formatted PDF file 
+    and saves it with an auto-incremented versioned filename (e.g., user_manual_v1.pdf, user_manual_v2.pdf, etc.).
+
+    Args:
+        report (str): The full text content of the user manual to be included in the PDF.
+        tool_context (ToolContext): Injected by ADK; used to tag the history record with the session.
+
+    Returns:
+        dict: 'result' holds the file path of the PDF document; when it is rendered in the background
+        'status' is 'queued' and 'job_id' identifies the render job.
+    """
+    response = await render_markdown_pdf_async("user_manual", report, tool_context)
+    record_saved_document(response["result"], report, "user_manual", tool_context)
+    return response
+
+
+async def save_usecase_acceptance_criteria(report: str, tool_context: ToolContext = None) -> dict:
+    """
+    Converts a Use Case and Acceptance Criteria string into a formatted PDF file 
+    and saves it with an auto-incremented versioned filename (e.g., use_case_v1.pdf, use_case_v2.pdf, etc.).
+
+    Args:
+        report (str): The full text content of the Use Case and Acceptance Criteria to be included in the PDF.
+        tool_context (ToolContext): Injected by ADK; used to tag the history record with the session.
+
+    Returns:
+        dict: 'result' holds the file path of the PDF document; when it is rendered in the background
+        'status' is 'queued' and 'job_id' identifies the render job.
+    """
+    response = await render_markdown_pdf_async("Usecase", report, tool_context)
+    record_saved_document(response["result"], report, "Usecase", tool_context)
+    return response
+
+
+async def save_task_chart(tasks: str, scale: str = "auto", tool_context: ToolContext = None) -> dict:
+    """
+    Converts a string representation of a list of tasks with start and end dates into a formatted Excel Gantt chart.
+    Args:
+        tasks (str): JSON string representation of the tasks.
+        scale (str): Column time scale: "day", "week", "month", "quarter" or "auto" to fit the plan's span.
+        tool_context (ToolContext): Injected by ADK; used to tag the render job with the session.
+    Returns:
+        dict: 'result' holds the file path of the Gantt chart Excel file; when it is rendered in the
+        background 'status' is 'queued' and 'job_id' identifies the render job. Tasks that cannot be
+        charted (cycles, unknown dependencies, ends before starts) return only an 'error' message.
+    """
+    tasks = json.loads(tasks)
+    problems = task_plan_problems(tasks)
+    if problems:
+        return {"error": problems}
+    scale = task_chart_scale(scale)
+    digest = task_chart_hash(tasks, scale)
+    existing = find_rendered_artefact("task_chart", digest)
+    if existing:
+        print("Identical Gantt chart already saved to:", existing["result"])
+        return existing
+    excel_file = get_task_chart_path()
+    response = await render_document("task_chart", excel_file, write_task_chart, (tasks, excel_file, scale),
+                                     tool_context, digest)
+    print("Gantt chart", response.get("status", "saved"), "to:", excel_file)
+    return response
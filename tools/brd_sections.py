@@ -0,0 +1,103 @@
+import difflib
+import hashlib
+import re
+from typing import Dict, List
+
+# Top level numbered headings as the agents write them, e.g. "**3. Business Objectives**" or "## 3. Scope".
+# Sub headings such as "**5.1 In Scope**" and plain numbered list items stay inside their parent section.
+SECTION_HEADING = re.compile(r'^(?:#{1,4}\s*)?\*\*(\d+)\.\s+(.+?)\*\*\s*$|^#{1,4}\s*(\d+)\.\s+(.+?)\s*$')
+
+PREAMBLE_KEY = "0"
+
+
+def split_sections(markdown_text: str) -> List[Dict[str, str]]:
+    """
+    Splits a BRD into its top level numbered sections.
+
+    Returns:
+        list: Dicts with 'key' (the section number as a string), 'title' and 'text' (the heading line
+        and its body). Anything before the first numbered heading is returned under key '0'.
+    """
+    sections = []
+    current = {"key": PREAMBLE_KEY, "title": "Preamble", "lines": []}
+    for line in markdown_text.strip().split('\n'):
+        match = SECTION_HEADING.match(line.strip())
+        if match:
+            if current["lines"] or current["key"] != PREAMBLE_KEY:
+                sections.append(current)
+            key = match.group(1) or match.group(3)
+            title = match.group(2) or match.group(4)
+            current = {"key": key, "title": title.strip(), "lines": [line]}
+        else:
+            current["lines"].append(line)
+    sections.append(current)
+
+    return [
+        {"key": s["key"], "title": s["title"], "text": "\n".join(s["lines"]).strip("\n")}
+        for s in sections
+        if s["key"] != PREAMBLE_KEY or "\n".join(s["lines"]).strip()
+    ]
+
+
+def join_sections(sections: List[Dict[str, str]]) -> str:
+    return "\n\n".join(s["text"] for s in sections if s["text"].strip())
+
+
+def outline(sections: List[Dict[str, str]]) -> str:
+    """
+    Returns one line per section ("3. Business Objectives") for use in the revision instruction.
+    """
+    return "\n".join(
+        f"{s['key']}. {s['title']}" if s["key"] != PREAMBLE_KEY else f"{PREAMBLE_KEY}. {s['title']} (title block before section 1)"
+        for s in sections
+    )
+
+
+def _section_sort_key(key: str):
+    return (0, int(key)) if key.isdigit() else (1, key)
+
+
+def patch_sections(sections: List[Dict[str, str]], revised: Dict[str, str]) -> List[Dict[str, str]]:
+    """
+    Applies revised section texts to the split document. A key that already exists is replaced,
+    a new key is inserted in numeric order and an empty text removes the section.
+    """
+    patched = {s["key"]: dict(s) for s in sections}
+    for key, text in revised.items():
+        key = str(key).strip().rstrip('.')
+        text = (text or "").strip("\n")
+        if not text.strip():
+            patched.pop(key, None)
+            continue
+        match = SECTION_HEADING.match(text.split('\n', 1)[0].strip())
+        title = (match.group(2) or match.group(4)).strip() if match else patched.get(key, {}).get("title", "")
+        patched[key] = {"key": key, "title": title, "text": text}
+    return sorted(patched.values(), key=lambda s: _section_sort_key(s["key"]))
+
+
+def section_diff(before: List[Dict[str, str]], after: List[Dict[str, str]]) -> List[Dict]:
+    """
+    Machine readable per-section diff between two split documents. Unchanged sections are omitted.
+    """
+    before_map = {s["key"]: s for s in before}
+    after_map = {s["key"]: s for s in after}
+    changes = []
+    for key in sorted(set(before_map) | set(after_map), key=_section_sort_key):
+        old = before_map.get(key)
+        new = after_map.get(key)
+        old_text = old["text"] if old else ""
+        new_text = new["text"] if new else ""
+        if old_text == new_text:
+            continue
+        status = "added" if old is None else "removed" if new is None else "modified"
+        changes.append({
+            "section": key,
+            "title": (new or old)["title"],
+            "status": status,
+            "before_hash": hashlib.sha256(old_text.encode("utf-8")).hexdigest() if old else None,
+            "after_hash": hashlib.sha256(new_text.encode("utf-8")).hexdigest() if new else None,
+            "unified_diff": list(difflib.unified_diff(
+                old_text.split('\n'), new_text.split('\n'),
+                fromfile=f"section {key} (before)", tofile=f"section {key} (after)", lineterm="")),
+        })
+    return changes
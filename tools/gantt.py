@@ -0,0 +1,236 @@
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Alignment, Font, Border, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.formatting.rule import FormulaRule
+
+from tools.pdf_renderer import atomic_output
+from tools.task_plan import TaskPlan
+from tools.tracing import set_span_attributes, span
+
+HEADER = ["Task", "Start Date", "End Date", "Status"]
+STATUS_COLUMN = 4  # Column D
+STATUS_OPTIONS = '"In Progress,On Hold,Completed"'
+# Status -> fill colour applied by conditional formatting
+STATUS_COLORS = {"In Progress": "F8FF00", "On Hold": "00F7FF", "Completed": "92D050"}
+TASK_COLORS = [
+    "4F81BD", "C0504D", "9BBB59", "8064A2",
+    "F79646", "2C4D75", "00B0F0", "92D050"
+]
+
+# Time scale of the chart columns; "auto" picks the finest scale that fits in GANTT_MAX_COLUMNS
+GANTT_SCALE = os.environ.get("GANTT_SCALE", "auto")
+GANTT_MAX_COLUMNS = int(os.environ.get("GANTT_MAX_COLUMNS", 120))
+# Scale -> (pandas period frequency, header label format)
+SCALES = {
+    "day": ("D", "%Y-%m-%d"),
+    "week": ("W-SUN", "%G-W%V"),
+    "month": ("M", "%Y-%m"),
+    "quarter": ("Q", "%Y-Q{q}"),
+}
+# Share of a bucket a bar must cover to get a given tint of its colour; partial buckets are lighter
+PARTIAL_SHADES = ((1.0, 1.0), (0.75, 0.75), (0.5, 0.55), (0.0, 0.35))
+
+_thin = Side(style="thin")
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(left=_thin, right=_thin, top=_thin, bottom=_thin)
+HEADER_ALIGN = Alignment(horizontal="center", vertical="top")
+BAR_FONT = Font(color="FFFFFF", bold=True)
+BAR_ALIGN = Alignment(horizontal="center", vertical="center")
+# Task names on the critical path are set in this font when the plan has dependencies
+CRITICAL_FONT = Font(color="C00000", bold=True)
+MILESTONE_MARK = "◆ "
+
+
+def _styled_cell(ws, value=None, fill=None, font=None, alignment=None, border=None):
+    cell = WriteOnlyCell(ws, value=value)
+    if fill is not None:
+        cell.fill = fill
+    if font is not None:
+        cell.font = font
+    if alignment is not None:
+        cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    return cell
+
+
+def choose_scale(first_day, last_day, scale=None) -> str:
+    """
+    Returns the requested scale, or for "auto" the finest one whose column count fits GANTT_MAX_COLUMNS.
+    """
+    first_day, last_day = pd.Timestamp(first_day), pd.Timestamp(last_day)
+    scale = (scale or GANTT_SCALE).lower()
+    if scale != "auto":
+        if scale not in SCALES:
+            raise ValueError(f"Unknown Gantt scale {scale!r}, expected auto or one of {', '.join(SCALES)}")
+        return scale
+    for name, (freq, _) in SCALES.items():
+        buckets = (last_day.to_period(freq) - first_day.to_period(freq)).n + 1
+        if buckets <= GANTT_MAX_COLUMNS:
+            return name
+    return "quarter"
+
+
+def bucket_layout(plan: TaskPlan, scale):
+    """
+    Maps the tasks of a plan onto the columns of a scale.
+
+    Returns:
+        (header labels of the buckets, first bucket index per task, coverage per task) where coverage
+        is an array with the share (0-1] of each bucket of the bar that the task covers.
+    """
+    freq, label = SCALES[scale]
+    periods = pd.period_range(pd.Period(plan.first_day, freq), pd.Period(plan.last_day, freq), freq=freq)
+    bucket_start = periods.start_time.normalize().values.astype("datetime64[D]").astype(np.int64)
+    bucket_end = periods.end_time.normalize().values.astype("datetime64[D]").astype(np.int64)
+    day_starts = plan.starts.astype(np.int64)
+    day_ends = plan.ends.astype(np.int64)
+    first = np.searchsorted(bucket_end, day_starts)
+    last = np.searchsorted(bucket_end, day_ends)
+    labels = [p.strftime(label).replace("{q}", str(p.quarter)) for p in periods]
+    if not len(first):
+        return labels, [], []
+
+    # One entry per (task, bucket of its bar), all bars laid end to end. The bucket index steps by one
+    # within a bar and jumps from the last bucket of a bar to the first of the next one, so it is the
+    # cumulative sum of a difference array of ones with those jumps at the bar boundaries.
+    lengths = last - first + 1
+    bar_starts = np.cumsum(lengths) - lengths
+    steps = np.ones(int(lengths.sum()), dtype=np.int64)
+    steps[0] = first[0]
+    steps[bar_starts[1:]] = first[1:] - last[:-1]
+    buckets = np.cumsum(steps)
+    tasks = np.repeat(np.arange(len(first)), lengths)
+
+    bar_end, bar_start = bucket_end[buckets], bucket_start[buckets]
+    covered = np.minimum(day_ends[tasks], bar_end) - np.maximum(day_starts[tasks], bar_start) + 1
+    shares = covered / (bar_end - bar_start + 1)
+    return labels, first.tolist(), np.split(shares, bar_starts[1:])
+
+
+def shade(color: str, coverage: float) -> str:
+    """
+    Task colour mixed with white according to how much of the bucket the task covers.
+    """
+    strength = next(strength for threshold, strength in PARTIAL_SHADES if coverage >= threshold)
+    channels = [int(color[i:i + 2], 16) for i in (0, 2, 4)]
+    return "".join(f"{round(255 - (255 - c) * strength):02X}" for c in channels)
+
+
+def column_widths(names, start_cols, header) -> dict:
+    """
+    Width of every column: its longest value plus 2, like auto-sizing over the finished sheet. The
+    only values in the day columns are the header dates and the task names written into the first
+    cell of each bar.
+    """
+    widths = {col: len(str(value)) for col, value in enumerate(header, start=1)}
+    widths[1] = max([widths[1]] + [len(name) for name in names])
+    widths[2] = widths[3] = max(widths[2], widths[3], 10)
+    for name, col in zip(names, start_cols):
+        widths[col] = max(widths[col], len(name))
+    return {col: width + 2 for col, width in widths.items()}
+
+
+def write_task_chart(tasks: list, excel_file: str, scale: str = None) -> str:
+    """
+    Writes the Gantt chart for a list of {"task", "start_date", "end_date"} dicts to excel_file.
+    Kept free of ADK imports so it can run in the render process pool.
+
+    The tasks are read into a TaskPlan (see tools.task_plan), which may also give ids, dependencies and
+    milestones: milestones are marked with a diamond and, when the plan has dependencies, the names of
+    the tasks on the critical path are set in red.
+
+    scale is "day", "week", "month", "quarter" or "auto" (default GANTT_SCALE); one column per bucket
+    follows Task, Start Date, End Date and Status. A bar bucket the task only partly covers gets a
+    lighter shade of the task colour.
+
+    The sheet is streamed in one pass with openpyxl's write-only mode: column widths are computed up
+    front, each row is written once and the file is never re-opened, so time and memory grow with the
+    number of filled cells rather than with tasks x buckets. The workbook is saved to a temporary file
+    that is renamed over excel_file.
+    """
+    with span("gantt.write", tasks=len(tasks)):
+        # Readers see either the previous file or the finished chart, never a partly written one
+        with atomic_output(excel_file) as tmp_path:
+            _write_task_chart(tasks, tmp_path, scale)
+        set_span_attributes(bytes_written=os.path.getsize(excel_file))
+    return excel_file
+
+
+def _write_task_chart(tasks: list, path: str, scale: str = None):
+    plan = TaskPlan.from_tasks(tasks)
+    names = [MILESTONE_MARK + name if milestone else name for name, milestone in zip(plan.names, plan.milestones)]
+    critical = plan.critical() if plan.has_dependencies else np.zeros(len(plan), dtype=bool)
+
+    scale = choose_scale(plan.first_day, plan.last_day, scale)
+    set_span_attributes(scale=scale)
+    labels, first_buckets, coverage = bucket_layout(plan, scale)
+    start_cols = [b + len(HEADER) + 1 for b in first_buckets]
+    header = HEADER + labels
+    last_row = len(tasks) + 1
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    # Widths have to be set before the first row is written. Day charts size bar columns to the task
+    # names like before; coarser charts keep their columns narrow and let the names overflow.
+    widths = column_widths(names, start_cols if scale == "day" else [], header)
+    for col, width in widths.items():
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    ws.append([_styled_cell(ws, value, font=HEADER_FONT, alignment=HEADER_ALIGN, border=HEADER_BORDER)
+               for value in header])
+
+    fills = {}
+
+    def fill_for(color, share):
+        key = (color, next(t for t, _ in PARTIAL_SHADES if share >= t))
+        if key not in fills:
+            shaded = shade(color, share)
+            fills[key] = PatternFill(start_color=shaded, end_color=shaded, fill_type="solid")
+        return fills[key]
+
+    start_strings = np.datetime_as_string(plan.starts, unit="D")
+    end_strings = np.datetime_as_string(plan.ends, unit="D")
+    for i, (name, start_col, shares) in enumerate(zip(names, start_cols, coverage)):
+        row_idx = i + 2
+        color = TASK_COLORS[i % len(TASK_COLORS)]
+        duration = len(shares)
+        # A bar of whole buckets is merged into one labelled block; with partial buckets the cells keep
+        # their own shades and the name overflows from the first one
+        merged = duration > 1 and bool((shares >= 1).all())
+        # Status and the buckets before the bar stay empty; the bar is the task name followed by filled cells
+        row = [_styled_cell(ws, name, font=CRITICAL_FONT) if critical[i] else name,
+               str(start_strings[i]), str(end_strings[i])] + [None] * (start_col - len(HEADER))
+        row.append(_styled_cell(ws, name, fill=fill_for(color, shares[0]), font=BAR_FONT,
+                                alignment=BAR_ALIGN if merged or duration == 1 else None))
+        row.extend(_styled_cell(ws, fill=fill_for(color, share)) for share in shares[1:])
+        ws.append(row)
+        if merged:
+            # Write-only sheets have no merge_cells(); the ranges are written after the rows on save
+            ws.merged_cells.add(f"{get_column_letter(start_col)}{row_idx}:"
+                                f"{get_column_letter(start_col + duration - 1)}{row_idx}")
+
+    # Dropdown for the Status column
+    status_letter = get_column_letter(STATUS_COLUMN)
+    status_range = f"{status_letter}2:{status_letter}{last_row}"
+    dv = DataValidation(type="list", formula1=STATUS_OPTIONS, allow_blank=True)
+    dv.add(status_range)
+    ws.data_validations.append(dv)
+
+    # Status cell colour follows the chosen status
+    for status, color in STATUS_COLORS.items():
+        ws.conditional_formatting.add(
+            status_range,
+            FormulaRule(
+                formula=[f'${status_letter}2="{status}"'],
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid")
+            )
+        )
+
+    wb.save(path)
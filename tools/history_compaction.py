@@ -0,0 +1,232 @@
+"""
+Keeps the prompt of long sessions roughly constant in size.
+
+compact_history is a before_model_callback shared by all agents. Before every model request it:
+- replaces the bodies of documents already saved by the save_* tools with a short reference
+  (doc type, version, hash), in the tool call arguments and anywhere the body is quoted as text;
+- folds every turn but the last HISTORY_KEEP_TURNS into a bounded summary kept in session state
+  ("history_summary") and sends that summary instead of the folded turns.
+
+The events stored in the session are left untouched; only the outgoing request is rewritten.
+"""
+import json
+import os
+import threading
+from typing import Optional
+
+from google.genai import types
+
+from logs.history_store import content_hash, parse_versioned_name
+
+# User turns kept verbatim; older ones are folded into the summary
+HISTORY_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", 4))
+HISTORY_SUMMARY_MAX_CHARS = int(os.environ.get("HISTORY_SUMMARY_MAX_CHARS", 4000))
+# Characters of each message kept in the summary
+SUMMARY_LINE_CHARS = 300
+# Shorter saved texts are cheaper to resend than to reference
+MIN_REFERENCE_CHARS = 500
+
+SUMMARY_STATE_KEY = "history_summary"
+SUMMARY_PREAMBLE = "Summary of the earlier conversation (older turns were compacted):\n"
+OTHER_AGENT_PREFIX = "For context:"
+
+# Tools whose argument holds the saved document body: tool name -> (argument, doc type)
+SAVE_TOOLS = {
+    "save_report": ("report", "BRD"),
+    "save_revised_sections": ("sections", "BRD"),
+    "save_user_manual": ("report", "user_manual"),
+    "save_usecase_acceptance_criteria": ("report", "Usecase"),
+    "save_task_chart": ("tasks", "task_chart"),
+}
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "compacted_requests": 0, "chars_before": 0, "chars_after": 0, "references": 0}
+
+
+def _saved_path(response) -> Optional[str]:
+    if isinstance(response, dict):
+        response = response.get("result")
+    return response if isinstance(response, str) else None
+
+
+def document_reference(tool_name: str, body: str, path: Optional[str] = None) -> str:
+    _, doc_type = SAVE_TOOLS[tool_name]
+    _, version = parse_versioned_name(path)
+    saved_as = f" v{version}" if version is not None else ""
+    return (f"[{doc_type}{saved_as} already saved by {tool_name}"
+            f"{f' as {os.path.basename(path)}' if path else ''}, sha256 {content_hash(body)[:12]}, "
+            f"{len(body)} chars; body omitted]")
+
+
+def saved_documents(contents) -> dict:
+    """
+    Finds the saved document bodies in the request. Returns {function call id or body: (tool, body, path)}.
+    """
+    calls = {}
+    paths = {}
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_call and part.function_call.name in SAVE_TOOLS:
+                argument, _ = SAVE_TOOLS[part.function_call.name]
+                body = (part.function_call.args or {}).get(argument)
+                if isinstance(body, str) and len(body) >= MIN_REFERENCE_CHARS:
+                    calls[part.function_call.id or body] = (part.function_call.name, body)
+            elif part.function_response and part.function_response.name in SAVE_TOOLS:
+                paths[part.function_response.id] = _saved_path(part.function_response.response)
+    return {key: (name, body, paths.get(key)) for key, (name, body) in calls.items()}
+
+
+def _replace_bodies(text: str, references) -> str:
+    for body, reference in references:
+        if len(text) < len(body) // 2:
+            continue
+        # Bodies also show up quoted inside other agents' tool calls, JSON- or repr-escaped
+        for quoted in (body, json.dumps(body)[1:-1], repr(body)[1:-1]):
+            if quoted in text:
+                text = text.replace(quoted, reference)
+    return text
+
+
+def reference_saved_documents(contents) -> int:
+    """
+    Rewrites the contents in place so saved document bodies appear only as references. The last
+    content is left alone so the model still sees what it is answering. Returns the replacements made.
+    """
+    documents = saved_documents(contents)
+    if not documents:
+        return 0
+    references = [(body, document_reference(name, body, path)) for name, body, path in documents.values()]
+    replaced = 0
+    for content in contents[:-1]:
+        for part in content.parts or []:
+            call = part.function_call
+            if call and call.name in SAVE_TOOLS:
+                argument, _ = SAVE_TOOLS[call.name]
+                document = documents.get(call.id) or documents.get((call.args or {}).get(argument))
+                if document:
+                    call.args = dict(call.args, **{argument: document_reference(*document)})
+                    replaced += 1
+            elif part.text:
+                text = _replace_bodies(part.text, references)
+                if text != part.text:
+                    part.text = text
+                    replaced += 1
+    return replaced
+
+
+def is_user_turn(content) -> bool:
+    parts = content.parts or []
+    return (content.role == "user" and any(p.text for p in parts)
+            and not any(p.function_response for p in parts)
+            and not any((p.text or "").startswith(OTHER_AGENT_PREFIX) for p in parts))
+
+
+def summarize_content(content) -> list:
+    """
+    One short summary line per text part or tool call of a content.
+    """
+    lines = []
+    speaker = "User" if is_user_turn(content) else "Agent"
+    for part in content.parts or []:
+        if part.text and not part.thought:
+            text = " ".join(part.text.split())
+            if text.startswith(OTHER_AGENT_PREFIX):
+                speaker, text = "Agent", text[len(OTHER_AGENT_PREFIX):].strip()
+            if len(text) > SUMMARY_LINE_CHARS:
+                text = text[:SUMMARY_LINE_CHARS] + "…"
+            lines.append(f"- {speaker}: {text}")
+        elif part.function_call:
+            lines.append(f"- Agent called {part.function_call.name}")
+        elif part.function_response and part.function_response.name in SAVE_TOOLS:
+            path = _saved_path(part.function_response.response)
+            if path:
+                lines.append(f"- {part.function_response.name} saved {os.path.basename(path)}")
+    return lines
+
+
+def bound_summary(lines: list, max_chars: int = HISTORY_SUMMARY_MAX_CHARS) -> str:
+    """
+    Joins summary lines, dropping the oldest ones once max_chars is reached.
+    """
+    kept = []
+    size = 0
+    for line in reversed(lines):
+        if size + len(line) + 1 > max_chars:
+            kept.append("- (earlier turns omitted)")
+            break
+        kept.append(line)
+        size += len(line) + 1
+    return "\n".join(reversed(kept))
+
+
+def fold_old_turns(contents, summary: dict, keep_turns: int = HISTORY_KEEP_TURNS):
+    """
+    Splits contents into the turns to fold and the recent ones to keep. Turns are folded into
+    summary incrementally: summary["turns"] counts the user turns already in summary["text"].
+
+    Returns:
+        (kept contents, summary covering the folded turns or None when nothing had to be folded)
+    """
+    starts = [i for i, content in enumerate(contents) if is_user_turn(content)]
+    if len(starts) <= keep_turns:
+        return contents, None
+    cut = starts[-keep_turns] if keep_turns else len(contents)
+    folded_turns = len(starts) - keep_turns
+
+    summary = dict(summary or {"turns": 0, "text": ""})
+    if folded_turns > summary["turns"]:
+        first = starts[summary["turns"]]
+        lines = summary["text"].splitlines() if summary["text"] else []
+        for content in contents[first:cut]:
+            lines += summarize_content(content)
+        summary = {"turns": folded_turns, "text": bound_summary(lines)}
+    return contents[cut:], summary
+
+
+def _request_chars(contents) -> int:
+    total = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                total += len(part.text)
+            elif part.function_call:
+                total += len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                total += len(json.dumps(part.function_response.response or {}, default=str))
+    return total
+
+
+def compact_contents(contents, summary: Optional[dict], keep_turns: int = HISTORY_KEEP_TURNS):
+    """
+    Returns (compacted contents, summary to store or None if unchanged, references made).
+    """
+    contents = [content.model_copy(deep=True) for content in contents]
+    references = reference_saved_documents(contents)
+    kept, new_summary = fold_old_turns(contents, summary, keep_turns)
+    if new_summary and new_summary["text"]:
+        kept = [types.Content(role="user", parts=[types.Part(text=SUMMARY_PREAMBLE + new_summary["text"])])] + kept
+    return kept, (new_summary if new_summary != summary else None), references
+
+
+def compact_history(callback_context, llm_request):
+    """
+    before_model_callback: rewrites llm_request.contents as described in the module docstring.
+    """
+    before = _request_chars(llm_request.contents)
+    contents, summary, references = compact_contents(llm_request.contents, callback_context.state.get(SUMMARY_STATE_KEY))
+    if summary is not None:
+        callback_context.state[SUMMARY_STATE_KEY] = summary
+    llm_request.contents = contents
+    after = _request_chars(contents)
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["compacted_requests"] += after < before
+        _stats["chars_before"] += before
+        _stats["chars_after"] += after
+        _stats["references"] += references
+    return None
+
+
+def compaction_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
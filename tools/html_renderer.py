@@ -0,0 +1,63 @@
+from html import escape
+
+from tools.markdown_tokens import tokenize, BOLD, ITALIC, UNDERLINE, CODE
+
+
+def spans_to_html(spans) -> str:
+    out = []
+    for text, flags in spans:
+        text = escape(text)
+        if flags & CODE:
+            text = f"<code>{text}</code>"
+        if flags & UNDERLINE:
+            text = f"<u>{text}</u>"
+        if flags & ITALIC:
+            text = f"<em>{text}</em>"
+        if flags & BOLD:
+            text = f"<strong>{text}</strong>"
+        out.append(text)
+    return "".join(out)
+
+
+def _list_html(token) -> str:
+    _, ordered, start, items = token
+    tag = "ol" if ordered else "ul"
+    start_attr = f' start="{start}"' if ordered and start != 1 else ""
+    body = "".join(
+        f"<li>{spans_to_html(spans)}{''.join(_list_html(child) for child in children)}</li>"
+        for spans, children in items
+    )
+    return f"<{tag}{start_attr}>{body}</{tag}>"
+
+
+def tokens_to_html(tokens) -> str:
+    """
+    Converts a markdown token stream (see tools.markdown_tokens) to an HTML fragment.
+    """
+    out = []
+    for token in tokens:
+        kind = token[0]
+        if kind == "paragraph":
+            out.append(f"<p>{spans_to_html(token[1])}</p>")
+        elif kind == "heading":
+            level = min(token[1], 6)
+            out.append(f"<h{level}>{spans_to_html(token[2])}</h{level}>")
+        elif kind == "list":
+            out.append(_list_html(token))
+        elif kind == "table":
+            _, header, rows = token
+            head = f"<thead><tr>{''.join(f'<th>{spans_to_html(c)}</th>' for c in header)}</tr></thead>" if header else ""
+            body = "".join(f"<tr>{''.join(f'<td>{spans_to_html(c)}</td>' for c in row)}</tr>" for row in rows)
+            out.append(f"<table>{head}<tbody>{body}</tbody></table>")
+        elif kind == "code":
+            lang = f' class="language-{escape(token[1])}"' if token[1] else ""
+            out.append(f"<pre><code{lang}>{escape(token[2])}</code></pre>")
+        elif kind == "rule":
+            out.append("<hr>")
+        elif kind == "page_break":
+            out.append('<div style="page-break-after: always"></div>')
+    return "\n".join(out)
+
+
+def markdown_to_html(markdown_text: str) -> str:
+    return tokens_to_html(tokenize(markdown_text))
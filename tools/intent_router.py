@@ -0,0 +1,221 @@
+"""
+Deterministic fast path in front of the business_analyst_agent LLM router.
+
+classify_request() scores the user message against weighted keyword patterns for each sub-agent.
+When one sub-agent wins clearly, route_request (a before_model_callback on business_analyst_agent)
+answers the routing model call itself with a transfer_to_agent call, saving a model round-trip.
+Naming a document is not enough: the message must ask for something to be done (create, write,
+revise, ...) and must not be a question, since the document agents always generate and save.
+Anything ambiguous (several documents in one message, greetings and thanks, questions such as
+"what is a BRD?", a revision before any BRD exists) goes to the LLM router as before.
+
+router_stats() reports the hit rate per intent and the latency saved, estimated from the measured
+duration of the LLM routing calls that were not skipped.
+"""
+import os
+import re
+import threading
+import time
+from typing import Optional, Tuple
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+# Minimum score of the winning intent, and lead it needs over the runner-up
+ROUTER_MIN_SCORE = float(os.environ.get("ROUTER_MIN_SCORE", 3))
+ROUTER_MIN_MARGIN = float(os.environ.get("ROUTER_MIN_MARGIN", 2))
+# Routing latency assumed per skipped call until an LLM routing call has been measured
+DEFAULT_ROUTER_LATENCY_S = 1.5
+
+# Sub-agent name -> [(pattern, weight)]
+INTENT_PATTERNS = {
+    "BRDGeneratorAgent": [
+        (r"\bbrds?\b", 3),
+        (r"\bbusiness requirements? (?:document|doc|specification)\b", 3),
+        (r"\brequirements? document\b", 3),
+        (r"\b(?:create|generate|draft|write|prepare|build|make)\b", 1),
+    ],
+    "BRDRevisionAgent": [
+        (r"\b(?:revise|revision|update|modify|change|edit|amend|rewrite)\b.{0,60}\b(?:brd|requirements? document|document|section)\b", 4),
+        (r"\b(?:add|remove|include|drop|replace)\b.{0,60}\b(?:to|from|in) the (?:brd|document|requirements?)\b", 4),
+        (r"\b(?:not (?:happy|satisfied)|doesn't look right|missing)\b", 1),
+    ],
+    "UserManualAgent": [
+        (r"\buser (?:manual|guide)s?\b", 4),
+        (r"\b(?:manual|handbook|how-to guide|help guide)\b", 2),
+    ],
+    "UsecaseAcceptanceCriteriaAgent": [
+        (r"\buse ?cases?\b", 3),
+        (r"\bacceptance criteria\b", 3),
+        (r"\buser stor(?:y|ies)\b", 2),
+    ],
+    "TaskChartAgent": [
+        (r"\bgantt\b", 4),
+        (r"\btask (?:chart|plan|planner|list)\b", 4),
+        (r"\b(?:timeline|project plan|schedule)\b", 2),
+        (r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.? \d{1,2}\s*(?:-|–|to)\s*", 1),
+    ],
+}
+_COMPILED = {agent: [(re.compile(p, re.I | re.S), w) for p, w in patterns] for agent, patterns in INTENT_PATTERNS.items()}
+
+# Agent that builds several documents from one brief, and the document agents it can run
+BATCH_AGENT = "DocumentBatchAgent"
+# Name prefix of the document agent copies the batch agent runs
+BATCH_AGENT_PREFIX = "Batch"
+BATCH_DOCUMENT_AGENTS = ("BRDGeneratorAgent", "UsecaseAcceptanceCriteriaAgent", "UserManualAgent", "TaskChartAgent")
+FULL_PACKAGE = re.compile(r"\b(?:all (?:the |of the )?documents|full (?:set|package)|document (?:package|bundle|set))\b", re.I)
+# Joins two document requests in one message ("a BRD and a user manual", "use cases plus a gantt chart")
+DOCUMENT_CONJUNCTION = re.compile(r"\b(?:and|plus|along with|as well as|together with)\b", re.I)
+
+# Messages the LLM should answer itself
+SMALL_TALK = re.compile(r"^\s*(?:hi|hello|hey)\b|\b(?:thanks|thank you|cheers)\b|\bwhat (?:can|do) you do\b|\bcapabilit", re.I)
+# Questions about documents ("what is a BRD?", "explain a gantt chart") are answered, not acted on
+QUESTION = re.compile(r"^\s*(?:what|what's|whats|how|why|when|where|which|who|is|are|does|do)\b|\bexplain\b|\?\s*$", re.I)
+# A routed request has to ask for a document to be produced or changed
+ACTION_VERB = re.compile(
+    r"\b(?:create|generate|write|draft|prepare|build|make|produce|put together|give me|need|want|"
+    r"revise|update|modify|change|edit|amend|rewrite|add|remove|include|drop|replace)\b", re.I)
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "fast_path": 0, "fallback": 0, "llm_router_calls": 0, "llm_router_s": 0.0}
+_by_intent = {}
+_llm_started = {}
+
+
+def score_intents(text: str) -> dict:
+    return {agent: sum(w for pattern, w in patterns if pattern.search(text)) for agent, patterns in _COMPILED.items()}
+
+
+def classify_request(text: str, has_brd: bool = False) -> Tuple[Optional[str], dict]:
+    """
+    Returns (sub-agent name or None when the LLM router should decide, intent scores).
+
+    Args:
+        text: the user message.
+        has_brd: whether this session already saved a BRD; revisions are only routed when it did.
+    """
+    scores = score_intents(text)
+    if SMALL_TALK.search(text) or QUESTION.search(text) or not ACTION_VERB.search(text):
+        return None, scores
+    # Revising and generating both mention the BRD; a revision needs a BRD in this session to revise
+    if scores["BRDRevisionAgent"] >= ROUTER_MIN_SCORE:
+        if not has_brd:
+            return None, scores
+        scores["BRDGeneratorAgent"] = 0
+    else:
+        scores["BRDRevisionAgent"] = 0
+    # Several documents asked for in one message go to the batch agent; unclear mixes to the LLM
+    documents = [agent for agent, score in scores.items() if score >= ROUTER_MIN_SCORE]
+    if FULL_PACKAGE.search(text) and "BRDRevisionAgent" not in documents:
+        return BATCH_AGENT, scores
+    if len(documents) > 1:
+        if "BRDRevisionAgent" in documents or not DOCUMENT_CONJUNCTION.search(text):
+            return None, scores
+        return BATCH_AGENT, scores
+
+    ranked = sorted(scores.values(), reverse=True)
+    best = max(scores, key=scores.get)
+    if ranked[0] < ROUTER_MIN_SCORE or ranked[0] - ranked[1] < ROUTER_MIN_MARGIN:
+        return None, scores
+    return best, scores
+
+
+def select_batch_documents(text: str) -> list:
+    """
+    Returns the document agents a batch request asks for, or all of them for a "full package" request.
+    """
+    scores = score_intents(text)
+    selected = [agent for agent in BATCH_DOCUMENT_AGENTS if scores[agent] >= ROUTER_MIN_SCORE]
+    if FULL_PACKAGE.search(text) or not selected:
+        return list(BATCH_DOCUMENT_AGENTS)
+    return selected
+
+
+def _user_text(callback_context) -> str:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "".join(part.text for part in content.parts if part.text)
+
+
+def _is_routing_call(llm_request) -> bool:
+    """
+    True for the orchestrator's first model call of a turn, i.e. the request ends with the user message.
+    """
+    if not llm_request.contents:
+        return False
+    last = llm_request.contents[-1]
+    return last.role == "user" and any(p.text for p in last.parts or []) and not any(
+        p.function_response for p in last.parts or [])
+
+
+def _intent_stats(intent: str) -> dict:
+    return _by_intent.setdefault(intent, {"requests": 0, "fast_path": 0})
+
+
+def route_request(callback_context, llm_request) -> Optional[LlmResponse]:
+    """
+    before_model_callback for business_analyst_agent: transfers straight to the sub-agent picked by
+    classify_request, or lets the model call through (and times it) when the classifier is not sure.
+    """
+    if not _is_routing_call(llm_request):
+        return None
+    text = _user_text(callback_context)
+    has_brd = callback_context.state.get("last_brd_version") is not None
+    agent, scores = classify_request(text, has_brd=has_brd)
+    # Fallbacks are counted under the intent that scored highest, so the hit rate is per request type
+    request_type = agent or (max(scores, key=scores.get) if any(scores.values()) else "other")
+
+    with _stats_lock:
+        _stats["requests"] += 1
+        intent = _intent_stats(request_type)
+        intent["requests"] += 1
+        if agent is None:
+            _stats["fallback"] += 1
+            _llm_started[callback_context.invocation_id] = time.perf_counter()
+            return None
+        _stats["fast_path"] += 1
+        intent["fast_path"] += 1
+
+    print(f"🧭 Fast path: routing to {agent}")
+    # The sub-agents read the request from state['ba_output'], which the LLM router would have filled in
+    callback_context.state["ba_output"] = text
+    if agent == BATCH_AGENT:
+        callback_context.state["batch_documents"] = select_batch_documents(text)
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name="transfer_to_agent", args={"agent_name": agent}))
+    ]))
+
+
+def record_router_latency(callback_context, llm_response) -> Optional[LlmResponse]:
+    """
+    after_model_callback for business_analyst_agent: records how long an LLM routing call took.
+    """
+    with _stats_lock:
+        started = _llm_started.pop(callback_context.invocation_id, None)
+        if started is not None and not llm_response.partial:
+            _stats["llm_router_calls"] += 1
+            _stats["llm_router_s"] += time.perf_counter() - started
+        elif started is not None:
+            _llm_started[callback_context.invocation_id] = started
+    return None
+
+
+def router_stats() -> dict:
+    """
+    Returns the fast path hit rate overall and per intent, the measured LLM routing latency and the
+    estimated time saved by the calls that were skipped.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+        by_intent = {name: dict(values) for name, values in _by_intent.items()}
+    avg = stats["llm_router_s"] / stats["llm_router_calls"] if stats["llm_router_calls"] else DEFAULT_ROUTER_LATENCY_S
+    stats["hit_rate"] = round(stats["fast_path"] / stats["requests"], 3) if stats["requests"] else 0.0
+    stats["llm_router_avg_s"] = round(avg, 3)
+    stats["saved_s"] = round(stats["fast_path"] * avg, 2)
+    stats["llm_router_s"] = round(stats["llm_router_s"], 3)
+    for values in by_intent.values():
+        values["hit_rate"] = round(values["fast_path"] / values["requests"], 3)
+        values["saved_s"] = round(values["fast_path"] * avg, 2)
+    stats["by_intent"] = by_intent
+    return stats
@@ -0,0 +1,224 @@
+"""
+Single pass markdown tokenizer shared by the document renderers.
+
+tokenize() walks the text once, matching every line against one precompiled pattern, and yields a
+compact stream of tuples:
+
+    ("heading", level, spans)
+    ("paragraph", spans)
+    ("list", ordered, start, items)    items: [(spans, [nested "list" tokens]), ...]
+    ("code", language, text)
+    ("table", header, rows)             header: [spans, ...], rows: [[spans, ...], ...]
+    ("rule",)
+    ("page_break",)
+    ("blank",)                          one per empty line, renderers turn it into vertical space
+
+Inline text is returned as spans, a list of (text, flags) tuples where flags is a combination of
+BOLD, ITALIC, UNDERLINE and CODE, so renderers never re-scan text for each inline style.
+"""
+import re
+from typing import Iterator, List, Tuple
+
+BOLD = 1
+ITALIC = 2
+UNDERLINE = 4
+CODE = 8
+
+Spans = List[Tuple[str, int]]
+
+LINE_PATTERN = re.compile(r"""
+    ^(?P<indent>[ \t]*)
+    (?:
+        (?P<fence>```|~~~)\s*(?P<lang>[\w+-]*)\s*$
+      | (?P<pagebreak>\\pagebreak|\\newpage|<!--\s*pagebreak\s*-->)\s*$
+      | (?P<rule>(?:-[ ]*){3,}|(?:\*[ ]*){3,}|(?:_[ ]*){3,})$
+      | (?P<hashes>\#{1,6})[ \t]*(?P<heading>.*?)[ \t#]*$
+      | (?P<bullet>[-*+])[ \t]+(?P<bullet_text>.*)$
+      | (?P<number>\d{1,9})[.)][ \t]+(?P<number_text>.*)$
+      | (?P<table>\|.*\|)[ \t]*$
+      | (?P<blank>)$
+      | (?P<text>.*)$
+    )""", re.X)
+
+# Named groups that identify the kind of a line, in the order they are tried
+LINE_KINDS = ("fence", "pagebreak", "rule", "hashes", "bullet", "number", "table", "blank", "text")
+
+TABLE_SEPARATOR = re.compile(r'^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$')
+
+# `code` is matched as a whole, the other markers are paired afterwards
+INLINE_PATTERN = re.compile(r'(`[^`]*`|\*\*|__|\*)')
+INLINE_FLAGS = {"**": BOLD, "__": UNDERLINE, "*": ITALIC}
+
+
+def inline_spans(text: str) -> Spans:
+    """
+    Splits a line into (text, flags) spans in one scan. Markers without a closing partner are kept as
+    literal text, matching the non-greedy pairs the old regex based converter produced.
+    """
+    parts = INLINE_PATTERN.split(text)
+    # Pair up emphasis markers so an unmatched one stays literal
+    open_at = {}
+    paired = set()
+    for i in range(1, len(parts), 2):
+        marker = parts[i]
+        if marker in INLINE_FLAGS:
+            if marker in open_at:
+                paired.add(open_at.pop(marker))
+                paired.add(i)
+            else:
+                open_at[marker] = i
+
+    spans = []
+    flags = 0
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            if part:
+                spans.append((part, flags))
+        elif part.startswith('`'):
+            spans.append((part[1:-1], flags | CODE))
+        elif i in paired:
+            flags ^= INLINE_FLAGS[part]
+        else:
+            spans.append((part, flags))
+    return spans
+
+
+def spans_text(spans: Spans) -> str:
+    return "".join(text for text, _ in spans)
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def _indent_width(indent: str) -> int:
+    return len(indent.replace('\t', '    '))
+
+
+class _ListBuilder:
+    """
+    Collects consecutive list lines into nested "list" tokens using their indentation.
+    """
+
+    def __init__(self):
+        self.stack = []  # [indent, ordered, start, items]
+
+    def __bool__(self):
+        return bool(self.stack)
+
+    def add(self, indent: int, ordered: bool, number: int, spans: Spans) -> list:
+        """
+        Adds one list item and returns the top level list tokens it completed, if any.
+        """
+        done = []
+        while self.stack and indent < self.stack[-1][0]:
+            done += self._close_top()
+        if self.stack and indent == self.stack[-1][0] and ordered != self.stack[-1][1]:
+            done += self._close_top()
+        if not self.stack or indent > self.stack[-1][0]:
+            self.stack.append([indent, ordered, number, []])
+        self.stack[-1][3].append((spans, []))
+        return done
+
+    def continue_item(self, spans: Spans):
+        items = self.stack[-1][3]
+        text, children = items[-1]
+        items[-1] = (text + [(" ", 0)] + spans, children)
+
+    def _close_top(self) -> list:
+        _, ordered, start, items = self.stack.pop()
+        token = ("list", ordered, start, items)
+        if self.stack:
+            self.stack[-1][3][-1][1].append(token)
+            return []
+        return [token]
+
+    def finish(self) -> list:
+        done = []
+        while self.stack:
+            done += self._close_top()
+        return done
+
+
+def content_lines(markdown_text: str) -> List[str]:
+    """
+    Lines of markdown_text without the blank lines at either end. Unlike str.strip() this keeps the
+    indentation of the first line, which decides how deep a leading list item is nested.
+    """
+    lines = markdown_text.split('\n')
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    end = len(lines)
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return lines[start:end] or [""]
+
+
+def tokenize(markdown_text: str) -> Iterator[tuple]:
+    """
+    Yields the token stream for markdown_text. See the module docstring for the token shapes.
+    """
+    lists = _ListBuilder()
+    table = []
+    fence = None
+    code_lines = []
+
+    def flush_table():
+        if not table:
+            return []
+        rows = [_split_row(row) for row in table]
+        if len(rows) > 1 and TABLE_SEPARATOR.match(table[1]):
+            header, body = rows[0], rows[2:]
+        else:
+            header, body = [], rows
+        table.clear()
+        return [("table", [inline_spans(c) for c in header], [[inline_spans(c) for c in row] for row in body])]
+
+    for line in content_lines(markdown_text):
+        if fence is not None:
+            if line.strip().startswith(fence[0]):
+                yield ("code", fence[1], "\n".join(code_lines))
+                fence = None
+                code_lines = []
+            else:
+                code_lines.append(line)
+            continue
+
+        m = LINE_PATTERN.match(line)
+        kind = next(group for group in LINE_KINDS if m.group(group) is not None)
+
+        if kind == "table":
+            yield from lists.finish()
+            table.append(m.group("table"))
+            continue
+        yield from flush_table()
+
+        if kind in ("bullet", "number"):
+            ordered = kind == "number"
+            text = m.group("number_text") if ordered else m.group("bullet_text")
+            number = int(m.group("number")) if ordered else 1
+            yield from lists.add(_indent_width(m.group("indent")), ordered, number, inline_spans(text.strip()))
+            continue
+        if kind == "text" and lists and _indent_width(m.group("indent")) > 0:
+            lists.continue_item(inline_spans(line.strip()))
+            continue
+        yield from lists.finish()
+
+        if kind == "fence":
+            fence = (m.group("fence"), m.group("lang"))
+        elif kind == "pagebreak":
+            yield ("page_break",)
+        elif kind == "rule":
+            yield ("rule",)
+        elif kind == "hashes":
+            yield ("heading", len(m.group("hashes")), inline_spans(m.group("heading")))
+        elif kind == "blank":
+            yield ("blank",)
+        else:
+            yield ("paragraph", inline_spans(line.strip()))
+
+    yield from flush_table()
+    yield from lists.finish()
+    if fence is not None:
+        yield ("code", fence[1], "\n".join(code_lines))
@@ -0,0 +1,276 @@
+import os
+import re
+import uuid
+from contextlib import contextmanager, suppress
+from functools import lru_cache
+
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import (SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem, Table, TableStyle,
+                                Preformatted, PageBreak)
+from reportlab.platypus.flowables import HRFlowable
+from reportlab.platypus.paragraph import cleanBlockQuotedText
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_LEFT
+
+from logs.history_store import allocate_version
+from tools.render_cache import SectionRenderCache
+from tools.tracing import set_span_attributes, span
+from tools.markdown_tokens import tokenize, inline_spans, BOLD, ITALIC, UNDERLINE, CODE
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Paragraph style settings per theme: style name -> (parent style, fontSize, spaceAfter)
+THEMES = {
+    "default": {
+        "MyHeading1": ("Heading1", 18, 12),
+        "MyHeading2": ("Heading2", 16, 10),
+        "MyHeading3": ("Heading3", 14, 8),
+        "MyHeading4": ("Heading4", 12, 6),
+        "MyNormal": ("Normal", 10, 6),
+    },
+}
+
+# Output folder, versioned file prefix and theme of each PDF document type
+DOC_TYPES = {
+    "BRD": {"folder": "Output", "base_name": "BRD", "theme": "default"},
+    "user_manual": {"folder": "User_Manual", "base_name": "user_manual", "theme": "default"},
+    "Usecase": {"folder": "Usecase", "base_name": "Usecase", "theme": "default"},
+}
+
+PAGE_MARGINS = dict(rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
+FRAME_WIDTH = A4[0] - PAGE_MARGINS["leftMargin"] - PAGE_MARGINS["rightMargin"]
+
+# Flowables of unchanged markdown blocks are reused between document versions
+section_render_cache = SectionRenderCache()
+
+
+@lru_cache(maxsize=None)
+def get_styles(theme: str = "default"):
+    """
+    Builds the stylesheet of a theme once per process. The returned stylesheet is shared; do not modify it.
+    """
+    styles = getSampleStyleSheet()
+    for name, (parent, font_size, space_after) in THEMES[theme].items():
+        extra = {"alignment": TA_LEFT} if parent == "Normal" else {}
+        styles.add(ParagraphStyle(name=name, parent=styles[parent], fontSize=font_size, spaceAfter=space_after, **extra))
+    return styles
+
+
+def latest_version_on_disk(base_name="brd", ext="pdf", folder="reports") -> int:
+    """
+    Highest N among the base_name_vN.ext files in folder, or 0. Lists the whole folder, so it is only
+    used to seed the version counter (see reserve_versioned_path).
+    """
+    os.makedirs(folder, exist_ok=True)
+    existing_files = os.listdir(folder)
+    
+    version_pattern = re.compile(rf"{re.escape(base_name)}_v(\d+)\.{ext}$")
+    versions = [
+        int(match.group(1)) 
+        for f in existing_files 
+        if (match := version_pattern.match(f))
+    ]
+    return max(versions, default=0)
+
+
+def get_next_filename(base_name="brd", ext="pdf", folder="reports"):
+    next_version = latest_version_on_disk(base_name, ext, folder) + 1
+    return os.path.join(folder, f"{base_name}_v{next_version}.{ext}")
+
+
+def discard_placeholder(path: str):
+    """
+    Removes path if it is still the empty file reserve_versioned_path created, i.e. its render failed.
+    """
+    with suppress(FileNotFoundError):
+        if os.path.getsize(path) == 0:
+            os.remove(path)
+
+
+@contextmanager
+def atomic_output(path: str):
+    """
+    Yields a temporary path in the folder of path. When the block succeeds the temporary file is
+    renamed over path in one step, so nobody ever reads a half-written artefact; on failure it is removed,
+    and so is path when it is still an empty placeholder (see discard_placeholder).
+    """
+    folder, name = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(folder, f".{name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    # Created like a regular file (not mkstemp's 0600), so the renamed artefact keeps the usual permissions
+    os.close(os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        discard_placeholder(path)
+        raise
+
+
+def spans_to_markup(spans) -> str:
+    """
+    Converts inline spans from the tokenizer to the XML-like markup understood by Paragraph.
+    """
+    out = []
+    for text, flags in spans:
+        text = escape(text)
+        if flags & CODE:
+            text = f'<font face="Courier">{text}</font>'
+        if flags & UNDERLINE:
+            text = f"<u>{text}</u>"
+        if flags & ITALIC:
+            text = f"<i>{text}</i>"
+        if flags & BOLD:
+            text = f"<b>{text}</b>"
+        out.append(text)
+    return "".join(out)
+
+
+def markdown_inline_to_html(text: str) -> str:
+    """
+    Convert inline markdown (**bold**, *italic*, __underline__, `code`) to HTML-style for Paragraph.
+    """
+    return spans_to_markup(inline_spans(text))
+
+
+@lru_cache(maxsize=None)
+def _plain_fragment(style):
+    return Paragraph("x", style).frags[0]
+
+
+def make_paragraph(markup: str, style) -> Paragraph:
+    """
+    Paragraph(markup, style). Markup without tags or entities, most lines of a document, skips
+    ReportLab's XML parser: the single fragment the parser would produce is cloned from a template
+    fragment of the style.
+    """
+    if "<" in markup or "&" in markup or not markup.strip() or style.textTransform:
+        return Paragraph(markup, style)
+    text = cleanBlockQuotedText(markup)
+    return Paragraph(text, style, frags=[_plain_fragment(style).clone(text=text)])
+
+
+def _list_flowable(token, styles):
+    _, ordered, start, items = token
+    list_items = []
+    for spans, children in items:
+        content = [make_paragraph(spans_to_markup(spans), styles['Normal'])]
+        content.extend(_list_flowable(child, styles) for child in children)
+        list_items.append(ListItem(content if len(content) > 1 else content[0], leftIndent=20))
+    if ordered:
+        return ListFlowable(list_items, bulletType='1', start=start, leftIndent=20)
+    return ListFlowable(list_items, bulletType='bullet', start='-', leftIndent=20)
+
+
+def _table_flowable(token, styles):
+    _, header, rows = token
+    data = ([[Paragraph(f"<b>{spans_to_markup(cell)}</b>", styles['Normal']) for cell in header]] if header else [])
+    data += [[make_paragraph(spans_to_markup(cell), styles['Normal']) for cell in row] for row in rows]
+    columns = max(len(row) for row in data)
+    data = [row + [""] * (columns - len(row)) for row in data]
+    table = Table(data, colWidths=[FRAME_WIDTH / columns] * columns, repeatRows=1 if header else 0)
+    table.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ] + ([("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#D9E1F2"))] if header else [])))
+    return table
+
+
+HEADING_STYLES = {1: 'MyHeading1', 2: 'MyHeading2', 3: 'MyHeading3'}
+
+
+def tokens_to_flowables(tokens, styles) -> list:
+    """
+    Converts a markdown token stream (see tools.markdown_tokens) to reportlab flowables.
+    """
+    flowables = []
+    for token in tokens:
+        kind = token[0]
+        if kind == "paragraph":
+            flowables.append(make_paragraph(spans_to_markup(token[1]), styles['Normal']))
+        elif kind == "blank":
+            flowables.append(Spacer(1, 12))
+        elif kind == "heading":
+            flowables.append(Paragraph(f"<b>{spans_to_markup(token[2])}</b>", styles[HEADING_STYLES.get(token[1], 'MyHeading4')]))
+        elif kind == "list":
+            flowables.append(_list_flowable(token, styles))
+        elif kind == "table":
+            flowables.append(_table_flowable(token, styles))
+        elif kind == "code":
+            flowables.append(Preformatted(token[2], styles['Code']))
+        elif kind == "rule":
+            flowables.append(HRFlowable(width="100%", thickness=0.5, color=colors.grey, spaceBefore=6, spaceAfter=6))
+        elif kind == "page_break":
+            flowables.append(PageBreak())
+    return flowables
+
+
+def markdown_to_paragraphs(markdown_text: str, styles) -> list:
+    """
+    Converts markdown text to a list of reportlab flowables (Paragraph, Spacer, List, Table, ...).
+    """
+    return tokens_to_flowables(tokenize(markdown_text), styles)
+
+
+def build_markdown_pdf(output_path: str, text: str, theme: str = "default"):
+    """
+    Renders markdown text into a PDF at output_path using the shared stylesheet of the theme.
+    """
+    with span("pdf.build", theme=theme, chars=len(text)):
+        # Parsing happens inside atomic_output too, so a failure anywhere removes the reserved placeholder
+        with atomic_output(output_path) as tmp_path:
+            styles = get_styles(theme)
+            with span("pdf.markdown_to_paragraphs"):
+                story = section_render_cache.build_story(text, lambda block: markdown_to_paragraphs(block, styles),
+                                                         style_key=theme)
+            doc = SimpleDocTemplate(tmp_path, pagesize=A4, **PAGE_MARGINS)
+            with span("pdf.doc_build", flowables=len(story)):
+                doc.build(story)
+        set_span_attributes(bytes_written=os.path.getsize(output_path))
+
+
+def reserve_versioned_path(folder: str, base_name: str, ext: str = "pdf") -> str:
+    """
+    Allocates the next versioned filename (base_name_vN.ext) in folder and creates it empty.
+
+    Version numbers come from a counter per folder and file series in the history database, so the
+    cost does not grow with the number of files and concurrent saves in any process never get the
+    same path. The folder is only listed once, to seed the counter; the O_EXCL create skips numbers
+    taken by files written without the counter.
+    """
+    folder = os.path.abspath(folder)
+    os.makedirs(folder, exist_ok=True)
+    series = os.path.join(folder, f"{base_name}_vN.{ext}")
+    while True:
+        version = allocate_version(series, lambda: latest_version_on_disk(base_name, ext, folder))
+        output_path = os.path.join(folder, f"{base_name}_v{version}.{ext}")
+        try:
+            os.close(os.open(output_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return output_path
+        except FileExistsError:
+            continue
+
+
+def reserve_output_path(doc_type: str) -> str:
+    """
+    Allocates the next versioned PDF filename of one of the DOC_TYPES (see reserve_versioned_path).
+    """
+    config = DOC_TYPES[doc_type]
+    return reserve_versioned_path(os.path.join(ROOT_DIR, config["folder"]), config["base_name"])
+
+
+def render_markdown_pdf(doc_type: str, text: str) -> str:
+    """
+    Renders a document of one of the DOC_TYPES into its output folder with the next versioned
+    filename (e.g. Output/BRD_v3.pdf).
+
+    Returns:
+        str: The file path of the saved PDF document.
+    """
+    output_path = reserve_output_path(doc_type)
+    build_markdown_pdf(output_path, text, theme=DOC_TYPES[doc_type]["theme"])
+    return output_path
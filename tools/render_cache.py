@@ -0,0 +1,139 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+from tools.markdown_tokens import LINE_PATTERN, content_lines
+
+
+def split_blocks(markdown_text: str) -> List[Tuple[str, int]]:
+    """
+    Splits markdown into blocks of consecutive non-empty lines.
+
+    Returns:
+        list: (block_text, blank_lines_after) tuples. Blank lines inside fenced code blocks do not split
+        a block; fences are recognised by the same pattern as in tools.markdown_tokens.
+
+    The tokenizer emits one "blank" token per blank line and ends pending lists, tables and paragraphs
+    at it, and lines keep their indentation, so the blocks rendered one by one with a Spacer per blank
+    line in between give the same flowables as markdown_to_paragraphs on the whole text. This only holds
+    as long as nothing in the tokenizer carries state across a blank line;
+    benchmarks.render_cache_bench checks it for every stored BRD.
+    """
+    blocks = []
+    current = []
+    fence = None
+    for line in content_lines(markdown_text):
+        stripped = line.strip()
+        if fence is None and stripped[:3] in ("```", "~~~"):
+            fence = LINE_PATTERN.match(line).group("fence")
+        elif fence is not None and stripped.startswith(fence):
+            fence = None
+        if stripped or fence is not None:
+            current.append(line)
+        elif current:
+            blocks.append(["\n".join(current), 1])
+            current = []
+        elif blocks:
+            blocks[-1][1] += 1
+    if current:
+        blocks.append(["\n".join(current), 0])
+    return [(text, blanks) for text, blanks in blocks]
+
+
+def fresh_flowable(flowable):
+    """
+    Returns a clone of a cached flowable that is safe to put in a new story. doc.build marks
+    flowables it postpones (_postponed), ListFlowable caches its laid out content and Table replaces
+    the values in its cell rows while it lays them out and wraps the cell Paragraphs, so the cached
+    originals are never handed out directly: list items and table cells are cloned recursively and
+    the row and column lists of a Table are copied.
+    """
+    clone = copy.copy(flowable)
+    clone.__dict__.pop('_postponed', None)
+    if hasattr(clone, '_list_content'):
+        clone._list_content = None
+        clone._dims = None
+    children = getattr(flowable, '_flowables', None)
+    if isinstance(children, (list, tuple)):
+        clone._flowables = type(children)(fresh_flowable(child) for child in children)
+    cells = getattr(flowable, '_cellvalues', None)
+    if isinstance(cells, list):
+        clone._cellvalues = [[_fresh_cell(value) for value in row] for row in cells]
+        clone._cellStyles = [list(row) for row in flowable._cellStyles]
+        clone._rowHeights = clone._argH = list(flowable._argH)
+        clone._colWidths = clone._argW = list(flowable._argW)
+    return clone
+
+
+def _fresh_cell(value):
+    if isinstance(value, (list, tuple)):
+        return type(value)(_fresh_cell(v) for v in value)
+    return fresh_flowable(value) if hasattr(value, 'wrap') else value
+
+
+class SectionRenderCache:
+    """
+    Bounded LRU cache of the flowables built for each markdown block, keyed by a content hash of the
+    block and the stylesheet it was built with. A new version of a document only re-parses the blocks
+    that changed; unchanged blocks get clones of their parsed Paragraph/ListFlowable/Table objects (see
+    fresh_flowable), so the markdown and ReportLab paragraph parsing is skipped.
+
+    Entries are evicted least recently used first once either max_blocks or max_chars (the summed
+    length of the cached markdown blocks, a proxy for flowable memory) is exceeded.
+    """
+
+    def __init__(self, max_blocks: int = 4096, max_chars: int = 4_000_000):
+        self.max_blocks = max_blocks
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build_story(self, markdown_text: str, build_block: Callable[[str], list], style_key: str = "default") -> list:
+        """
+        Returns the full story for markdown_text, calling build_block only for blocks not in the cache.
+        """
+        from reportlab.platypus import Spacer
+
+        story = []
+        for block, blanks in split_blocks(markdown_text):
+            story.extend(self._get_or_build(block, build_block, style_key))
+            story.extend(Spacer(1, 12) for _ in range(blanks))
+        return story
+
+    def _get_or_build(self, block: str, build_block: Callable[[str], list], style_key: str) -> list:
+        key = (style_key, hashlib.sha1(block.encode("utf-8")).hexdigest())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [fresh_flowable(f) for f in entry[0]]
+            self.misses += 1
+
+        flowables = build_block(block)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (flowables, len(block))
+                self._chars += len(block)
+                self._evict()
+        return [fresh_flowable(f) for f in flowables]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_blocks or self._chars > self.max_chars):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._chars -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"blocks": len(self._entries), "chars": self._chars, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,109 @@
+"""
+In-process render job queue. Tools submit a job and return its id straight away; a dispatcher
+thread feeds the jobs into the render pool and the UI polls get_job() until the file is ready.
+
+Job records are plain dicts:
+    {"id", "kind", "session_id", "path", "status", "error", "submitted_at", "finished_at"}
+with status one of "queued" (waiting for the dispatcher), "rendering", "done" or "failed".
+"""
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from opentelemetry import context as otel_context
+
+from tools.pdf_renderer import discard_placeholder
+from tools.render_pool import submit_render_job
+
+# Finished jobs kept for polling; the oldest are dropped first
+MAX_FINISHED_JOBS = 1000
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_queue = queue.Queue()
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def _set(job_id, **fields):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def _fail(job_id, error):
+    _set(job_id, status="failed", error=error, finished_at=time.time())
+    # A worker that crashed or was never reached leaves the reserved file empty
+    with _jobs_lock:
+        path = _jobs[job_id]["path"] if job_id in _jobs else None
+    if path:
+        discard_placeholder(path)
+
+
+def _finish(job_id, future):
+    error = None
+    if future.cancelled():
+        error = "cancelled"
+    elif future.exception() is not None:
+        error = repr(future.exception())
+    if error:
+        _fail(job_id, error)
+    else:
+        _set(job_id, status="done", error=None, finished_at=time.time())
+    with _jobs_lock:
+        finished = [jid for jid, job in _jobs.items() if job["status"] in ("done", "failed")]
+        for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[jid]
+
+
+def _dispatch_forever():
+    while True:
+        job_id, fn, args, trace_context = _queue.get()
+        with _jobs_lock:
+            kind = _jobs[job_id]["kind"]
+        # The render_pool.job span belongs to the trace of the tool call that queued the job
+        token = otel_context.attach(trace_context)
+        try:
+            future = submit_render_job(kind, fn, *args)
+        except Exception as e:
+            _fail(job_id, repr(e))
+            continue
+        finally:
+            otel_context.detach(token)
+        _set(job_id, status="rendering")
+        future.add_done_callback(lambda f, job_id=job_id: _finish(job_id, f))
+
+
+def _ensure_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None or not _dispatcher.is_alive():
+            _dispatcher = threading.Thread(target=_dispatch_forever, name="render-job-dispatcher", daemon=True)
+            _dispatcher.start()
+
+
+def submit_job(kind: str, path: str, fn, *args, session_id=None) -> str:
+    """
+    Queues fn(*args), which writes the artefact at path, and returns the job id without waiting.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    with _jobs_lock:
+        _jobs[job_id] = {"id": job_id, "kind": kind, "session_id": session_id, "path": path,
+                         "status": "queued", "error": None, "submitted_at": time.time(), "finished_at": None}
+    _ensure_dispatcher()
+    _queue.put((job_id, fn, args, otel_context.get_current()))
+    return job_id
+
+
+def get_job(job_id: str):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def list_jobs(session_id=None) -> list:
+    with _jobs_lock:
+        return [dict(job) for job in _jobs.values() if session_id is None or job["session_id"] == session_id]
@@ -0,0 +1,164 @@
+"""
+Bounded process pool that runs ReportLab and openpyxl rendering off the event loop.
+
+Workers are spawned once, warmed up (imports done, stylesheets built) and reused for every job.
+Jobs are plain top-level functions so they can be pickled to the workers; they must not import ADK.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from opentelemetry import context as otel_context, propagate, trace
+from opentelemetry.trace import StatusCode
+
+from tools.tracing import setup_tracing, tracer
+
+RENDER_POOL_WORKERS = int(os.environ.get("RENDER_POOL_WORKERS", os.cpu_count() or 2))
+# Jobs allowed in the pool (queued + running) before submitters wait for a free slot
+RENDER_POOL_MAX_PENDING = int(os.environ.get("RENDER_POOL_MAX_PENDING", RENDER_POOL_WORKERS * 4))
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(RENDER_POOL_MAX_PENDING)
+_stats_lock = threading.Lock()
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "pending": 0}
+_recent_jobs = deque(maxlen=200)
+
+
+def _warm_worker():
+    # Workers exit without running atexit handlers, so their spans are exported as they end
+    setup_tracing(sync_export=True)
+    from tools.pdf_renderer import get_styles, DOC_TYPES
+    import tools.gantt  # noqa: F401  (pandas/openpyxl import cost paid once per worker)
+
+    for config in DOC_TYPES.values():
+        get_styles(config["theme"])
+
+
+def _ping():
+    return os.getpid()
+
+
+def _timed_call(fn, args, trace_carrier=None):
+    # The job's spans in the worker continue the trace of the submitting process
+    token = otel_context.attach(propagate.extract(trace_carrier)) if trace_carrier else None
+    try:
+        started = time.time()
+        result = fn(*args)
+        return result, started, time.time()
+    finally:
+        if token is not None:
+            otel_context.detach(token)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Returns the process wide render pool, creating and warming it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=RENDER_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            for _ in range(RENDER_POOL_WORKERS):
+                _executor.submit(_ping)
+        return _executor
+
+
+def _submit_acquired(name: str, fn, args, submitted: float):
+    """
+    Submits a job whose pool slot is already held. The slot is released and the job's timing
+    recorded when the returned future completes; its result is (result, started, finished). The job
+    is traced as a "render_pool.job" span from submission to completion (see tools.tracing).
+    """
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _stats["pending"] += 1
+    job_span = tracer.start_span("render_pool.job", start_time=int(submitted * 1e9), attributes={"job": name})
+
+    def _done(future):
+        job = {"name": name, "queue_wait_s": None, "run_s": None,
+               "total_s": round(time.time() - submitted, 4), "ok": False}
+        if not future.cancelled() and future.exception() is None:
+            _, started, finished = future.result()
+            job.update(queue_wait_s=round(started - submitted, 4), run_s=round(finished - started, 4), ok=True)
+            job_span.set_attributes({"queue_wait_ms": round((started - submitted) * 1000, 3),
+                                     "run_ms": round((finished - started) * 1000, 3)})
+        else:
+            job_span.set_status(StatusCode.ERROR)
+        job_span.end()
+        _slots.release()
+        with _stats_lock:
+            _stats["pending"] -= 1
+            _stats["completed" if job["ok"] else "failed"] += 1
+            _recent_jobs.append(job)
+
+    try:
+        trace_carrier = {}
+        propagate.inject(trace_carrier, context=trace.set_span_in_context(job_span))
+        future = get_executor().submit(_timed_call, fn, args, trace_carrier)
+    except Exception:
+        job_span.set_status(StatusCode.ERROR)
+        job_span.end()
+        _done_without_future(name, submitted)
+        raise
+    future.add_done_callback(_done)
+    return future
+
+
+def _done_without_future(name: str, submitted: float):
+    _slots.release()
+    with _stats_lock:
+        _stats["pending"] -= 1
+        _stats["failed"] += 1
+        _recent_jobs.append({"name": name, "queue_wait_s": None, "run_s": None,
+                             "total_s": round(time.time() - submitted, 4), "ok": False})
+
+
+def submit_render_job(name: str, fn, *args):
+    """
+    Submits fn(*args) to the render pool from a plain thread, blocking while the pool is full.
+
+    Returns:
+        concurrent.futures.Future: resolves to (result, started, finished).
+    """
+    submitted = time.time()
+    _slots.acquire()
+    return _submit_acquired(name, fn, args, submitted)
+
+
+async def run_render_job(name: str, fn, *args):
+    """
+    Runs fn(*args) in the render pool without blocking the event loop and records its timing.
+    Waits (off the loop) for a slot when RENDER_POOL_MAX_PENDING jobs are already in the pool.
+    """
+    submitted = time.time()
+    if not _slots.acquire(blocking=False):
+        await asyncio.to_thread(_slots.acquire)
+    result, _, _ = await asyncio.wrap_future(_submit_acquired(name, fn, args, submitted))
+    return result
+
+
+def render_pool_stats() -> dict:
+    """
+    Returns the queue depth (jobs submitted but not finished), job counters and the timings of the
+    most recent jobs.
+    """
+    with _stats_lock:
+        return dict(_stats, workers=RENDER_POOL_WORKERS, max_pending=RENDER_POOL_MAX_PENDING,
+                    recent_jobs=list(_recent_jobs))
+
+
+def shutdown_render_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,273 @@
+"""
+Content-addressed cache of document agent generations.
+
+A generation is keyed on a hash of (agent, instruction version, model, conversation), where the
+conversation is every user message of the session so far plus the brief in state['ba_output'], each
+normalised. Follow-ups such as "yes, go ahead" therefore only match a session with the same
+conversation before them, never the one that happened to send the same words first. When a
+document agent is about to run for a key it has already answered, serve_cached_response (a
+before_agent_callback) skips the agent: no model call, no new versioned file. The reply points at
+the artefact rendered the first time, which is also reported in state['cached_artefact'].
+store_response (an after_agent_callback) records what a document agent saved, and
+discard_pending_response (an on_model_error_callback) forgets the generation when the model call fails.
+
+Entries live in logs/response_cache.sqlite3 and carry the saved markdown, the artefact path and its
+content hash. The cache is bounded by RESPONSE_CACHE_MAX_ENTRIES and RESPONSE_CACHE_MAX_BYTES with
+least recently used eviction, and entries expire after a per-agent TTL (AGENT_TTL_S, overridable
+with RESPONSE_CACHE_TTL_<agent name>). RESPONSE_CACHE=0 turns the cache off; a turn run with
+state['bypass_response_cache'] set always generates afresh.
+"""
+import hashlib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from logs.history_store import content_hash, parse_versioned_name
+from tools.history_compaction import SAVE_TOOLS
+from tools.intent_router import BATCH_AGENT_PREFIX
+
+LOGS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "logs"))
+CACHE_DB_PATH = os.environ.get("RESPONSE_CACHE_PATH", os.path.join(LOGS_DIR, "response_cache.sqlite3"))
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "1") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 100_000_000))
+DEFAULT_TTL_S = float(os.environ.get("RESPONSE_CACHE_TTL", 7 * 24 * 3600))
+# Task charts depend on dates in the brief and go stale sooner than documents
+AGENT_TTL_S = {
+    "BRDGeneratorAgent": DEFAULT_TTL_S,
+    "UsecaseAcceptanceCriteriaAgent": DEFAULT_TTL_S,
+    "UserManualAgent": DEFAULT_TTL_S,
+    "TaskChartAgent": 24 * 3600,
+}
+BYPASS_STATE_KEY = "bypass_response_cache"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    model TEXT,
+    tool TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+"""
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "stored": 0, "evicted": 0, "expired": 0}
+# (invocation id, agent name) -> cache key of the generation in progress
+_pending_keys = {}
+
+
+def _connect(db_path=None):
+    db_path = db_path or CACHE_DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        connections[db_path] = conn
+    return conn
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def ttl_for(agent_name: str) -> float:
+    return float(os.environ.get(f"RESPONSE_CACHE_TTL_{agent_name}", AGENT_TTL_S.get(agent_name, DEFAULT_TTL_S)))
+
+
+def normalize_brief(text: str) -> str:
+    """
+    Case and whitespace insensitive form of a brief, so re-submitted or re-pasted briefs hash the same.
+    """
+    return re.sub(r"\s+", " ", text or "").strip().lower().rstrip(".!")
+
+
+def instruction_version(agent) -> str:
+    """
+    Hash of the agent's instruction; for instruction providers, of the provider's source.
+    """
+    instruction = agent.instruction
+    if callable(instruction):
+        try:
+            instruction = inspect.getsource(instruction)
+        except (OSError, TypeError):
+            instruction = getattr(instruction, "__qualname__", repr(instruction))
+    return hashlib.sha256(str(instruction).encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key(agent_name: str, instruction: str, model: str, user_turns: list, brief: str) -> str:
+    """
+    Key of a generation: user_turns are the texts of the session's user messages up to and including
+    the current one, brief the state['ba_output'] the agent reads.
+    """
+    payload = json.dumps([agent_name, instruction, model, [normalize_brief(turn) for turn in user_turns],
+                          normalize_brief(brief)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(key: str, agent_name: str, db_path=None) -> Optional[dict]:
+    """
+    Returns the live entry for key, or None. Expired entries, and entries whose artefact is gone or
+    was overwritten, are dropped.
+    """
+    conn = _connect(db_path)
+    row = conn.execute("SELECT * FROM entries WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    now = time.time()
+    if now - row["created"] > ttl_for(agent_name) or not os.path.isfile(row["path"]):
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        _count("expired")
+        return None
+    conn.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+    return dict(row)
+
+
+def store(key: str, agent_name: str, model: str, tool: str, markdown: str, path: str, db_path=None):
+    conn = _connect(db_path)
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, agent, model, tool, markdown, path, content_hash, size, created, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, agent_name, model, tool, markdown, path, content_hash(markdown), len(markdown.encode("utf-8")), now, now))
+        _evict(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _count("stored")
+
+
+def _evict(conn):
+    """
+    Drops least recently used entries until the cache is within its entry and byte bounds.
+    """
+    count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    if count <= RESPONSE_CACHE_MAX_ENTRIES and size <= RESPONSE_CACHE_MAX_BYTES:
+        return
+    evicted = 0
+    for row in conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+        if count <= RESPONSE_CACHE_MAX_ENTRIES and size <= RESPONSE_CACHE_MAX_BYTES:
+            break
+        conn.execute("DELETE FROM entries WHERE key = ?", (row["key"],))
+        count -= 1
+        size -= row["size"]
+        evicted += 1
+    _count("evicted", evicted)
+
+
+def _user_turns(events) -> list:
+    return ["".join(part.text for part in event.content.parts if part.text)
+            for event in events
+            if event.author == "user" and event.content and any(part.text for part in event.content.parts or [])]
+
+
+def _agent_key(callback_context):
+    agent = callback_context.get_invocation_context().agent
+    name = agent.name.removeprefix(BATCH_AGENT_PREFIX)
+    model = agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", "")
+    brief = callback_context.state.get("ba_output") or ""
+    key = cache_key(name, instruction_version(agent), model, _user_turns(callback_context.session.events),
+                    brief if isinstance(brief, str) else json.dumps(brief, sort_keys=True, default=str))
+    return name, model, key
+
+
+def serve_cached_response(callback_context) -> Optional[types.Content]:
+    """
+    before_agent_callback for the document agents: answers from the cache when this agent already
+    generated a document for the same brief, otherwise remembers the key for store_response.
+    """
+    if not RESPONSE_CACHE:
+        return None
+    if callback_context.state.get(BYPASS_STATE_KEY):
+        _count("bypassed")
+        return None
+    name, model, key = _agent_key(callback_context)
+    entry = lookup(key, name)
+    if entry is None:
+        _count("misses")
+        _pending_keys[(callback_context.invocation_id, callback_context.agent_name)] = (key, name, model)
+        return None
+
+    _count("hits")
+    print(f"🗄️ Response cache hit for {name}: {entry['path']}")
+    callback_context.state["cached_artefact"] = {"agent": name, "tool": entry["tool"], "path": entry["path"],
+                                                 "content_hash": entry["content_hash"]}
+    if entry["tool"] == "save_report":
+        callback_context.state["last_brd_version"] = parse_versioned_name(entry["path"])[1]
+    return types.Content(role="model", parts=[types.Part(
+        text=f"This document was already generated for the same request, so the saved copy "
+             f"{os.path.basename(entry['path'])} is returned instead of creating a new version.")])
+
+
+def store_response(callback_context) -> Optional[types.Content]:
+    """
+    after_agent_callback for the document agents: caches the markdown and artefact the agent saved.
+    """
+    pending = _pending_keys.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    if pending is None:
+        return None
+    key, name, model = pending
+    calls, paths = {}, {}
+    for event in callback_context.session.events:
+        if event.invocation_id != callback_context.invocation_id or event.author != callback_context.agent_name:
+            continue
+        for part in (event.content.parts if event.content else None) or []:
+            if part.function_call and part.function_call.name in SAVE_TOOLS:
+                calls[part.function_call.id] = part.function_call
+            elif part.function_response and part.function_response.name in SAVE_TOOLS:
+                response = part.function_response.response
+                if isinstance(response, dict) and isinstance(response.get("result"), str):
+                    paths[part.function_response.id] = response["result"]
+    for call_id, call in calls.items():
+        argument, _ = SAVE_TOOLS[call.name]
+        markdown = (call.args or {}).get(argument)
+        if call_id in paths and isinstance(markdown, str):
+            store(key, name, model, call.name, markdown, paths[call_id])
+    return None
+
+
+def discard_pending_response(callback_context, llm_request, error) -> Optional[LlmResponse]:
+    """
+    on_model_error_callback for the document agents: forgets the key serve_cached_response remembered,
+    since a failed model call ends the agent without store_response running. The error is not handled.
+    """
+    _pending_keys.pop((callback_context.invocation_id, callback_context.agent_name), None)
+    return None
+
+
+def response_cache_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    if RESPONSE_CACHE:
+        stats["entries"], stats["bytes"] = _connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    return stats
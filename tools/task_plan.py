@@ -0,0 +1,184 @@
+"""
+Interval model of a task plan, shared by the chart writers.
+
+TaskPlan keeps the tasks of a plan in NumPy arrays (datetime64[D] start and end days, dependency
+edges as index arrays) and computes everything a chart needs in vectorized form: day offsets,
+durations, and the latest finish, slack and critical path implied by the dependencies. Tasks come
+from the dicts the TaskChartAgent passes to save_task_chart:
+
+    {"task": "Build API", "start_date": "2025-08-08", "end_date": "2025-08-12",
+     "id": "T3", "depends_on": ["T1", "T2"], "milestone": false}
+
+Only task, start_date and end_date are required. depends_on may name tasks by id or by task name,
+as a list or a comma separated string.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _parse_days(values) -> np.ndarray:
+    """
+    Parses date strings to datetime64[D] in one call; non-ISO dates go through pandas.
+    """
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        return pd.to_datetime(values).values.astype("datetime64[D]")
+
+
+def _dependency_list(value) -> list:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return [str(v).strip() for v in value]
+
+
+class TaskPlan:
+    """
+    Tasks of a plan as arrays: names, ids, starts and ends (datetime64[D], ends inclusive), milestone
+    flags and dependency edges (edge_from[i] must finish before edge_to[i] starts).
+    """
+
+    def __init__(self, names: List[str], starts: np.ndarray, ends: np.ndarray, ids: Optional[List[str]] = None,
+                 milestones: Optional[np.ndarray] = None, edge_from: Optional[np.ndarray] = None,
+                 edge_to: Optional[np.ndarray] = None, unknown_dependencies: Optional[List[tuple]] = None):
+        self.names = list(names)
+        self.starts = np.asarray(starts, dtype="datetime64[D]")
+        self.ends = np.asarray(ends, dtype="datetime64[D]")
+        self.ids = list(ids) if ids is not None else [str(i + 1) for i in range(len(self.names))]
+        self.milestones = np.zeros(len(self.names), dtype=bool) if milestones is None else np.asarray(milestones, dtype=bool)
+        self.edge_from = np.zeros(0, dtype=np.int64) if edge_from is None else np.asarray(edge_from, dtype=np.int64)
+        self.edge_to = np.zeros(0, dtype=np.int64) if edge_to is None else np.asarray(edge_to, dtype=np.int64)
+        self.unknown_dependencies = unknown_dependencies or []
+
+    @classmethod
+    def from_tasks(cls, tasks: list) -> "TaskPlan":
+        names = [str(t["task"]) for t in tasks]
+        ids = [str(t.get("id") or i + 1) for i, t in enumerate(tasks)]
+        starts = _parse_days([t["start_date"] for t in tasks])
+        ends = _parse_days([t["end_date"] for t in tasks])
+        milestones = np.array([bool(t.get("milestone")) for t in tasks], dtype=bool)
+
+        # Dependencies may refer to a task id or, failing that, a task name
+        index = {name: i for i, name in enumerate(names)}
+        index.update({task_id: i for i, task_id in enumerate(ids)})
+        edge_from, edge_to, unknown = [], [], []
+        for i, task in enumerate(tasks):
+            for ref in _dependency_list(task.get("depends_on")):
+                if ref in index:
+                    edge_from.append(index[ref])
+                    edge_to.append(i)
+                else:
+                    unknown.append((ids[i], ref))
+        return cls(names, starts, ends, ids, milestones, np.array(edge_from, dtype=np.int64),
+                   np.array(edge_to, dtype=np.int64), unknown)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def has_dependencies(self) -> bool:
+        return len(self.edge_from) > 0
+
+    @property
+    def first_day(self) -> np.datetime64:
+        return self.starts.min()
+
+    @property
+    def last_day(self) -> np.datetime64:
+        return self.ends.max()
+
+    @property
+    def durations(self) -> np.ndarray:
+        """
+        Days per task, both ends included.
+        """
+        return (self.ends - self.starts).astype(np.int64) + 1
+
+    def offsets(self, origin: Optional[np.datetime64] = None) -> np.ndarray:
+        """
+        Day offset of every task start from origin (default the first day of the plan).
+        """
+        return (self.starts - (self.first_day if origin is None else origin)).astype(np.int64)
+
+    def topological_levels(self) -> Optional[List[np.ndarray]]:
+        """
+        Groups the tasks into levels so every dependency points from a lower to a higher level
+        (Kahn's algorithm, O(n + edges)). Returns None when the dependencies contain a cycle.
+        """
+        n = len(self)
+        indegree = np.bincount(self.edge_to, minlength=n)
+        order = np.argsort(self.edge_from, kind="stable")
+        targets = self.edge_to[order]
+        bounds = np.searchsorted(self.edge_from[order], np.arange(n + 1))
+
+        levels = []
+        level = np.flatnonzero(indegree == 0)
+        seen = 0
+        while level.size:
+            levels.append(level)
+            seen += level.size
+            successors = np.concatenate([targets[bounds[i]:bounds[i + 1]] for i in level]) if self.has_dependencies else level[:0]
+            np.subtract.at(indegree, successors, 1)
+            candidates = np.unique(successors)
+            level = candidates[indegree[candidates] == 0]
+        return levels if seen == n else None
+
+    def latest_finish(self, levels: Optional[List[np.ndarray]] = None) -> np.ndarray:
+        """
+        Latest day each task can end without delaying a dependent task or the end of the plan: a
+        backward pass over the dependency levels, each level in one vectorized step.
+        """
+        levels = levels if levels is not None else self.topological_levels()
+        if levels is None:
+            raise ValueError("The task dependencies contain a cycle")
+        latest = np.full(len(self), self.last_day, dtype="datetime64[D]")
+        durations = self.durations
+        for level in reversed(levels):
+            mask = np.isin(self.edge_from, level)
+            if mask.any():
+                # A predecessor must finish the day before its successor's latest start
+                latest_start = latest[self.edge_to[mask]] - (durations[self.edge_to[mask]] - 1)
+                np.minimum.at(latest, self.edge_from[mask], latest_start - 1)
+        return latest
+
+    def slack(self) -> np.ndarray:
+        """
+        Days each task could slip without delaying the plan (total float).
+        """
+        return (self.latest_finish() - self.ends).astype(np.int64)
+
+    def critical(self) -> np.ndarray:
+        """
+        Mask of the tasks on the critical path, i.e. without slack.
+        """
+        return self.slack() <= 0
+
+    def validate(self) -> dict:
+        """
+        Checks the plan. Returns {"errors": [...], "warnings": [...]}; a chart can only be drawn
+        without errors. Errors: a plan without tasks, tasks ending before they start, unknown or
+        duplicate ids in the dependencies and dependency cycles. Warnings: tasks that start before a task they depend on
+        has ended. Everything is vectorized except the O(n log n) sort for duplicate ids.
+        """
+        errors, warnings = [], []
+        if not len(self):
+            errors.append("The plan has no tasks")
+        for i in np.flatnonzero(self.ends < self.starts):
+            errors.append(f"'{self.names[i]}' ends ({self.ends[i]}) before it starts ({self.starts[i]})")
+        for task_id, ref in self.unknown_dependencies:
+            errors.append(f"Task {task_id} depends on unknown task '{ref}'")
+        if self.has_dependencies:
+            unique, counts = np.unique(np.array(self.ids), return_counts=True)
+            for task_id in unique[counts > 1]:
+                errors.append(f"Task id '{task_id}' is used more than once")
+            if self.topological_levels() is None:
+                errors.append("The task dependencies contain a cycle")
+            early = self.starts[self.edge_to] <= self.ends[self.edge_from]
+            for a, b in zip(self.edge_from[early], self.edge_to[early]):
+                warnings.append(f"'{self.names[b]}' starts on {self.starts[b]}, before '{self.names[a]}' "
+                                f"which it depends on ends ({self.ends[a]})")
+        return {"errors": errors, "warnings": warnings}
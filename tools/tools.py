@@ -1,143 +1,123 @@
 from typing import Optional 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 import os
-import re
 import json
-import pandas as pd
-import openpyxl
-from openpyxl.styles import PatternFill, Alignment, Font
-from openpyxl.utils import get_column_letter
-from datetime import datetime, timedelta
-from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.formatting.rule import FormulaRule
 from typing import List
+from google.adk.tools import ToolContext
+from logs.history_store import append_record, content_hash, find_artefacts, index_artefact, parse_versioned_name
+from logs.log_loader import resolve_BRD_for_session
+from tools.brd_sections import split_sections, join_sections, patch_sections, section_diff
+from tools.gantt import GANTT_SCALE, SCALES, write_task_chart
+from tools.task_plan import TaskPlan
+from tools.tracing import span
+from tools.pdf_renderer import (render_markdown_pdf, markdown_to_paragraphs, markdown_inline_to_html,
+                                reserve_versioned_path)
+from tools.render_jobs import get_job
 
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
-from reportlab.lib.units import inch
-
-
-def get_next_filename(base_name="brd", ext="pdf", folder="reports"):
-    os.makedirs(folder, exist_ok=True)
-    existing_files = os.listdir(folder)
-    
-    version_pattern = re.compile(rf"{re.escape(base_name)}_v(\d+)\.{ext}")
-    versions = [
-        int(match.group(1)) 
-        for f in existing_files 
-        if (match := version_pattern.match(f))
-    ]
-    
-    next_version = max(versions, default=0) + 1
-    return os.path.join(folder, f"{base_name}_v{next_version}.{ext}")
-
-def save_logs(pdf_filename, brd_text):
-    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    folder_name = os.path.join(root_dir, 'logs')
-    os.makedirs(folder_name,exist_ok=True)
-    log_file = os.path.join(folder_name,"brd_log.json")
-    log_entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "pdf": pdf_filename,
-        "brd_text": brd_text
-    }
+# Return the existing artefact instead of rendering again when the input was already rendered
+ARTEFACT_DEDUP = os.environ.get("ARTEFACT_DEDUP", "1") == "1"
 
-    # Load existing logs
-    if os.path.exists(log_file):
-        with open(log_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
-    else:
-        logs = []
 
-    logs.append(log_entry)
+def save_logs(pdf_filename, brd_text, doc_type="BRD", session_id=None):
+    with span("logs.save_logs", doc_type=doc_type):
+        record_id = append_record(doc_type, pdf_filename, brd_text, session_id=session_id)
+    print("The logs saved sucessfully, record id:", record_id)
 
-    # Save updated logs
-    with open(log_file, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=2)
-    print("The logs saved sucessfully in :",log_file)
 
-
-def markdown_to_paragraphs(markdown_text: str, styles) -> list:
+def task_chart_scale(scale: str) -> str:
     """
-    Converts basic markdown text to a list of reportlab flowables (Paragraph, Spacer, List).
+    The Gantt scale to use for a tool argument; "auto" or anything unknown falls back to GANTT_SCALE.
     """
-    flowables = []
-    lines = markdown_text.strip().split('\n')
-    bullet_items = []
-    numbered_items = []
-
-    for line in lines:
-        line = line.strip()
+    scale = (scale or "").strip().lower()
+    return scale if scale in SCALES else GANTT_SCALE
 
-        # Handle headers
-        if line.startswith('####'):
-            flowables.append(Paragraph(f"<b>{line[4:].strip()}</b>", styles['MyHeading4']))
-        elif line.startswith('###'):
-            flowables.append(Paragraph(f"<b>{line[3:].strip()}</b>", styles['MyHeading3']))
-        elif line.startswith('##'):
-            flowables.append(Paragraph(f"<b>{line[2:].strip()}</b>", styles['MyHeading2']))
-        elif line.startswith('#'):
-            flowables.append(Paragraph(f"<b>{line[1:].strip()}</b>", styles['MyHeading1']))
 
-        # Handle bullet list
-        elif line.startswith('- '):
-            bullet_items.append(Paragraph(markdown_inline_to_html(line[2:].strip()), styles['Normal']))
-        elif re.match(r'^\d+\.\s+', line):
-            numbered_items.append(Paragraph(markdown_inline_to_html(re.sub(r'^\d+\.\s+', '', line)), styles['Normal']))
-
-        # Empty line
-        elif line == "":
-            # Flush bullet list if any
-            if bullet_items:
-                flowables.append(ListFlowable(
-                    [ListItem(b, leftIndent=20) for b in bullet_items],
-                    bulletType='bullet', start='-', leftIndent=20))
-                bullet_items = []
-            if numbered_items:
-                flowables.append(ListFlowable(
-                    [ListItem(n, leftIndent=20) for n in numbered_items],
-                    bulletType='1', leftIndent=20))
-                numbered_items = []
-            flowables.append(Spacer(1, 12))
+def task_plan_problems(tasks: list) -> Optional[str]:
+    """
+    Validates a task list before its chart is rendered (see TaskPlan.validate). Returns a message
+    listing the errors that keep the chart from being drawn, or None; warnings are only printed.
+    """
+    try:
+        problems = TaskPlan.from_tasks(tasks).validate()
+    except (KeyError, ValueError) as e:
+        return f"Task chart not created, the tasks could not be read: {e}"
+    for warning in problems["warnings"]:
+        print("Task plan warning:", warning)
+    if problems["errors"]:
+        return "Task chart not created: " + "; ".join(problems["errors"])
+    return None
+
+
+def task_chart_hash(tasks: list, scale: str = "auto") -> str:
+    """
+    Content hash of a task list and chart scale, independent of key order and JSON formatting.
+    """
+    return content_hash(json.dumps({"tasks": tasks, "scale": scale}, sort_keys=True,
+                                   ensure_ascii=False, separators=(",", ":")))
 
-        # Normal paragraph
-        else:
-            flowables.append(Paragraph(markdown_inline_to_html(line), styles['Normal']))
 
-    # Flush remaining list items
-    if bullet_items:
-        flowables.append(ListFlowable([ListItem(b, leftIndent=20) for b in bullet_items],
-                                      bulletType='bullet', start='-', leftIndent=20))
-    if numbered_items:
-        flowables.append(ListFlowable([ListItem(n, leftIndent=20) for n in numbered_items],
-                                      bulletType='1', leftIndent=20))
+def find_rendered_artefact(kind: str, digest: str) -> Optional[dict]:
+    """
+    Looks up an artefact already rendered, or still rendering, from input with the given content hash.
 
-    return flowables
+    Returns:
+        dict: 'result' holds the artefact path; if its render job is still known, 'job_id' and 'status'
+        too. None when there is no usable artefact (never rendered, render failed or file gone).
+    """
+    if not ARTEFACT_DEDUP:
+        return None
+    for entry in find_artefacts(kind, digest):
+        job = get_job(entry["job_id"]) if entry["job_id"] else None
+        if job is not None:
+            if job["status"] != "failed":
+                return {"result": entry["path"], "job_id": job["id"], "status": job["status"], "deduplicated": True}
+        elif os.path.isfile(entry["path"]) and os.path.getsize(entry["path"]) > 0:
+            return {"result": entry["path"], "deduplicated": True}
+    return None
+
+
+def render_markdown_pdf_once(doc_type: str, text: str) -> str:
+    """
+    render_markdown_pdf, unless the same text was already rendered as this doc type; then the
+    existing PDF is returned.
+    """
+    digest = content_hash(text)
+    existing = find_rendered_artefact(doc_type, digest)
+    if existing:
+        print("Identical document already rendered:", existing["result"])
+        return existing["result"]
+    output_path = render_markdown_pdf(doc_type, text)
+    index_artefact(doc_type, digest, output_path)
+    return output_path
 
 
-def markdown_inline_to_html(text: str) -> str:
+def get_session_id(tool_context) -> Optional[str]:
     """
-    Convert inline markdown (**bold**, *italic*, __underline__) to HTML-style for Paragraph.
+    Returns the ADK session id of the invocation that called the tool, or None when the tool is called directly.
     """
-    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
-    text = re.sub(r'__(.*?)__', r'<u>\1</u>', text)
-    return text
+    if tool_context is None:
+        return None
+    return tool_context.session.id
 
 
-def save_report(report: str) -> str:
+def save_report(report: str, tool_context: ToolContext = None) -> str:
     """
     Converts a BRD (Business Requirement Document) string into a formatted PDF file 
     and saves it with an auto-incremented versioned filename (e.g., brd_v1.pdf, brd_v2.pdf, etc.).
 
     Args:
         report (str): The full text content of the BRD to be included in the PDF.
+        tool_context (ToolContext): Injected by ADK; used to tag the history record with the session.
 
     Returns:
         str: The file path of the saved PDF document.
     """
+    write_brd_text_copy(report)
+    output_path = render_markdown_pdf_once("BRD", report)
+    record_saved_document(output_path, report, "BRD", tool_context)
+    return output_path
+
+
+def write_brd_text_copy(report: str):
     root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     text_output_folder = os.path.join(root_dir, 'Text_Output')
     os.makedirs(text_output_folder, exist_ok=True)
@@ -147,39 +127,94 @@ def save_report(report: str) -> str:
     with open(text_output_path,'w') as f:
         f.write(report)
 
-    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    output_folder = os.path.join(root_dir, 'Output')
-    os.makedirs(output_folder, exist_ok=True)
-    filename=get_next_filename(base_name="BRD",ext="pdf",folder=output_folder)
-    output_path = os.path.join(output_folder, filename)
-
-    doc = SimpleDocTemplate(output_path, pagesize=A4,
-                            rightMargin=50, leftMargin=50,
-                            topMargin=50, bottomMargin=50)
-
-    # Styles
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='MyHeading1', parent=styles['Heading1'], fontSize=18, spaceAfter=12))
-    styles.add(ParagraphStyle(name='MyHeading2', parent=styles['Heading2'], fontSize=16, spaceAfter=10))
-    styles.add(ParagraphStyle(name='MyHeading3', parent=styles['Heading3'], fontSize=14, spaceAfter=8))
-    styles.add(ParagraphStyle(name='MyHeading4', parent=styles['Heading4'], fontSize=12, spaceAfter=6))
-    styles.add(ParagraphStyle(name='MyNormal',    parent=styles['Normal'],  fontSize=10, spaceAfter=6, alignment=TA_LEFT))
-
-    story = markdown_to_paragraphs(report, styles)
-    doc.build(story)
 
+def record_saved_document(output_path: str, report: str, doc_type: str, tool_context=None):
+    """
+    Logs a rendered document in the history and, for BRDs, remembers its version in the session state.
+    """
     print("Report saved in path:", output_path)
-    save_logs(filename,report)
+    save_logs(output_path,report,doc_type=doc_type,session_id=get_session_id(tool_context))
+    if doc_type == "BRD" and tool_context is not None:
+        # Lets BRDRevisionAgent resolve this exact version for the session on the next revision
+        tool_context.state["last_brd_version"] = parse_versioned_name(output_path)[1]
+
+
+def load_base_brd(tool_context) -> str:
+    """
+    Returns the BRD a revision in the calling session starts from (see resolve_BRD_for_session).
+    """
+    if tool_context is None:
+        return resolve_BRD_for_session(None)
+    return resolve_BRD_for_session(get_session_id(tool_context), tool_context.state.get("last_brd_version"))
+
+
+def get_brd_sections(section_numbers: List[str], tool_context: ToolContext = None) -> dict:
+    """
+    Returns the current text of the requested top level sections of the BRD being revised.
+
+    Args:
+        section_numbers (List[str]): The section numbers to fetch, as listed in the outline (e.g. ["3", "7"]).
+        tool_context (ToolContext): Injected by ADK; used to find the session's current BRD.
+
+    Returns:
+        dict: Section number mapped to the section text (heading line included). Unknown numbers are omitted.
+    """
+    sections = {s["key"]: s["text"] for s in split_sections(load_base_brd(tool_context))}
+    return {str(n).strip().rstrip('.'): sections[str(n).strip().rstrip('.')]
+            for n in section_numbers if str(n).strip().rstrip('.') in sections}
+
+
+def save_revised_sections(sections: str, tool_context: ToolContext = None) -> str:
+    """
+    Patches revised sections into the session's current BRD, saves the result as a new BRD version
+    and writes a machine readable section diff next to the PDF (e.g. BRD_v3.diff.json). When the
+    patched BRD is identical to a version already saved, that version is returned and its diff kept.
+
+    Args:
+        sections (str): JSON object mapping section number to the full revised section text, heading
+            line included. A new number adds a section and an empty string removes one.
+        tool_context (ToolContext): Injected by ADK; used to find the session's current BRD.
+
+    Returns:
+        str: The file path of the saved PDF document.
+    """
+    revised = json.loads(sections)
+    base_version = tool_context.state.get("last_brd_version") if tool_context is not None else None
+    before = split_sections(load_base_brd(tool_context))
+    after = patch_sections(before, revised)
+
+    report = join_sections(after)
+    deduplicated = find_rendered_artefact("BRD", content_hash(report)) is not None
+    output_path = save_report(report, tool_context)
+    # A deduplicated save is an earlier version, whose diff describes the revision that created it
+    if not deduplicated:
+        write_revision_diff(output_path, base_version, before, after)
     return output_path
 
 
-def save_user_manual(report: str) -> str:
+def write_revision_diff(output_path, base_version, before, after):
+    """
+    Writes the section diff between two split BRDs next to the new version's PDF.
+    """
+    diff = {
+        "base_version": base_version,
+        "new_version": parse_versioned_name(output_path)[1],
+        "sections": section_diff(before, after),
+    }
+    diff_path = os.path.splitext(output_path)[0] + ".diff.json"
+    with open(diff_path, "w", encoding="utf-8") as f:
+        json.dump(diff, f, indent=2)
+    print("Revision diff saved in path:", diff_path)
+    return diff_path
+
+def save_user_manual(report: str, tool_context: ToolContext = None) -> str:
     """
     Converts a user manual report string into a formatted PDF file 
     and saves it with an auto-incremented versioned filename (e.g., user_manual_v1.pdf, user_manual_v2.pdf, etc.).
 
     Args:
         report (str): The full text content of the user manual to be included in the PDF.
+        tool_context (ToolContext): Injected by ADK; used to tag the history record with the session.
 
     Returns:
         str: The file path of the saved PDF document.
@@ -193,38 +228,18 @@ def save_user_manual(report: str) -> str:
     # with open(text_output_path,'w') as f:
     #     f.write(report)
 
-    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    output_folder = os.path.join(root_dir, 'User_Manual')
-    os.makedirs(output_folder, exist_ok=True)
-    filename=get_next_filename(base_name="user_manual",ext="pdf",folder=output_folder)
-    output_path = os.path.join(output_folder, filename)
-
-    doc = SimpleDocTemplate(output_path, pagesize=A4,
-                            rightMargin=50, leftMargin=50,
-                            topMargin=50, bottomMargin=50)
-
-    # Styles
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='MyHeading1', parent=styles['Heading1'], fontSize=18, spaceAfter=12))
-    styles.add(ParagraphStyle(name='MyHeading2', parent=styles['Heading2'], fontSize=16, spaceAfter=10))
-    styles.add(ParagraphStyle(name='MyHeading3', parent=styles['Heading3'], fontSize=14, spaceAfter=8))
-    styles.add(ParagraphStyle(name='MyHeading4', parent=styles['Heading4'], fontSize=12, spaceAfter=6))
-    styles.add(ParagraphStyle(name='MyNormal',    parent=styles['Normal'],  fontSize=10, spaceAfter=6, alignment=TA_LEFT))
-
-    story = markdown_to_paragraphs(report, styles)
-    doc.build(story)
-
-    print("Report saved in path:", output_path)
-    save_logs(filename,report)
+    output_path = render_markdown_pdf_once("user_manual", report)
+    record_saved_document(output_path, report, "user_manual", tool_context)
     return output_path
 
-def save_usecase_acceptance_criteria(report: str) -> str:
+def save_usecase_acceptance_criteria(report: str, tool_context: ToolContext = None) -> str:
     """
     Converts a Use Case and Acceptance Criteria string into a formatted PDF file 
     and saves it with an auto-incremented versioned filename (e.g., use_case_v1.pdf, use_case_v2.pdf, etc.).
 
     Args:
         report (str): The full text content of the Use Case and Acceptance Criteria to be included in the PDF.
+        tool_context (ToolContext): Injected by ADK; used to tag the history record with the session.
 
     Returns:
         str: The file path of the saved PDF document.
@@ -238,29 +253,8 @@ def save_usecase_acceptance_criteria(report: str) -> str:
     # with open(text_output_path,'w') as f:
     #     f.write(report)
 
-    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    output_folder = os.path.join(root_dir, 'Usecase')
-    os.makedirs(output_folder, exist_ok=True)
-    filename=get_next_filename(base_name="Usecase",ext="pdf",folder=output_folder)
-    output_path = os.path.join(output_folder, filename)
-
-    doc = SimpleDocTemplate(output_path, pagesize=A4,
-                            rightMargin=50, leftMargin=50,
-                            topMargin=50, bottomMargin=50)
-
-    # Styles
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='MyHeading1', parent=styles['Heading1'], fontSize=18, spaceAfter=12))
-    styles.add(ParagraphStyle(name='MyHeading2', parent=styles['Heading2'], fontSize=16, spaceAfter=10))
-    styles.add(ParagraphStyle(name='MyHeading3', parent=styles['Heading3'], fontSize=14, spaceAfter=8))
-    styles.add(ParagraphStyle(name='MyHeading4', parent=styles['Heading4'], fontSize=12, spaceAfter=6))
-    styles.add(ParagraphStyle(name='MyNormal',    parent=styles['Normal'],  fontSize=10, spaceAfter=6, alignment=TA_LEFT))
-
-    story = markdown_to_paragraphs(report, styles)
-    doc.build(story)
-
-    print("Report saved in path:", output_path)
-    save_logs(filename,report)
+    output_path = render_markdown_pdf_once("Usecase", report)
+    record_saved_document(output_path, report, "Usecase", tool_context)
     return output_path
 
 # old function without status column
@@ -354,147 +348,38 @@ def save_usecase_acceptance_criteria(report: str) -> str:
 #     return excel_file
 
 
-def save_task_chart(tasks: str):
+def get_task_chart_path() -> str:
+    """
+    Allocates the next task_chart_vN.xlsx in Task_Chart (see reserve_versioned_path), so charts saved
+    at the same time never share a file.
+    """
+    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    return reserve_versioned_path(os.path.join(root_dir, 'Task_Chart'), "task_chart", "xlsx")
+
+
+def save_task_chart(tasks: str, scale: str = "auto"):
     """
     Converts a string representation of a list of tasks with start and end dates into a formatted Excel Gantt chart.
     Args:
         tasks (str): JSON string representation of the tasks.
+        scale (str): Column time scale: "day", "week", "month", "quarter" or "auto" to fit the plan's span.
     Returns:
-        str: The file path of the saved Gantt chart Excel file.
+        str: The file path of the saved Gantt chart Excel file, or what is wrong with the tasks.
     """
     tasks = json.loads(tasks)
-
-    # Convert dates
-    for t in tasks:
-        t["start_date"] = pd.to_datetime(t["start_date"])
-        t["end_date"] = pd.to_datetime(t["end_date"])
-
-    # Get overall date range
-    start_all = min(t["start_date"] for t in tasks)
-    end_all = max(t["end_date"] for t in tasks)
-    all_dates = pd.date_range(start_all, end_all)
-
-    # # Prepare output folder
-    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    output_folder = os.path.join(root_dir, 'Task_Chart')
-    os.makedirs(output_folder, exist_ok=True)
-    excel_file = "task_chart.xlsx"
-    excel_file = os.path.join(output_folder,excel_file)
-
-    # Define columns including the new Status column
-    columns = ["Task", "Start Date", "End Date", "Status"] + [date.strftime("%Y-%m-%d") for date in all_dates]
-
-    # Create DataFrame rows
-    rows = []
-    for t in tasks:
-        row = {
-            "Task": t["task"],
-            "Start Date": t["start_date"].strftime("%Y-%m-%d"),
-            "End Date": t["end_date"].strftime("%Y-%m-%d"),
-            "Status": ""  # Empty to be filled by dropdown
-        }
-        rows.append(row)
-
-    df = pd.DataFrame(rows, columns=columns)
-    df.to_excel(excel_file, index=False)
-
-    # Load workbook to apply formatting
-    wb = openpyxl.load_workbook(excel_file)
-    ws = wb.active
-
-    # Define colors
-    task_colors = [
-        "4F81BD", "C0504D", "9BBB59", "8064A2",
-        "F79646", "2C4D75", "00B0F0", "92D050"
-    ]
-
-    font = Font(color="FFFFFF", bold=True)
-    align = Alignment(horizontal="center", vertical="center")
-
-    # Apply Gantt colors
-    for row_idx, task in enumerate(tasks, start=2):
-        start = task["start_date"]
-        end = task["end_date"]
-        duration = (end - start).days + 1
-
-        # Offset: Task, Start, End, Status = 4 columns
-        start_col_offset = (start - start_all).days + 5
-        end_col_offset = start_col_offset + duration - 1
-
-        color_hex = task_colors[(row_idx - 2) % len(task_colors)]
-        fill = PatternFill(start_color=color_hex, end_color=color_hex, fill_type="solid")
-
-        # Merge cells for the task
-        ws.merge_cells(
-            start_row=row_idx,
-            start_column=start_col_offset,
-            end_row=row_idx,
-            end_column=end_col_offset
-        )
-
-        cell = ws.cell(row=row_idx, column=start_col_offset)
-        cell.value = task["task"]
-        cell.fill = fill
-        cell.font = font
-        cell.alignment = align
-
-        # Fill each cell in the range
-        for col in range(start_col_offset, end_col_offset + 1):
-            ws.cell(row=row_idx, column=col).fill = fill
-
-    # Add dropdown for Status column (D column, i.e., 4th column)
-    dv = DataValidation(type="list", formula1='"In Progress,On Hold,Completed"', allow_blank=True)
-    status_range = f"D2:D{len(tasks)+1}"
-    dv.add(status_range)
-    ws.add_data_validation(dv)
-
-    # Auto-size columns
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[column].width = max_length + 2
-
-    dv = DataValidation(type="list", formula1='"In Progress,On Hold,Completed"', allow_blank=True)
-    ws.add_data_validation(dv)
-    status_col = 4  # Column D
-    for row_idx in range(2, len(tasks) + 2):
-        cell = ws.cell(row=row_idx, column=status_col)
-        dv.add(cell)
-
-    # Conditional formatting rules
-    status_column_letter = get_column_letter(status_col)
-
-    # Rule for "In Progress" - Yellow
-    ws.conditional_formatting.add(
-        f"{status_column_letter}2:{status_column_letter}{len(tasks)+1}",
-        FormulaRule(
-            formula=[f'${status_column_letter}2="In Progress"'],
-            fill=PatternFill(start_color="F8FF00", end_color="F8FF00", fill_type="solid")
-        )
-    )
-
-    # Rule for "On Hold" - Blue
-    ws.conditional_formatting.add(
-        f"{status_column_letter}2:{status_column_letter}{len(tasks)+1}",
-        FormulaRule(
-            formula=[f'${status_column_letter}2="On Hold"'],
-            fill=PatternFill(start_color="00F7FF", end_color="00F7FF", fill_type="solid")
-        )
-    )
-
-    # Rule for "Completed" - Green
-    ws.conditional_formatting.add(
-        f"{status_column_letter}2:{status_column_letter}{len(tasks)+1}",
-        FormulaRule(
-            formula=[f'${status_column_letter}2="Completed"'],
-            fill=PatternFill(start_color="92D050", end_color="92D050", fill_type="solid")
-        )
-    )
-
-    wb.save(excel_file)
+    problems = task_plan_problems(tasks)
+    if problems:
+        return problems
+    scale = task_chart_scale(scale)
+    digest = task_chart_hash(tasks, scale)
+    existing = find_rendered_artefact("task_chart", digest)
+    if existing:
+        print("Identical Gantt chart already saved to:", existing["result"])
+        return existing["result"]
+
+    excel_file = get_task_chart_path()
+    write_task_chart(tasks, excel_file, scale)
+    index_artefact("task_chart", digest, excel_file)
     print(f"Gantt chart saved to: {excel_file}")
     return excel_file
 
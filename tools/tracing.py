@@ -0,0 +1,199 @@
+"""
+Spans for every stage of a chat turn, exported to a local file that works offline.
+
+ADK already opens OpenTelemetry spans for each invocation ("invocation"), agent run ("invoke_agent
+<agent>"), model call ("call_llm", with gen_ai.usage.* token counts) and tool call ("execute_tool
+<tool>"). span() adds the stages ADK does not see:
+
+    app.turn                    the Streamlit turn, from submitting the prompt to the last event
+    agent.turn                  run_agent_logic: every runner event of the turn, with token counts
+    render_pool.job             a render job from submission to its result, with queue_wait_ms and run_ms
+    pdf.build                   build_markdown_pdf, with bytes_written
+    pdf.markdown_to_paragraphs  turning the markdown into flowables (section cache included)
+    pdf.doc_build               ReportLab's doc.build()
+    gantt.write                 write_task_chart, with bytes_written
+    logs.save_logs              the BRD history log
+    app.read_artefact           reading a file for a download button, with bytes_read
+
+With TRACING=1, setup_tracing() installs a tracer provider that appends one JSON object per finished
+span to TRACE_FILE (logs/traces.jsonl), from the app process and from the render workers. When
+OTEL_EXPORTER_OTLP_ENDPOINT or OTEL_EXPORTER_OTLP_TRACES_ENDPOINT is set and opentelemetry-exporter-otlp
+is installed, spans are sent there too. Without TRACING the spans are no-ops.
+
+    python -m tools.tracing [TRACE_FILE]
+
+prints the count, p50, p95 and max duration of every stage, with token and byte totals.
+"""
+import argparse
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (BatchSpanProcessor, SimpleSpanProcessor, SpanExporter,
+                                            SpanExportResult)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TRACING = os.environ.get("TRACING", "0") == "1"
+TRACE_FILE = os.environ.get("TRACE_FILE", os.path.join(ROOT_DIR, "logs", "traces.jsonl"))
+# ADK puts whole prompts, responses and tool arguments on its spans; longer values are cut to this
+TRACE_MAX_ATTRIBUTE_CHARS = int(os.environ.get("TRACE_MAX_ATTRIBUTE_CHARS", 256))
+
+TOKEN_ATTRIBUTES = {"gen_ai.usage.input_tokens": "input_tokens", "gen_ai.usage.output_tokens": "output_tokens"}
+
+tracer = trace.get_tracer("business_analyst_agent")
+_setup_lock = threading.Lock()
+_setup_done = False
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends finished spans to a file, one JSON object per line. Each batch is written with a single
+    append, so several processes can share the file.
+    """
+
+    def __init__(self, path: str = TRACE_FILE, max_attribute_chars: int = TRACE_MAX_ATTRIBUTE_CHARS):
+        self.path = path
+        self.max_attribute_chars = max_attribute_chars
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, spans) -> SpanExportResult:
+        lines = "".join(json.dumps(span_record(span, self.max_attribute_chars), ensure_ascii=False) + "\n"
+                        for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def span_record(span: ReadableSpan, max_attribute_chars: int = TRACE_MAX_ATTRIBUTE_CHARS) -> dict:
+    attributes = {}
+    for key, value in (span.attributes or {}).items():
+        if isinstance(value, str) and len(value) > max_attribute_chars:
+            value = value[:max_attribute_chars] + "…"
+        elif isinstance(value, tuple):
+            value = list(value)
+        attributes[key] = value
+    return {
+        "name": span.name,
+        "trace_id": f"{span.context.trace_id:032x}",
+        "span_id": f"{span.context.span_id:016x}",
+        "parent_span_id": f"{span.parent.span_id:016x}" if span.parent else None,
+        "start_time_unix_nano": span.start_time,
+        "end_time_unix_nano": span.end_time,
+        "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+        "status": span.status.status_code.name,
+        "pid": os.getpid(),
+        "attributes": attributes,
+    }
+
+
+def setup_tracing(sync_export: bool = False) -> bool:
+    """
+    Installs the tracer provider once per process when TRACING is on. Render workers pass
+    sync_export=True: they exit without running atexit handlers, so their spans are written as they
+    end instead of in batches. Returns whether tracing is on.
+    """
+    global _setup_done
+    if not TRACING:
+        return False
+    with _setup_lock:
+        if not _setup_done:
+            exporter = JsonLinesSpanExporter()
+            provider = TracerProvider(resource=Resource.create())
+            provider.add_span_processor(SimpleSpanProcessor(exporter) if sync_export else BatchSpanProcessor(exporter))
+            if os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT") or os.environ.get("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"):
+                try:
+                    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+                except ImportError:
+                    print("⚠️ OTLP endpoint set but opentelemetry-exporter-otlp is not installed; tracing to file only")
+            trace.set_tracer_provider(provider)
+            _setup_done = True
+    return True
+
+
+@contextmanager
+def span(name: str, context=None, **attributes):
+    """
+    Opens a span as the current one; context is the parent to use when the caller's context does
+    not carry over (e.g. a coroutine submitted to another thread's event loop).
+    """
+    with tracer.start_as_current_span(name, context=context,
+                                      attributes={k: v for k, v in attributes.items() if v is not None}) as current:
+        yield current
+
+
+def set_span_attributes(**attributes):
+    """
+    Adds attributes to the current span, e.g. the size of a file once it is written.
+    """
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes({k: v for k, v in attributes.items() if v is not None})
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def stage_report(path: str = TRACE_FILE) -> list:
+    """
+    Per stage (span name): count, p50/p95/max duration in ms and the summed tokens and bytes written,
+    slowest p95 first.
+    """
+    stages = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            stage = stages.setdefault(record["name"], {"durations": [], "input_tokens": 0, "output_tokens": 0,
+                                                       "bytes_written": 0})
+            stage["durations"].append(record["duration_ms"])
+            attributes = record.get("attributes") or {}
+            for attribute, total in TOKEN_ATTRIBUTES.items():
+                stage[total] += attributes.get(attribute) or 0
+            stage["bytes_written"] += attributes.get("bytes_written") or 0
+
+    rows = []
+    for name, stage in stages.items():
+        durations = sorted(stage.pop("durations"))
+        rows.append({"stage": name, "count": len(durations), "p50_ms": percentile(durations, 50),
+                     "p95_ms": percentile(durations, 95), "max_ms": durations[-1], **stage})
+    return sorted(rows, key=lambda row: row["p95_ms"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prints p50/p95 latency per stage from a trace file.")
+    parser.add_argument("trace_file", nargs="?", default=TRACE_FILE)
+    args = parser.parse_args()
+    if not os.path.isfile(args.trace_file):
+        parser.exit(1, f"No trace file at {args.trace_file}; run the app with TRACING=1 first.\n")
+
+    rows = stage_report(args.trace_file)
+    width = max([len("stage")] + [len(row["stage"]) for row in rows])
+    print(f"{'stage':<{width}}{'count':>8}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}"
+          f"{'in tokens':>11}{'out tokens':>12}{'bytes':>12}")
+    for row in rows:
+        print(f"{row['stage']:<{width}}{row['count']:>8}{row['p50_ms']:>11.1f}{row['p95_ms']:>11.1f}"
+              f"{row['max_ms']:>11.1f}{row['input_tokens']:>11}{row['output_tokens']:>12}{row['bytes_written']:>12}")
+
+
+if __name__ == "__main__":
+    main()